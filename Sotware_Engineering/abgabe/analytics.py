@@ -0,0 +1,169 @@
+# ANALYTICS - Auswertungen über erledigte Tasks
+# Verantwortlichkeiten:
+# - Durchsatz pro Woche und Kategorie, Durchlaufzeit, Anteil verspäteter Erledigungen
+# - Vektorisierte Gruppierung mit NumPy (optional), sonst reines Python
+# - Ergebnisse pro Datenversion zwischenspeichern
+
+import statistics
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from model import TaskRepository
+
+# Auswertung hängt nur von diesen Feldern ab
+FIELDS = ("category", "created_at", "completed_at", "due_date")
+
+
+def _numpy():
+    """NumPy ist optional; ohne das Paket rechnet die Python-Variante"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+class TaskAnalytics:
+    """
+    Trend-Auswertung über archivierte Tasks (Hauptdatei und Kalt-Archiv).
+
+    report() liefert pro Kategorie den Durchsatz je Kalenderwoche (Montag
+    als Wochenbeginn), die Durchlaufzeit von created_at bis completed_at in
+    Tagen (Mittel/Median) und den Anteil der nach ihrer Fälligkeit erledigten
+    Tasks. Mit NumPy werden die Zeitstempel als datetime64-Arrays geparst und
+    per bincount gruppiert; beide Varianten liefern dieselben Zahlen. Das
+    Ergebnis wird bis zur nächsten Änderung (Version von Repository und
+    Kalt-Archiv) wiederverwendet.
+    """
+
+    def __init__(self, repository: TaskRepository, archive=None, use_numpy: Optional[bool] = None):
+        self.repository = repository
+        self.archive = archive
+        self.use_numpy = use_numpy
+        self._cache: Optional[Tuple[tuple, Dict]] = None
+
+    def _rows(self) -> List[Tuple]:
+        _, data = self.repository.snapshot("archived_tasks")
+        tasks = data.get("archived_tasks", [])
+        if self.archive is not None:
+            tasks += self.archive.all_tasks()
+        return [tuple(t.get(field) for field in FIELDS) for t in tasks if t.get("completed_at")]
+
+    def report(self, weeks: int = 12, today: Optional[date] = None) -> Dict:
+        """Auswertung der letzten weeks Wochen (Durchlaufzeit/Verspätung über alle Erledigten)"""
+        today = today or date.today()
+        key = (self.repository.version, self.archive.generation if self.archive else 0,
+               weeks, today)
+        if self._cache is not None and self._cache[0] == key:
+            return self._cache[1]
+        rows = self._rows()
+        first_week = _week_start(today) - timedelta(weeks=weeks - 1)
+        numpy = _numpy() if self.use_numpy is not False else None
+        result = None
+        if numpy is not None:
+            try:
+                result = self._report_numpy(numpy, rows, first_week, weeks)
+            except ValueError:
+                result = None  # ungültige Zeitstempel: Python-Variante überspringt sie einzeln
+        if result is None:
+            result = self._report_python(rows, first_week, weeks)
+        self._cache = (key, result)
+        return result
+
+    @staticmethod
+    def _empty(first_week: date, weeks: int, engine: str, count: int) -> Dict:
+        return {
+            "engine": engine,
+            "tasks": count,
+            "weeks": [(first_week + timedelta(weeks=i)).isoformat() for i in range(weeks)],
+            "throughput": {},
+            "lead_time_days": {},
+            "overdue_rate": {}
+        }
+
+    def _report_python(self, rows: List[Tuple], first_week: date, weeks: int) -> Dict:
+        result = self._empty(first_week, weeks, "python", 0)
+        throughput: Dict[str, Counter] = defaultdict(Counter)
+        leads: Dict[str, List[float]] = defaultdict(list)
+        late: Counter = Counter()
+        with_due: Counter = Counter()
+        for category, created_at, completed_at, due_date in rows:
+            try:
+                completed = datetime.fromisoformat(completed_at)
+            except (TypeError, ValueError):
+                continue
+            category = category or "Keine"
+            result["tasks"] += 1
+            week = (_week_start(completed.date()) - first_week).days // 7
+            if 0 <= week < weeks:
+                throughput[category][week] += 1
+            try:
+                leads[category].append((completed - datetime.fromisoformat(created_at)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+            try:
+                due = date.fromisoformat(due_date[:10])
+            except (TypeError, ValueError):
+                continue
+            with_due[category] += 1
+            late[category] += completed.date() > due
+        result["throughput"] = {cat: [counts[w] for w in range(weeks)]
+                                for cat, counts in sorted(throughput.items())}
+        result["lead_time_days"] = {
+            cat: {"count": len(values),
+                  "mean": round(statistics.fmean(values) / 86400, 2),
+                  "median": round(statistics.median(values) / 86400, 2)}
+            for cat, values in sorted(leads.items())}
+        result["overdue_rate"] = {cat: round(late[cat] / n, 4) for cat, n in sorted(with_due.items())}
+        return result
+
+    def _report_numpy(self, np, rows: List[Tuple], first_week: date, weeks: int) -> Dict:
+        result = self._empty(first_week, weeks, "numpy", len(rows))
+        if not rows:
+            return result
+        categories, created, completed, due = zip(*rows)
+        names, codes = np.unique(np.array([c or "Keine" for c in categories]), return_inverse=True)
+        done = np.array(completed, dtype="datetime64[s]")
+        done_day = done.astype("datetime64[D]")
+
+        # Durchsatz: Wochenindex relativ zur ersten Woche, gruppiert per bincount(Kategorie, Woche)
+        week = (done_day - np.datetime64(first_week.isoformat(), "D")).astype(np.int64) // 7
+        in_range = (week >= 0) & (week < weeks)
+        grid = np.bincount(codes[in_range] * weeks + week[in_range],
+                           minlength=len(names) * weeks).reshape(len(names), weeks)
+        result["throughput"] = {str(names[i]): grid[i].tolist() for i in range(len(names))
+                                if grid[i].any()}
+
+        # Durchlaufzeit: nur Tasks mit created_at
+        has_created = np.array([c is not None for c in created])
+        if has_created.any():
+            start = np.array([c for c in created if c is not None], dtype="datetime64[s]")
+            lead = (done[has_created] - start).astype(np.float64)
+            lead_codes = codes[has_created]
+            order = np.lexsort((lead, lead_codes))
+            lead, lead_codes = lead[order], lead_codes[order]
+            counts = np.bincount(lead_codes, minlength=len(names))
+            sums = np.bincount(lead_codes, weights=lead, minlength=len(names))
+            bounds = np.concatenate(([0], np.cumsum(counts)))
+            result["lead_time_days"] = {
+                str(names[i]): {"count": int(counts[i]),
+                                "mean": round(float(sums[i] / counts[i]) / 86400, 2),
+                                "median": round(float(np.median(lead[bounds[i]:bounds[i + 1]])) / 86400, 2)}
+                for i in range(len(names)) if counts[i]}
+
+        # Verspätung: erledigt nach dem Fälligkeitstag
+        has_due = np.array([d is not None and d != "" for d in due])
+        if has_due.any():
+            due_day = np.array([d[:10] for d in due if d], dtype="datetime64[D]")
+            late = done_day[has_due] > due_day
+            due_codes = codes[has_due]
+            totals = np.bincount(due_codes, minlength=len(names))
+            lates = np.bincount(due_codes, weights=late, minlength=len(names))
+            result["overdue_rate"] = {str(names[i]): round(float(lates[i] / totals[i]), 4)
+                                      for i in range(len(names)) if totals[i]}
+        return result
@@ -0,0 +1,488 @@
+# API SERVER - Lokale HTTP/JSON-Schnittstelle für andere Werkzeuge
+# Verantwortlichkeiten:
+# - TaskController- und CategoryController-Operationen per HTTP anbieten
+# - Ein gemeinsames Repository im Prozess (keine zweite Kopie der Daten)
+# - Keep-Alive, Batch-Requests mit einem Speichervorgang
+# - Massenanlage mit Block-Prüfung und Fehlern je Datensatz
+# - ETag / If-None-Match auf Listen, gekoppelt an die Datenversion
+# - Optional ein Datenbestand pro Mandant (Header X-Tenant, siehe tenants.py)
+
+import asyncio
+import json
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from controller import ApplicationController
+from model import Task
+from recurrence import RecurrenceRule
+from validation import BatchValidator
+
+if TYPE_CHECKING:
+    from tenants import RepositoryManager
+
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 304: "Not Modified",
+           400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error"}
+MAX_BODY = 16 * 1024 * 1024
+# Worker-Threads für handle() bei Thread-sicherem Repository (sonst einer)
+HANDLER_THREADS = 8
+
+
+class ApiError(Exception):
+    """Fehler mit HTTP-Status, wird als JSON {"error": ...} beantwortet"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"Ungültiges Datum: {value}")
+
+
+class TaskApi:
+    """
+    Routing und Handler über einem ApplicationController.
+
+    handle() ist synchron; der Server ruft es in Worker-Threads auf, nicht
+    in der Event-Loop (Speichern blockiert sonst alle Verbindungen). Mit
+    Thread-sicherem Repository laufen mehrere Requests parallel, sonst
+    nacheinander in einem Worker. Listen-Antworten
+    werden pro Datenversion serialisiert zwischengespeichert.
+    """
+
+    def __init__(self, app: ApplicationController):
+        self.app = app
+        self.repository = app.repository
+        self.tasks = app.get_task_controller()
+        self.categories = app.get_category_controller()
+        # Prozess-ID im ETag, damit Versionen nach einem Neustart nicht kollidieren
+        self._boot = uuid.uuid4().hex[:8]
+        self._cache: Dict[str, bytes] = {}
+        self._cache_version = -1
+        self._cache_lock = threading.Lock()
+        self._routes: List[Tuple[str, re.Pattern, Callable, bool]] = []
+        route = self._route
+        route("GET", r"/tasks", self.list_tasks, cached=True)
+        route("POST", r"/tasks", self.create_task)
+        route("POST", r"/tasks/bulk", self.bulk_create)
+        route("GET", r"/tasks/archived", self.list_archived, cached=True)
+        route("GET", r"/tasks/next", self.next_tasks, cached=True)
+        route("GET", r"/tasks/(\d+)", self.get_task)
+        route("PUT", r"/tasks/(\d+)", self.update_task)
+        route("DELETE", r"/tasks/(\d+)", self.delete_task)
+        route("POST", r"/tasks/(\d+)/toggle", self.toggle_task)
+        route("POST", r"/tasks/(\d+)/restore", self.restore_task)
+        route("GET", r"/categories", self.list_categories, cached=True)
+        route("POST", r"/categories", self.create_category)
+        route("DELETE", r"/categories/([^/]+)", self.delete_category)
+        route("POST", r"/batch", self.batch)
+
+    def _route(self, method: str, pattern: str, handler: Callable, cached: bool = False) -> None:
+        self._routes.append((method, re.compile(pattern + "$"), handler, cached))
+
+    def etag(self) -> str:
+        return f'"{self._boot}-{self.repository.version}"'
+
+    def handle(self, method: str, target: str, body: bytes = b"",
+               headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Bearbeitet einen Request und liefert (Status, Header, Body)"""
+        headers = headers or {}
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path_matched = False
+        for route_method, pattern, handler, cached in self._routes:
+            match = pattern.match(url.path)
+            if match is None:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            try:
+                if cached:
+                    return self._cached(target, headers, lambda: handler(query, *match.groups()))
+                payload = json.loads(body) if body else {}
+                if not isinstance(payload, dict) and handler != self.batch:
+                    raise ApiError(400, "JSON-Objekt erwartet")
+                status, result = handler(payload, *[unquote(g) for g in match.groups()])
+            except ApiError as e:
+                return self._json(e.status, {"error": str(e)})
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                return self._json(400, {"error": "Ungültiges JSON"})
+            return self._json(status, result)
+        if path_matched:
+            return self._json(405, {"error": "Methode nicht erlaubt"})
+        return self._json(404, {"error": "Unbekannter Pfad"})
+
+    def _cached(self, target: str, headers: Dict[str, str],
+                produce: Callable) -> Tuple[int, Dict[str, str], bytes]:
+        """GET mit ETag: 304 bei passender Version, sonst Antwort aus dem Cache"""
+        etag = self.etag()
+        if headers.get("if-none-match") == etag:
+            return 304, {"ETag": etag}, b""
+        version = self.repository.version
+        with self._cache_lock:
+            if self._cache_version != version:
+                self._cache.clear()
+                self._cache_version = version
+            data = self._cache.get(target)
+        if data is None:
+            try:
+                data = json.dumps(produce(), ensure_ascii=False).encode("utf-8")
+            except ApiError as e:
+                return self._json(e.status, {"error": str(e)})
+            with self._cache_lock:
+                if self._cache_version == version == self.repository.version:
+                    self._cache[target] = data
+        return 200, {"Content-Type": "application/json", "ETag": etag}, data
+
+    @staticmethod
+    def _json(status: int, result) -> Tuple[int, Dict[str, str], bytes]:
+        if result is None:
+            return status, {}, b""
+        return status, {"Content-Type": "application/json"}, json.dumps(result, ensure_ascii=False).encode("utf-8")
+
+    # --- Tasks ---
+
+    def list_tasks(self, query: Dict[str, str]) -> Dict:
+        status = query.get("status")
+        tasks = self.tasks.get_filtered_tasks(None if status in (None, "Alle") else status,
+                                              query.get("category", "Alle"))
+        return self._page(tasks, query)
+
+    def list_archived(self, query: Dict[str, str]) -> Dict:
+        return self._page(self.tasks.get_archived_tasks(), query)
+
+    def next_tasks(self, query: Dict[str, str]) -> List[Dict]:
+        limit = query.get("limit", "5")
+        if not limit.isdigit():
+            raise ApiError(400, "limit muss eine Zahl sein")
+        return [t.to_dict() for t in self.tasks.get_next_tasks(int(limit))]
+
+    @staticmethod
+    def _page(tasks: List[Task], query: Dict[str, str]) -> Dict:
+        """Optionale Seitenbildung über offset/limit"""
+        try:
+            offset = int(query.get("offset", 0))
+            limit = int(query["limit"]) if "limit" in query else len(tasks)
+        except ValueError:
+            raise ApiError(400, "offset/limit müssen Zahlen sein")
+        return {"total": len(tasks), "tasks": [t.to_dict() for t in tasks[offset:offset + limit]]}
+
+    def get_task(self, payload: Dict, task_id: str):
+        task = self.tasks.get_task(int(task_id))
+        if task is None:
+            raise ApiError(404, "Task nicht gefunden")
+        return 200, task.to_dict()
+
+    def _task_fields(self, payload: Dict) -> Dict:
+        category = payload.get("category", "Keine")
+        if category not in self.categories.get_all_categories():
+            raise ApiError(422, f"Unbekannte Kategorie: {category}")
+        return {"title": str(payload.get("title", "")), "category": category,
+                "due_date": _parse_date(payload.get("due_date"))}
+
+    def create_task(self, payload: Dict):
+        fields = self._task_fields(payload)
+        try:
+            rule = payload.get("recurrence")
+            task_id = self.tasks.create_task_with_id(
+                priority=int(payload.get("priority", Task.DEFAULT_PRIORITY)),
+                task_type=payload.get("type", Task.TYPE),
+                recurrence=RecurrenceRule.from_dict(rule) if rule else None, **fields)
+        except (ValueError, KeyError, TypeError) as e:
+            raise ApiError(422, f"Ungültige Angaben: {e}")
+        if task_id is None:
+            raise ApiError(422, "Ungültige Task")
+        return 201, {"id": task_id}
+
+    def bulk_create(self, payload: Dict):
+        """Legt viele Tasks an: {"tasks": [...]} - ungültige werden mit Index gemeldet"""
+        records = payload.get("tasks")
+        if not isinstance(records, list):
+            raise ApiError(400, "tasks muss eine Liste sein")
+        result = BatchValidator(self.categories.get_all_categories()).validate(records)
+        imported = self.repository.add_tasks(result.tasks(), result.extra_fields)
+        return 200, {"imported": imported, "rejected": result.rejected,
+                     "errors": result.errors_to_dicts()}
+
+    def update_task(self, payload: Dict, task_id: str):
+        if self.tasks.get_task(int(task_id)) is None:
+            raise ApiError(404, "Task nicht gefunden")
+        fields = self._task_fields(payload)
+        priority = payload.get("priority")
+        try:
+            ok = self.tasks.update_task(int(task_id), priority=None if priority is None else int(priority),
+                                        task_type=payload.get("type"), **fields)
+        except ValueError as e:
+            raise ApiError(422, str(e))
+        if not ok:
+            raise ApiError(422, "Ungültige Task")
+        return 200, {"id": int(task_id)}
+
+    def delete_task(self, payload: Dict, task_id: str):
+        if not self.tasks.delete_task(int(task_id)):
+            raise ApiError(404, "Task nicht gefunden")
+        return 204, None
+
+    def toggle_task(self, payload: Dict, task_id: str):
+        if not self.tasks.toggle_task_completion(int(task_id)):
+            raise ApiError(404, "Task nicht gefunden")
+        return 200, {"id": int(task_id)}
+
+    def restore_task(self, payload: Dict, task_id: str):
+        if not self.tasks.restore_task(int(task_id)):
+            raise ApiError(404, "Task nicht gefunden")
+        return 200, {"id": int(task_id)}
+
+    # --- Kategorien ---
+
+    def list_categories(self, query: Dict[str, str]) -> List[Dict]:
+        return self.categories.get_categories_with_colors()
+
+    def create_category(self, payload: Dict):
+        name = str(payload.get("name", ""))
+        if not self.categories.create_category(name, payload.get("color", "#e8e8e8")):
+            raise ApiError(422, "Kategorie ungültig, doppelt oder Maximum erreicht")
+        return 201, {"name": name.strip()}
+
+    def delete_category(self, payload: Dict, name: str):
+        if name not in self.categories.get_all_categories():
+            raise ApiError(404, "Kategorie nicht gefunden")
+        self.categories.delete_category(name)
+        return 204, None
+
+    # --- Batch ---
+
+    def batch(self, payload):
+        """
+        Führt mehrere Requests nacheinander aus: [{"method", "path", "body"}, ...]
+
+        Alle Änderungen werden gemeinsam gespeichert; jeder Eintrag erhält
+        seinen eigenen Status (kein Rollback bei Fehlern einzelner Einträge).
+        """
+        if not isinstance(payload, list):
+            raise ApiError(400, "Batch erwartet eine Liste")
+        results = []
+        with self.repository.batch():
+            for item in payload:
+                if not isinstance(item, dict) or item.get("path", "").startswith("/batch"):
+                    results.append({"status": 400, "body": {"error": "Ungültiger Eintrag"}})
+                    continue
+                body = item.get("body")
+                status, _, data = self.handle(item.get("method", "GET").upper(), item.get("path", ""),
+                                              json.dumps(body).encode("utf-8") if body is not None else b"")
+                results.append({"status": status, "body": json.loads(data) if data else None})
+        return 200, results
+
+
+class ApiServer:
+    """
+    Asynchroner HTTP/1.1-Server (asyncio, nur Standardbibliothek).
+
+    Verbindungen bleiben offen (Keep-Alive), bis der Client "Connection:
+    close" sendet oder die Verbindung schließt.
+
+    Mit tenants statt app bedient der Server einen Datenbestand pro Mandant:
+    der Header X-Tenant wählt ihn, jede Anfrage hält ihn per lease() offen.
+    Pro geöffnetem Mandanten gibt es eine TaskApi (eigener Listen-Cache);
+    sie fällt mit der Freigabe des Repositorys weg.
+    """
+
+    def __init__(self, app: Optional[ApplicationController] = None, host: str = "127.0.0.1",
+                 port: int = 8765, tenants: Optional["RepositoryManager"] = None):
+        if (app is None) == (tenants is None):
+            raise ValueError("Entweder app oder tenants angeben")
+        self.api = TaskApi(app) if app is not None else None
+        self.tenants = tenants
+        self._apis: Dict[str, TaskApi] = {}
+        self._apis_lock = threading.Lock()
+        if tenants is not None:
+            tenants.add_evict_listener(self._drop_api)
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._writers = set()
+        self._connections = set()
+        self._worker: Optional[ThreadPoolExecutor] = None
+
+    async def start(self) -> int:
+        """Startet den Server und gibt den tatsächlichen Port zurück"""
+        # Die Event-Loop bedient nur Verbindungen; ohne Thread-sicheres Repository bleibt handle() sequenziell
+        # Mandanten-Repositories sind immer Thread-sicher
+        workers = HANDLER_THREADS if self.api is None or self.api.repository.thread_safe else 1
+        self._worker = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-handler")
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    def handle(self, method: str, target: str, body: bytes = b"",
+               headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Bearbeitet einen Request (mit Mandanten: über dessen TaskApi)"""
+        if self.api is not None:
+            return self.api.handle(method, target, body, headers)
+        tenant = (headers or {}).get("x-tenant", "")
+        if not tenant:
+            return TaskApi._json(400, {"error": "Header X-Tenant fehlt"})
+        with self.tenants.lease(tenant) as app:
+            with self._apis_lock:
+                api = self._apis.get(tenant)
+                if api is None or api.app is not app:
+                    api = self._apis[tenant] = TaskApi(app)
+            return api.handle(method, target, body, headers)
+
+    def _drop_api(self, tenant: str) -> None:
+        with self._apis_lock:
+            self._apis.pop(tenant, None)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _serve_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        self._connections.add(asyncio.current_task())
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._write(writer, 400, {}, b"", close=True)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._write(writer, 400, {}, b"", close=True)
+                    break
+                if length > MAX_BODY:
+                    await self._write(writer, 413, {}, b"", close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                connection = headers.get("connection", "").lower()
+                close = connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive")
+                try:
+                    status, extra, data = await asyncio.get_running_loop().run_in_executor(
+                        self._worker, self.handle, method.upper(), target, body, headers)
+                except Exception as e:  # Server bleibt erreichbar
+                    status, extra, data = TaskApi._json(500, {"error": str(e)})
+                await self._write(writer, status, extra, data, close)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            self._connections.discard(asyncio.current_task())
+            writer.close()
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str],
+                     body: bytes, close: bool = False) -> None:
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                 f"Content-Length: {len(body)}",
+                 f"Connection: {'close' if close else 'keep-alive'}"]
+        lines += [f"{key}: {value}" for key, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    # --- Betrieb im Hintergrund (Tests, Einbettung) ---
+
+    def start_in_thread(self) -> int:
+        """Startet den Server in einem eigenen Thread mit eigener Event-Loop"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.port
+
+    def stop(self) -> None:
+        """Beendet einen mit start_in_thread gestarteten Server"""
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            # Offene Keep-Alive-Verbindungen schließen; die Leser sehen EOF
+            for writer in list(self._writers):
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+        self._worker.shutdown(wait=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m api_server", description="Lokale TODO-API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data", type=Path, default=None,
+                        help="Datendatei (Standard: $TODO_DATA_FILE oder todo_data.json)")
+    parser.add_argument("--tenants", type=Path, default=None,
+                        help="Verzeichnis mit einer Datendatei pro Mandant (Header X-Tenant)")
+    parser.add_argument("--idle", type=float, default=600,
+                        help="Mandanten nach so vielen Sekunden ohne Zugriff freigeben")
+    args = parser.parse_args(argv)
+    tenants = None
+    if args.tenants is not None:
+        from tenants import RepositoryManager
+        tenants = RepositoryManager(args.tenants, idle_seconds=args.idle)
+        tenants.start_sweeper()
+        server = ApiServer(host=args.host, port=args.port, tenants=tenants)
+    else:
+        data_file = args.data or Path(os.environ.get("TODO_DATA_FILE", "todo_data.json"))
+        app = ApplicationController(data_file, thread_safe=True)
+        app.warm()
+        server = ApiServer(app, args.host, args.port)
+    print(f"TODO-API auf http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if tenants is not None:
+            tenants.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,165 +1,270 @@
 # Orchestrator der TODO-App
+import os
 import streamlit as st
 from datetime import datetime
 from controller import ApplicationController
-from view import (TaskView, CategoryView, SidebarView, ArchiveView, LayoutView)
+from history import UndoHistory
+from view import (TaskView, CategoryView, SidebarView, ArchiveView, LayoutView, DebugView)
 
-# SESSION STATE INITIALISIERUNG
-if "app_controller" not in st.session_state:
-    st.session_state.app_controller = ApplicationController()
+# Opt-in Instrumentierung (TODO_INSTRUMENT=1), vor dem Anlegen des Controllers.
+# Das Modul (http.server, tracemalloc) wird nur bei Bedarf importiert.
+if os.environ.get("TODO_INSTRUMENT") == "1":
+    from instrumentation import configure_from_env
+    instrumentation = configure_from_env()
+else:
+    instrumentation = None
 
-if "filter_status" not in st.session_state:
-    st.session_state.filter_status = "Alle"
+# Archiv-Einträge pro Seite (ausgelagerte Segmente werden seitenweise entpackt)
+ARCHIVE_PAGE_SIZE = 50
 
-if "filter_category" not in st.session_state:
-    st.session_state.filter_category = "Alle"
 
-if "edit_task_id" not in st.session_state:
-    st.session_state.edit_task_id = None
+@st.cache_resource(show_spinner=False)
+def get_app_controller() -> ApplicationController:
+    """
+    Ein Controller pro Serverprozess, von allen Sessions geteilt.
 
-if "show_archived" not in st.session_state:
-    st.session_state.show_archived = False
+    Der erste Skriptlauf legt ihn an und startet das Laden der Daten im
+    Hintergrund; spätere Sessions finden den Bestand bereits im Speicher.
+    Die Undo-Historie gehört nicht dazu - sie liegt je Session im
+    session_state (siehe main).
+    """
+    # Sessions laufen in eigenen Threads - Lese-/Schreib-Lock statt ungeschützter Lesezugriffe
+    controller = ApplicationController(thread_safe=True)
+    controller.warm()
+    # Optional alte Archiv-Einträge auslagern (TODO_ARCHIVE_DAYS=<Aufbewahrung in Tagen>)
+    archive_days = os.environ.get("TODO_ARCHIVE_DAYS")
+    if archive_days:
+        controller.archive.compact(float(archive_days))
+    # Optional an Fälligkeiten erinnern (TODO_REMINDERS=log | file:<pfad> | http(s)://..., kommagetrennt)
+    reminders = os.environ.get("TODO_REMINDERS")
+    if reminders:
+        from reminders import notifier_from_spec
+        controller.start_reminders([notifier_from_spec(spec) for spec in reminders.split(",")])
+    # Optional im Hintergrund speichern (TODO_WRITE_BEHIND=<max. Verzögerung in s>)
+    delay = os.environ.get("TODO_WRITE_BEHIND")
+    if delay:
+        controller.repository.start_write_behind(float(delay))
+    return controller
 
-if "show_help" not in st.session_state:
-    st.session_state.show_help = False
 
-if "last_save_time" not in st.session_state:
-    st.session_state.last_save_time = None
+def main() -> None:
+    """Ein kompletter Skriptlauf (Streamlit führt ihn bei jeder Interaktion erneut aus)"""
+    # SESSION STATE INITIALISIERUNG
+    if "app_controller" not in st.session_state:
+        st.session_state.app_controller = get_app_controller()
 
-# CONTROLLER INSTANZEN
-app_controller = st.session_state.app_controller
-task_controller = app_controller.get_task_controller()
-category_controller = app_controller.get_category_controller()
+    # Eigene Undo-Historie je Benutzer - das Repository ist geteilt
+    if "undo_history" not in st.session_state:
+        st.session_state.undo_history = UndoHistory()
 
-# STREAMLIT UI
-# Page Config
-st.set_page_config(
-    page_title="To-do App",
-    layout="centered"
-)
+    if "filter_status" not in st.session_state:
+        st.session_state.filter_status = "Alle"
 
-# Responsive CSS
-LayoutView.apply_responsive_css()
+    if "filter_category" not in st.session_state:
+        st.session_state.filter_category = "Alle"
 
-# Header
-LayoutView.render_header(st.session_state.last_save_time)
+    if "edit_task_id" not in st.session_state:
+        st.session_state.edit_task_id = None
 
-# SIDEBAR: FILTER (FR-05)
-with st.sidebar:
-    # liefert dictionary mit filter_status und filter_category
-    filter_result = SidebarView.render_filters(
-        st.session_state.filter_status,
-        st.session_state.filter_category,
-        category_controller.get_all_categories()
-    )
-    st.session_state.filter_status = filter_result["status"]
-    st.session_state.filter_category = filter_result["category"]
-    
-    st.divider()
-    
-    # Kategorie-Management (lambda = anonyme inline-definierte Funktionen)
-    CategoryView.render_category_management(
-        categories_with_colors=category_controller.get_categories_with_colors(),
-        can_add=category_controller.can_add_category(),
-        on_add=lambda name, color: category_controller.create_category(name, color) and st.rerun(),
-        on_delete=lambda name: category_controller.delete_category(name) and st.rerun()
-    )
-    
-    st.divider()
-    
-    # Toggles
-    toggle_result = SidebarView.render_toggles()
-    st.session_state.show_archived = toggle_result["show_archived"]
-    st.session_state.show_help = toggle_result["show_help"]
-
-# HAUPTBEREICH: NEUE AUFGABE
-
-form_data = TaskView.render_task_form(category_controller.get_all_categories())
-
-if form_data["submitted"]:
-    if task_controller.create_task(
-        form_data["title"],
-        form_data["category"],
-        form_data["due_date"]
-    ):
-        st.session_state.last_save_time = datetime.now()
-        st.rerun()
-    else:
-        st.error("Titel erforderlich.")
+    if "show_archived" not in st.session_state:
+        st.session_state.show_archived = False
 
-if st.session_state.show_help:
-    LayoutView.render_help()
+    if "show_help" not in st.session_state:
+        st.session_state.show_help = False
 
-# AUFGABENLISTE (FR-05)
+    if "last_save_time" not in st.session_state:
+        st.session_state.last_save_time = None
 
-st.markdown("### Aufgaben")
+    # CONTROLLER INSTANZEN
+    app_controller = st.session_state.app_controller
+    # Von außen geschriebene Daten (z. B. CLI-Rollback) übernehmen - nur ein stat()
+    app_controller.repository.reload_if_changed()
+    with app_controller.repository.use_history(st.session_state.undo_history):
+        render(app_controller)
 
-# Gefilterte Tasks holen
-filtered_tasks = task_controller.get_filtered_tasks(
-    st.session_state.filter_status if st.session_state.filter_status != "Alle" else None,
-    st.session_state.filter_category
-)
 
-# Edit-Modus prüfen
-if st.session_state.edit_task_id:
-    task_to_edit = task_controller.get_task(st.session_state.edit_task_id)
-    if task_to_edit:
-        edit_data = TaskView.render_edit_form(
-            task_to_edit,
-            category_controller.get_all_categories()
-        )
-        
-        if edit_data["saved"]:
-            if task_controller.update_task(
-                st.session_state.edit_task_id,
-                edit_data["title"],
-                edit_data["category"],
-                edit_data["due_date"]
-            ):
-                st.session_state.edit_task_id = None
-                st.session_state.last_save_time = datetime.now()
-                st.rerun()
-            else:
-                st.error("Titel darf nicht leer sein.")
-        
-        if edit_data["cancelled"]:
-            st.session_state.edit_task_id = None
-            st.rerun()
-else:
-    # Task-Liste rendern
-    TaskView.render_task_list(
-        tasks=filtered_tasks,
-        on_toggle=lambda task_id: (
-            task_controller.toggle_task_completion(task_id),
+def render(app_controller: ApplicationController) -> None:
+    """Baut die Seite auf; Änderungen landen in der Undo-Historie der Session"""
+    task_controller = app_controller.get_task_controller()
+    category_controller = app_controller.get_category_controller()
+
+    # STREAMLIT UI
+    # Page Config
+    st.set_page_config(
+        page_title="To-do App",
+        layout="centered"
+    )
+
+    # Responsive CSS
+    LayoutView.apply_responsive_css()
+
+    # Header
+    LayoutView.render_header(
+        st.session_state.last_save_time,
+        on_undo=lambda: (
+            task_controller.undo(),
             setattr(st.session_state, 'last_save_time', datetime.now()),
             st.rerun()
         ),
-        on_edit=lambda task_id: (
-            setattr(st.session_state, 'edit_task_id', task_id),
-            st.rerun()
-        ),
-        on_delete=lambda task_id: (
-            task_controller.delete_task(task_id),
+        on_redo=lambda: (
+            task_controller.redo(),
             setattr(st.session_state, 'last_save_time', datetime.now()),
             st.rerun()
         ),
-        get_color_func=category_controller.get_category_color
+        can_undo=task_controller.can_undo(),
+        can_redo=task_controller.can_redo(),
+        stats=task_controller.get_statistics()
     )
 
-# ARCHIV
-if st.session_state.show_archived:
-    ArchiveView.render_archive(
-        tasks=task_controller.get_archived_tasks(),
-        on_restore=lambda task_id: (
-            task_controller.restore_task(task_id),
-            setattr(st.session_state, 'last_save_time', datetime.now()),
-            st.rerun()
-        ),
-        on_delete=lambda task_id: (
-            task_controller.delete_task(task_id),
-            setattr(st.session_state, 'last_save_time', datetime.now()),
+    # SIDEBAR: FILTER (FR-05)
+    with st.sidebar:
+        # liefert dictionary mit filter_status und filter_category
+        filter_result = SidebarView.render_filters(
+            st.session_state.filter_status,
+            st.session_state.filter_category,
+            category_controller.get_all_categories()
+        )
+        st.session_state.filter_status = filter_result["status"]
+        st.session_state.filter_category = filter_result["category"]
+
+        st.divider()
+
+        # Nächste Aufgaben aus dem Prioritäts-Index (FR-10)
+        SidebarView.render_next_up(task_controller.get_next_tasks(5))
+
+        # Termine der Woche, Wiederholungen werden nur für das Fenster berechnet
+        SidebarView.render_upcoming(task_controller.get_upcoming(7))
+
+        st.divider()
+
+        # Kategorie-Management (lambda = anonyme inline-definierte Funktionen)
+        CategoryView.render_category_management(
+            categories_with_colors=category_controller.get_categories_with_colors(),
+            can_add=category_controller.can_add_category(),
+            on_add=lambda name, color: category_controller.create_category(name, color) and st.rerun(),
+            on_delete=lambda name: category_controller.delete_category(name) and st.rerun()
+        )
+
+        st.divider()
+
+        # Toggles
+        toggle_result = SidebarView.render_toggles()
+        st.session_state.show_archived = toggle_result["show_archived"]
+        st.session_state.show_help = toggle_result["show_help"]
+
+        if instrumentation is not None and instrumentation.enabled:
+            st.divider()
+            DebugView.render_stats(instrumentation.get_stats(), on_reset=instrumentation.reset)
+
+    # HAUPTBEREICH: NEUE AUFGABE
+
+    form_data = TaskView.render_task_form(category_controller.get_all_categories())
+
+    if form_data["submitted"]:
+        if task_controller.create_task(
+            form_data["title"],
+            form_data["category"],
+            form_data["due_date"],
+            recurrence=form_data["recurrence"]
+        ):
+            st.session_state.last_save_time = datetime.now()
             st.rerun()
-        ),
-        get_color_func=category_controller.get_category_color
+        else:
+            st.error("Titel erforderlich.")
+
+    if st.session_state.show_help:
+        LayoutView.render_help()
+
+    # AUFGABENLISTE (FR-05)
+
+    st.markdown("### Aufgaben")
+
+    # Gefilterte Tasks holen
+    filtered_tasks = task_controller.get_filtered_tasks(
+        st.session_state.filter_status if st.session_state.filter_status != "Alle" else None,
+        st.session_state.filter_category
     )
 
+    # Edit-Modus prüfen
+    if st.session_state.edit_task_id:
+        task_to_edit = task_controller.get_task(st.session_state.edit_task_id)
+        if task_to_edit:
+            edit_data = TaskView.render_edit_form(
+                task_to_edit,
+                category_controller.get_all_categories(),
+                task_controller.get_task_types()
+            )
+
+            if edit_data["saved"]:
+                if task_controller.update_task(
+                    st.session_state.edit_task_id,
+                    edit_data["title"],
+                    edit_data["category"],
+                    edit_data["due_date"],
+                    edit_data["priority"],
+                    edit_data["task_type"]
+                ):
+                    st.session_state.edit_task_id = None
+                    st.session_state.last_save_time = datetime.now()
+                    st.rerun()
+                else:
+                    st.error("Titel darf nicht leer sein.")
+
+            if edit_data["cancelled"]:
+                st.session_state.edit_task_id = None
+                st.rerun()
+    else:
+        # Task-Liste rendern
+        TaskView.render_task_list(
+            tasks=filtered_tasks,
+            on_toggle=lambda task_id: (
+                task_controller.toggle_task_completion(task_id),
+                setattr(st.session_state, 'last_save_time', datetime.now()),
+                st.rerun()
+            ),
+            on_edit=lambda task_id: (
+                setattr(st.session_state, 'edit_task_id', task_id),
+                st.rerun()
+            ),
+            on_delete=lambda task_id: (
+                task_controller.delete_task(task_id),
+                setattr(st.session_state, 'last_save_time', datetime.now()),
+                st.rerun()
+            ),
+            get_color_func=category_controller.get_category_color
+        )
+
+    # ARCHIV
+    if st.session_state.show_archived:
+        archive_page = st.session_state.get("archive_page", 0)
+        archived_tasks, archived_total = task_controller.get_archive_page(archive_page, ARCHIVE_PAGE_SIZE)
+        ArchiveView.render_archive(
+            tasks=archived_tasks,
+            on_restore=lambda task_id: (
+                task_controller.restore_task(task_id),
+                setattr(st.session_state, 'last_save_time', datetime.now()),
+                st.rerun()
+            ),
+            on_delete=lambda task_id: (
+                task_controller.delete_task(task_id),
+                setattr(st.session_state, 'last_save_time', datetime.now()),
+                st.rerun()
+            ),
+            get_color_func=category_controller.get_category_color,
+            page=archive_page,
+            page_count=max(1, -(-archived_total // ARCHIVE_PAGE_SIZE)),
+            on_page=lambda page: (
+                setattr(st.session_state, 'archive_page', page),
+                st.rerun()
+            )
+        )
+
+
+# PROFILING-MODUS (TODO_PROFILE=1 oder ?profile=1): Report pro Rerun unter profiles/
+# Gleiche Regel wie profiling.profiling_requested - cProfile/pstats erst dann laden
+if os.environ.get("TODO_PROFILE") == "1" or st.query_params.get("profile") == "1":
+    from profiling import RerunProfiler
+    with RerunProfiler():
+        main()
+else:
+    main()
@@ -0,0 +1,240 @@
+# ARCHIVE - Aufbewahrung alter erledigter Tasks außerhalb der Hauptdatei
+# Verantwortlichkeiten:
+# - Alte archivierte Tasks in komprimierte Kalt-Segmente auslagern
+# - Kleiner Index (IDs, Anzahl, Zeitraum je Segment) zum Blättern und Finden
+# - Tasks aus dem Kalt-Archiv wiederherstellen oder endgültig löschen
+
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from model import TaskRepository
+
+# Tasks pro Segment - eine Archiv-Seite entpackt höchstens ein bis zwei Segmente
+SEGMENT_SIZE = 2000
+
+
+def _zstd():
+    """zstandard ist optional; ohne das Paket wird gzip verwendet"""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def _compress(payload: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return _zstd().ZstdCompressor(level=10).compress(payload)
+    return gzip.compress(payload, compresslevel=6)
+
+
+def _decompress(payload: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        zstandard = _zstd()
+        if zstandard is None:
+            raise RuntimeError("Segment ist zstd-komprimiert, das Paket zstandard fehlt")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return gzip.decompress(payload)
+
+
+class ColdArchive:
+    """
+    Kalt-Archiv eines TaskRepository unter <name>.archive/.
+
+    compact() verschiebt archivierte Tasks, deren completed_at älter als die
+    Aufbewahrungsfrist ist (oder fehlt, z. B. bei Altbeständen), in
+    komprimierte Segmente; die Hauptdatei bleibt dadurch klein. index.json
+    führt die Segmente (neueste zuerst) mit ihren Task-IDs, sodass beim
+    Blättern nur die benötigten Segmente entpackt werden.
+
+    Für die Beobachter des Repositorys ist das Auslagern ein "delete" und das
+    Zurückholen ein "add". Beides leert die Undo-Historie, da die Tasks den
+    Datenbestand verlassen bzw. außerhalb der Historie zurückkehren.
+    """
+
+    def __init__(self, repository: TaskRepository, directory: Optional[Path] = None,
+                 codec: Optional[str] = None):
+        self.repository = repository
+        data_file = repository.data_file
+        self.directory = directory or data_file.with_name(data_file.stem + ".archive")
+        self.index_file = self.directory / "index.json"
+        self._codec = codec
+        self._index: Optional[List[Dict]] = None
+        self._lock = threading.RLock()
+        # Zählt Änderungen am Index (Cache-Schlüssel für Auswertungen)
+        self.generation = 0
+
+    @property
+    def codec(self) -> str:
+        """Codec für neue Segmente - zstandard wird erst beim ersten Schreiben gesucht"""
+        if self._codec is None:
+            self._codec = "zst" if _zstd() is not None else "gz"
+        return self._codec
+
+    # --- Index und Segmente ---
+
+    @property
+    def segments(self) -> List[Dict]:
+        """Segment-Einträge des Index (wird beim ersten Zugriff gelesen)"""
+        if self._index is None:
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    self._index = json.load(f)["segments"]
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._index = []
+        return self._index
+
+    def _write_index(self) -> None:
+        tmp = self.index_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"segments": self.segments}), encoding="utf-8")
+        os.replace(tmp, self.index_file)
+        self.generation += 1
+
+    def _read_segment(self, entry: Dict) -> List[Dict]:
+        payload = (self.directory / entry["name"]).read_bytes()
+        return json.loads(_decompress(payload, entry["codec"]))
+
+    def _write_segment(self, entry: Dict, tasks: List[Dict]) -> None:
+        payload = json.dumps(tasks, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        path = self.directory / entry["name"]
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(_compress(payload, entry["codec"]))
+        os.replace(tmp, path)
+        entry.update(count=len(tasks), ids=[t["id"] for t in tasks],
+                     newest=tasks[0].get("completed_at"), oldest=tasks[-1].get("completed_at"))
+
+    def _next_name(self) -> str:
+        numbers = [int(e["name"].split("-")[1].split(".")[0]) for e in self.segments]
+        return f"seg-{max(numbers, default=0) + 1:05d}.json.{self.codec}"
+
+    def _locate(self, task_id: int) -> Optional[Dict]:
+        for entry in self.segments:
+            if task_id in entry["ids"]:
+                return entry
+        return None
+
+    def cold_ids(self) -> Set[int]:
+        with self._lock:
+            return {task_id for entry in self.segments for task_id in entry["ids"]}
+
+    def count(self) -> int:
+        """Anzahl ausgelagerter Tasks (nur aus dem Index)"""
+        with self._lock:
+            return sum(entry["count"] for entry in self.segments)
+
+    # --- Auslagern ---
+
+    def compact(self, max_age_days: float, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Lagert archivierte Tasks aus, die länger als max_age_days erledigt sind.
+
+        Die Segmente werden geschrieben, bevor die Tasks die Hauptdatei
+        verlassen - ein Abbruch dazwischen hinterlässt höchstens Doppelte,
+        die der nächste Lauf nur noch aus der Hauptdatei entfernt.
+        """
+        cutoff = ((now or datetime.now()) - timedelta(days=max_age_days)).isoformat(timespec="seconds")
+        repo = self.repository
+        before = repo.data_file.stat().st_size if repo.data_file.exists() else 0
+        with self._lock, repo.batch():
+            old = [t for t in repo.data.get("archived_tasks", [])
+                   if (t.get("completed_at") or "") < cutoff]
+            known = self.cold_ids()
+            fresh = [t for t in old if t["id"] not in known]
+            if fresh:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                new_entries = []
+                for start in range(0, len(fresh), SEGMENT_SIZE):
+                    entry = {"name": self._next_name(), "codec": self.codec}
+                    self._write_segment(entry, fresh[start:start + SEGMENT_SIZE])
+                    self.segments.append(entry)  # für _next_name, Reihenfolge folgt unten
+                    new_entries.append(entry)
+                # Neueste Auslagerung zuerst, innerhalb davon Reihenfolge des Archivs
+                self._index = new_entries + self.segments[:-len(new_entries)]
+                self._write_index()
+            repo.remove_archived({t["id"] for t in old})
+        after = repo.data_file.stat().st_size if repo.data_file.exists() else 0
+        return {"moved": len(old), "segments": len(self.segments),
+                "bytes_before": before, "bytes_after": after}
+
+    # --- Lesen ---
+
+    def page(self, offset: int = 0, limit: int = 50) -> Tuple[List[Dict], int]:
+        """
+        Eine Seite des gesamten Archivs (erst die Hauptdatei, dann die Segmente).
+
+        Gibt (Task-Dicts, Gesamtzahl) zurück; entpackt werden nur Segmente,
+        die die Seite berühren.
+        """
+        with self._lock:
+            hot = list(self.repository.data.get("archived_tasks", []))
+            hot_ids = {t["id"] for t in hot}
+            total = len(hot) + self.count()
+            result = hot[offset:offset + limit]
+            position = len(hot)
+            for entry in self.segments:
+                if len(result) >= limit:
+                    break
+                start = max(offset - position, 0)
+                position += entry["count"]
+                if offset >= position:
+                    continue
+                for task_data in self._read_segment(entry)[start:]:
+                    # Doppelte nach Abbruch: die Fassung der Hauptdatei gewinnt
+                    if task_data["id"] not in hot_ids and len(result) < limit:
+                        result.append(task_data)
+            return result, total
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        """Liest eine ausgelagerte Task"""
+        with self._lock:
+            entry = self._locate(task_id)
+            if entry is None:
+                return None
+            return next(t for t in self._read_segment(entry) if t["id"] == task_id)
+
+    def all_tasks(self) -> List[Dict]:
+        """Alle ausgelagerten Tasks (entpackt jedes Segment - für Auswertungen)"""
+        with self._lock:
+            hot_ids = {t["id"] for t in self.repository.data.get("archived_tasks", [])}
+            return [t for entry in self.segments for t in self._read_segment(entry)
+                    if t["id"] not in hot_ids]
+
+    # --- Wiederherstellen / Löschen ---
+
+    def _remove(self, entry: Dict, task_id: int) -> Dict:
+        tasks = self._read_segment(entry)
+        task_data = next(t for t in tasks if t["id"] == task_id)
+        tasks = [t for t in tasks if t["id"] != task_id]
+        if tasks:
+            self._write_segment(entry, tasks)
+        else:
+            (self.directory / entry["name"]).unlink(missing_ok=True)
+            self.segments.remove(entry)
+        self._write_index()
+        return task_data
+
+    def restore(self, task_id: int) -> bool:
+        """Holt eine ausgelagerte Task als offene Task zurück"""
+        with self._lock:
+            entry = self._locate(task_id)
+            if entry is None:
+                return False
+            task_data = self.get(task_id)
+            # Erst in die Hauptdatei, dann aus dem Segment (kein Verlust bei Abbruch)
+            self.repository.insert_restored(task_data)
+            self._remove(entry, task_id)
+            return True
+
+    def delete(self, task_id: int) -> bool:
+        """Löscht eine ausgelagerte Task endgültig"""
+        with self._lock:
+            entry = self._locate(task_id)
+            if entry is None:
+                return False
+            self._remove(entry, task_id)
+            return True
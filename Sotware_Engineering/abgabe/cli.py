@@ -0,0 +1,327 @@
+# CLI - Kommandozeilen-Zugang ohne Streamlit
+# Verantwortlichkeiten:
+# - Skriptbare Operationen über den ApplicationController (python -m cli ...)
+# - Schneller Start: keine Imports von streamlit / view
+# - Batch-Modus: Kommandos zeilenweise von stdin, ein Speichervorgang am Ende
+
+import argparse
+import json
+import os
+import shlex
+import sys
+from datetime import date
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+from controller import ApplicationController
+from model import Task
+from recurrence import FREQUENCIES, RecurrenceRule
+from snapshots import SnapshotStore
+from validation import BatchValidator
+
+STATUS_CHOICES = ["Alle", "Offen", "Erledigt"]
+
+
+def _task_line(task: Task) -> str:
+    """Einzeilige Textdarstellung einer Task"""
+    mark = "x" if task.completed else " "
+    parts = [f"[{mark}] #{task.id} {task.title}", f"({task.category})", f"P{task.priority}"]
+    if task.due_date:
+        parts.append(f"fällig {task.due_date}")
+    if task.task_type != Task.TYPE:
+        parts.append(task.task_type)
+    if task.recurrence:
+        parts.append("🔁 " + RecurrenceRule.from_dict(task.recurrence).describe())
+    return "  ".join(parts)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument-Parser mit allen Unterbefehlen"""
+    parser = argparse.ArgumentParser(prog="python -m cli", description="TODO-App ohne Oberfläche")
+    parser.add_argument("--data", type=Path, default=None,
+                        help="Datendatei (Standard: $TODO_DATA_FILE oder todo_data.json)")
+    parser.add_argument("--json", action="store_true", help="Ausgabe als JSON")
+    parser.add_argument("--batch", action="store_true",
+                        help="Kommandos zeilenweise von stdin lesen (ein Speichervorgang)")
+    sub = parser.add_subparsers(dest="command")
+
+    sub.add_parser("list", help="Aktive Tasks anzeigen")
+
+    p = sub.add_parser("filter", help="Tasks nach Status/Kategorie filtern")
+    p.add_argument("--status", choices=STATUS_CHOICES, default="Alle")
+    p.add_argument("--category", default="Alle")
+
+    p = sub.add_parser("add", help="Task anlegen")
+    p.add_argument("title")
+    p.add_argument("--category", default="Keine")
+    p.add_argument("--due", type=date.fromisoformat, default=None, help="Fälligkeit (YYYY-MM-DD)")
+    p.add_argument("--priority", type=int, default=Task.DEFAULT_PRIORITY)
+    p.add_argument("--type", dest="task_type", default=Task.TYPE)
+    p.add_argument("--repeat", choices=FREQUENCIES, default=None, help="Wiederholung")
+    p.add_argument("--every", type=int, default=1, help="Abstand der Wiederholung")
+    p.add_argument("--weekdays", type=lambda v: [int(d) for d in v.split(",")], default=None,
+                   help="Wochentage für --repeat custom, z. B. 0,3 (0 = Montag)")
+
+    for name, help_text in (("complete", "Task erledigen (ins Archiv)"),
+                            ("restore", "Archivierte Task wiederherstellen"),
+                            ("delete", "Task löschen")):
+        sub.add_parser(name, help=help_text).add_argument("id", type=int)
+
+    p = sub.add_parser("archive", help="Archivierte Tasks anzeigen (inkl. ausgelagerter)")
+    p.add_argument("--page", type=int, default=0)
+    p.add_argument("--page-size", type=int, default=0, help="Einträge pro Seite (0 = alle)")
+
+    p = sub.add_parser("import", help="Tasks aus JSON-Datei importieren")
+    p.add_argument("file", type=Path)
+
+    p = sub.add_parser("export", help="Tasks als JSON exportieren (Standard: stdout)")
+    p.add_argument("file", type=Path, nargs="?")
+
+    p = sub.add_parser("compact", help="Datendatei aufräumen und neu schreiben")
+    p.add_argument("--archive-days", type=float, default=None,
+                   help="Archivierte Tasks älter als N Tage ins Kalt-Archiv auslagern")
+    sub.add_parser("stats", help="Kennzahlen anzeigen")
+    p = sub.add_parser("trends", help="Durchsatz pro Woche, Durchlaufzeit und Verspätung je Kategorie")
+    p.add_argument("--weeks", type=int, default=12)
+
+    p = sub.add_parser("snapshot", help="Snapshot des aktuellen Stands anlegen")
+    p.add_argument("--label", default=None)
+    sub.add_parser("snapshots", help="Snapshots auflisten")
+    p = sub.add_parser("diff", help="Zwei Snapshots vergleichen (ohne zweiten: mit aktuellem Stand)")
+    p.add_argument("old")
+    p.add_argument("new", nargs="?")
+    p = sub.add_parser("rollback", help="Snapshot wiederherstellen (aktueller Stand wird gesichert)")
+    p.add_argument("snapshot")
+    p = sub.add_parser("prune", help="Nur die neuesten Snapshots behalten")
+    p.add_argument("--keep", type=int, default=10)
+    return parser
+
+
+class CommandLine:
+    """Führt CLI-Kommandos gegen einen ApplicationController aus"""
+
+    def __init__(self, app: ApplicationController, as_json: bool = False,
+                 out: Optional[TextIO] = None):
+        self.app = app
+        self.tasks = app.get_task_controller()
+        self.categories = app.get_category_controller()
+        self.as_json = as_json
+        self.out = out or sys.stdout
+
+    def emit(self, result, lines: Optional[List[str]] = None) -> None:
+        """Gibt ein Ergebnis als JSON oder als Textzeilen aus"""
+        if self.as_json:
+            self.out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        else:
+            for line in (lines if lines is not None else [str(result)]):
+                self.out.write(line + "\n")
+
+    def _emit_tasks(self, tasks: List[Task]) -> None:
+        self.emit([t.to_dict() for t in tasks], [_task_line(t) for t in tasks])
+
+    def run(self, args: argparse.Namespace) -> int:
+        """Führt ein geparstes Kommando aus (Rückgabe: Exit-Code)"""
+        handler = getattr(self, f"cmd_{args.command}", None)
+        if handler is None:
+            self.emit({"error": "Kein Kommando angegeben"}, ["Kein Kommando angegeben"])
+            return 2
+        return handler(args)
+
+    def _status(self, ok: bool, action: str, task_id: int) -> int:
+        message = f"Task #{task_id} {action}" if ok else f"Task #{task_id} nicht gefunden"
+        self.emit({"ok": ok, "id": task_id}, [message])
+        return 0 if ok else 1
+
+    def cmd_list(self, args) -> int:
+        self._emit_tasks(self.tasks.get_all_tasks())
+        return 0
+
+    def cmd_filter(self, args) -> int:
+        self._emit_tasks(self.tasks.get_filtered_tasks(args.status, args.category))
+        return 0
+
+    def cmd_add(self, args) -> int:
+        if args.category not in self.categories.get_all_categories():
+            self.emit({"ok": False, "error": "Unbekannte Kategorie"},
+                      [f"Unbekannte Kategorie: {args.category}"])
+            return 1
+        try:
+            rule = RecurrenceRule(args.repeat, args.every, args.weekdays) if args.repeat else None
+            task_id = self.tasks.create_task_with_id(args.title, args.category, args.due,
+                                                     args.priority, args.task_type, rule)
+        except ValueError as e:
+            self.emit({"ok": False, "error": str(e)}, [str(e)])
+            return 1
+        if task_id is None:
+            self.emit({"ok": False, "error": "Ungültige Task"}, ["Ungültige Task"])
+            return 1
+        self.emit({"ok": True, "id": task_id}, [f"Task #{task_id} angelegt"])
+        return 0
+
+    def cmd_complete(self, args) -> int:
+        # Nur offene Tasks - toggle würde sonst nichts tun
+        if self.tasks.get_task(args.id) is None:
+            return self._status(False, "", args.id)
+        return self._status(self.tasks.toggle_task_completion(args.id), "erledigt", args.id)
+
+    def cmd_restore(self, args) -> int:
+        return self._status(self.tasks.restore_task(args.id), "wiederhergestellt", args.id)
+
+    def cmd_delete(self, args) -> int:
+        return self._status(self.tasks.delete_task(args.id), "gelöscht", args.id)
+
+    def cmd_archive(self, args) -> int:
+        if args.page_size > 0:
+            tasks, _ = self.tasks.get_archive_page(args.page, args.page_size)
+        else:
+            tasks, _ = self.tasks.get_archive_page(0, sys.maxsize)
+        self._emit_tasks(tasks)
+        return 0
+
+    def cmd_import(self, args) -> int:
+        with open(args.file, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        # Liste von Tasks oder ein Export/Datenbestand mit tasks/archived_tasks
+        if isinstance(payload, dict):
+            payload = payload.get("tasks", []) + payload.get("archived_tasks", [])
+        result = BatchValidator(self.categories.get_all_categories()).validate(payload)
+        imported = self.app.repository.add_tasks(result.tasks(), result.extra_fields)
+        self.emit({"imported": imported, "rejected": result.rejected, "errors": result.errors_to_dicts()},
+                  [f"{imported} Tasks importiert, {result.rejected} verworfen"]
+                  + [f"  #{index}: {message}" for index, message in result.errors])
+        return 0
+
+    def cmd_export(self, args) -> int:
+        payload = {
+            "tasks": [t.to_dict() for t in self.tasks.get_all_tasks()],
+            "archived_tasks": [t.to_dict() for t in self.tasks.get_archived_tasks()],
+            "categories": self.categories.get_categories_with_colors()
+        }
+        text = json.dumps(payload, ensure_ascii=False, indent=2)
+        if args.file is None:
+            self.out.write(text + "\n")
+            return 0
+        args.file.write_text(text, encoding="utf-8")
+        count = len(payload["tasks"]) + len(payload["archived_tasks"])
+        self.emit({"exported": count, "file": str(args.file)},
+                  [f"{count} Tasks nach {args.file} exportiert"])
+        return 0
+
+    def cmd_compact(self, args) -> int:
+        moved = None
+        if args.archive_days is not None:
+            moved = self.app.archive.compact(args.archive_days)
+        result = self.app.repository.compact()
+        lines = [f"{result['bytes_before']} → {result['bytes_after']} Bytes"]
+        if moved is not None:
+            result["bytes_before"] = moved["bytes_before"]
+            result.update(moved=moved["moved"], segments=moved["segments"])
+            lines = [f"{moved['moved']} Tasks ausgelagert ({moved['segments']} Segmente)",
+                     f"{result['bytes_before']} → {result['bytes_after']} Bytes"]
+        self.emit(result, lines)
+        return 0
+
+    def cmd_stats(self, args) -> int:
+        stats = self.tasks.get_statistics()
+        stats["urgent"] = len(self.tasks.get_urgent_tasks())
+        stats["categories"] = len(self.categories.get_all_categories())
+        lines = [f"Offen: {stats['open']}", f"Archiviert: {stats['archived']}",
+                 f"Dringend: {stats['urgent']}", f"Überfällig: {stats['overdue']}",
+                 f"Diese Woche fällig: {stats['due_this_week']}",
+                 f"Heute erledigt: {stats['completed_today']}", f"Kategorien: {stats['categories']}"]
+        lines += [f"  {name}: {n}" for name, n in sorted(stats["open_per_category"].items())]
+        self.emit(stats, lines)
+        return 0
+
+    def cmd_trends(self, args) -> int:
+        report = self.tasks.get_analytics(args.weeks)
+        lines = [f"{report['tasks']} erledigte Tasks, Wochen ab {report['weeks'][0]}"]
+        for name in sorted(set(report["throughput"]) | set(report["lead_time_days"])):
+            weekly = report["throughput"].get(name, [0] * args.weeks)
+            lead = report["lead_time_days"].get(name)
+            rate = report["overdue_rate"].get(name)
+            lines.append(f"{name}: {' '.join(str(n) for n in weekly)}"
+                         + (f" | Ø {lead['mean']} Tage (Median {lead['median']})" if lead else "")
+                         + (f" | verspätet {rate:.0%}" if rate is not None else ""))
+        self.emit(report, lines)
+        return 0
+
+    def _snapshot_call(self, method, *args):
+        """Snapshot-Operation; unbekannte Snapshots werden als Fehler gemeldet"""
+        try:
+            return method(*args), 0
+        except KeyError as e:
+            message = e.args[0]
+            self.emit({"ok": False, "error": message}, [message])
+            return None, 1
+
+    def cmd_snapshot(self, args) -> int:
+        info = SnapshotStore(self.app.repository).create(args.label)
+        self.emit(info, [f"Snapshot {info['id']} angelegt ({info['new_objects']} neue Fassungen)"])
+        return 0
+
+    def cmd_snapshots(self, args) -> int:
+        infos = SnapshotStore(self.app.repository).get_snapshots()
+        self.emit(infos, [f"{i['id']}  {i['counts']['tasks']} offen / "
+                          f"{i['counts']['archived_tasks']} archiviert  {i['label'] or ''}".rstrip()
+                          for i in infos])
+        return 0
+
+    def cmd_diff(self, args) -> int:
+        store = SnapshotStore(self.app.repository)
+        result, code = self._snapshot_call(store.diff, args.old, args.new)
+        if result is not None:
+            self.emit(result, [f"{kind}: {', '.join(f'#{i}' for i in ids) or '-'}"
+                               for kind, ids in result.items()])
+        return code
+
+    def cmd_rollback(self, args) -> int:
+        store = SnapshotStore(self.app.repository)
+        result, code = self._snapshot_call(store.restore, args.snapshot)
+        if result is not None:
+            self.emit(result, [f"Snapshot {result['restored']} wiederhergestellt "
+                               f"(vorheriger Stand: {result['backup']})"])
+        return code
+
+    def cmd_prune(self, args) -> int:
+        result = SnapshotStore(self.app.repository).prune(args.keep)
+        self.emit(result, [f"{result['removed']} Snapshots entfernt, "
+                           f"{result['objects_before']} → {result['objects_after']} Fassungen"])
+        return 0
+
+    def run_batch(self, parser: argparse.ArgumentParser, lines: TextIO) -> int:
+        """
+        Führt Kommandos zeilenweise aus (leere Zeilen und # werden übersprungen).
+
+        Alle Änderungen landen in einem einzigen Speichervorgang am Ende.
+        Exit-Code ist der höchste Code aller Zeilen.
+        """
+        worst = 0
+        with self.app.repository.batch():
+            for number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    args = parser.parse_args(shlex.split(line))
+                except SystemExit:
+                    self.emit({"error": f"Zeile {number}: ungültiges Kommando"},
+                              [f"Zeile {number}: ungültiges Kommando"])
+                    worst = max(worst, 2)
+                    continue
+                worst = max(worst, self.run(args))
+        return worst
+
+
+def main(argv: Optional[List[str]] = None, stdin: Optional[TextIO] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    data_file = args.data or Path(os.environ.get("TODO_DATA_FILE", "todo_data.json"))
+    cli = CommandLine(ApplicationController(data_file), as_json=args.json)
+    if args.batch:
+        return cli.run_batch(parser, stdin or sys.stdin)
+    return cli.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
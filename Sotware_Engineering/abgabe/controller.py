@@ -4,27 +4,63 @@
 # - Geschäftslogik für CRUD-Operationen
 # - Event-Handling und Datenfluss-Steuerung
 
-from datetime import date
-from typing import List, Optional, Dict
-from model import Task, Category, TaskRepository
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Dict, Tuple
+from model import Task, Category, TaskRepository, TaskTypeFactory
+from recurrence import RecurrenceRule
+
+# Optionale Module erst bei Bedarf importieren (Kaltstart der App)
+if TYPE_CHECKING:
+    from archive import ColdArchive
+    from analytics import TaskAnalytics
+    from reminders import Notifier, ReminderScheduler
 
 
 class TaskController:
     """Controller für Task-Operationen"""
     
-    def __init__(self, repository: TaskRepository):
+    def __init__(self, repository: TaskRepository, archive: Optional["ColdArchive"] = None):
         self.repository = repository
+        self.archive = archive
+        self._analytics: Optional["TaskAnalytics"] = None
+    
+    @property
+    def analytics(self) -> "TaskAnalytics":
+        """Auswertungen - Modul wird erst beim ersten Bericht importiert"""
+        if self._analytics is None:
+            from analytics import TaskAnalytics
+            self._analytics = TaskAnalytics(self.repository, self.archive)
+        return self._analytics
     
     def create_task(self, title: str, category: str = "Keine", 
-                   due_date: Optional[date] = None) -> bool:
-        """Erstellt eine neue Task"""
-        task = Task(
+                   due_date: Optional[date] = None,
+                   priority: int = Task.DEFAULT_PRIORITY,
+                   task_type: str = Task.TYPE,
+                   recurrence: Optional[RecurrenceRule] = None) -> bool:
+        """Erstellt eine neue Task des gewünschten Typs (optional wiederkehrend)"""
+        return self.create_task_with_id(title, category, due_date, priority, task_type,
+                                        recurrence) is not None
+    
+    def create_task_with_id(self, title: str, category: str = "Keine",
+                            due_date: Optional[date] = None,
+                            priority: int = Task.DEFAULT_PRIORITY,
+                            task_type: str = Task.TYPE,
+                            recurrence: Optional[RecurrenceRule] = None) -> Optional[int]:
+        """Wie create_task, gibt aber die vergebene ID zurück (None bei ungültiger Task)"""
+        if recurrence is not None and due_date is None:
+            due_date = date.today()  # Serie beginnt heute
+        task = TaskTypeFactory.create_task(
+            task_type,
             id=0,  # Wird vom Repository gesetzt
             title=title.strip(),
             category=category,
-            due_date=due_date.isoformat() if due_date else None
+            due_date=due_date.isoformat() if due_date else None,
+            priority=priority,
+            recurrence=recurrence.to_dict() if recurrence else None
         )
-        return self.repository.add_task(task)
+        return task.id if self.repository.add_task(task) else None
 
 
     def get_all_tasks(self) -> List[Task]:
@@ -44,18 +80,64 @@ class TaskController:
         """Gibt archivierte Tasks zurück"""
         return self.repository.get_archived_tasks()
     
+    def get_archive_page(self, page: int, page_size: int = 50) -> Tuple[List[Task], int]:
+        """Eine Seite des Archivs inkl. ausgelagerter Tasks: (Tasks, Gesamtzahl)"""
+        if self.archive is None:
+            tasks = self.repository.get_archived_tasks()
+            return tasks[page * page_size:(page + 1) * page_size], len(tasks)
+        rows, total = self.archive.page(page * page_size, page_size)
+        return TaskTypeFactory.from_dicts(rows), total
+    
     def get_urgent_tasks(self) -> List[Task]:
         """Gibt dringliche Tasks zurück"""
         return self.repository.get_urgent_tasks()
     
+    def get_statistics(self) -> Dict:
+        """Dashboard-Kennzahlen (inkl. ausgelagerter Archiv-Einträge)"""
+        stats = self.repository.get_statistics()
+        stats["cold_archived"] = self.archive.count() if self.archive is not None else 0
+        stats["archived"] += stats["cold_archived"]
+        return stats
+    
+    def get_analytics(self, weeks: int = 12) -> Dict:
+        """Durchsatz, Durchlaufzeit und Verspätungsquote je Kategorie (bis zur nächsten Änderung gecacht)"""
+        return self.analytics.report(weeks)
+    
+    def get_upcoming(self, days: int = 7) -> List[Tuple[date, Task]]:
+        """Termine der nächsten Tage inkl. künftiger Wiederholungen (nicht angelegt)"""
+        today = date.today()
+        return self.repository.get_occurrences(today, today + timedelta(days=days - 1))
+    
+    def set_recurrence(self, task_id: int, rule: Optional[RecurrenceRule]) -> bool:
+        """Macht eine Task wiederkehrend (rule=None: wieder einmalig)"""
+        return self.repository.set_recurrence(task_id, rule)
+    
+    def get_next_tasks(self, limit: int = 5) -> List[Task]:
+        """Gibt die als Nächstes zu erledigenden Tasks zurück (FR-10)"""
+        return self.repository.get_next_tasks(limit)
+    
+    def get_task_types(self) -> List[str]:
+        """Gibt die verfügbaren Task-Typen zurück"""
+        return TaskTypeFactory.get_type_names()
+    
     def update_task(self, task_id: int, title: str, category: str,
-                   due_date: Optional[date] = None) -> bool:
-        """Aktualisiert eine Task (FR-03)"""
-        task = Task(
+                   due_date: Optional[date] = None,
+                   priority: Optional[int] = None,
+                   task_type: Optional[str] = None) -> bool:
+        """Aktualisiert eine Task (FR-03) - ohne Priorität/Typ bleiben die bisherigen"""
+        if priority is None or task_type is None:
+            existing = self.repository.get_task_by_id(task_id)
+            if priority is None:
+                priority = existing.priority if existing else Task.DEFAULT_PRIORITY
+            if task_type is None:
+                task_type = existing.task_type if existing else Task.TYPE
+        task = TaskTypeFactory.create_task(
+            task_type,
             id=task_id,
             title=title.strip(),
             category=category,
-            due_date=due_date.isoformat() if due_date else None
+            due_date=due_date.isoformat() if due_date else None,
+            priority=priority
         )
         return self.repository.update_task(task)
     
@@ -64,12 +146,30 @@ class TaskController:
         return self.repository.toggle_task_completion(task_id)
     
     def restore_task(self, task_id: int) -> bool:
-        """Stellt archivierte Task wieder her"""
-        return self.repository.restore_task(task_id)
+        """Stellt archivierte Task wieder her (auch aus dem Kalt-Archiv)"""
+        if self.repository.restore_task(task_id):
+            return True
+        return self.archive is not None and self.archive.restore(task_id)
         
     def delete_task(self, task_id: int) -> bool:
         """Löscht eine Task (FR-02)"""
-        return self.repository.delete_task(task_id)
+        if self.repository.delete_task(task_id):
+            return True
+        return self.archive is not None and self.archive.delete(task_id)
+
+    def undo(self) -> bool:
+        """Macht die letzte Änderung rückgängig"""
+        return self.repository.undo()
+
+    def redo(self) -> bool:
+        """Wiederholt die zuletzt rückgängig gemachte Änderung"""
+        return self.repository.redo()
+
+    def can_undo(self) -> bool:
+        return self.repository.can_undo()
+
+    def can_redo(self) -> bool:
+        return self.repository.can_redo()
     
 
 class CategoryController:
@@ -107,10 +207,37 @@ class CategoryController:
 class ApplicationController:
     """Haupt-Controller der Anwendung"""
     
-    def __init__(self):
-        self.repository = TaskRepository()
-        self.task_controller = TaskController(self.repository)
+    def __init__(self, data_file: Optional[Path] = None,
+                 repository: Optional[TaskRepository] = None, thread_safe: bool = False,
+                 id_block: Optional[int] = None):
+        if repository is None:
+            repository = TaskRepository(data_file or Path("todo_data.json"), thread_safe)
+        self.repository = repository
+        # Opt-in: IDs blockweise aus <name>.ids reservieren (TODO_ID_BLOCK=<Blockgröße>).
+        # Verhindert nur doppelte IDs, wenn mehrere Prozesse dieselbe Datei beschreiben - jeder
+        # speichert weiterhin seinen ganzen Stand (zuletzt gespeichert gewinnt). Nicht genutzte
+        # IDs eines Blocks bleiben beim Prozessende als Lücke (bis Blockgröße - 1).
+        id_block = int(os.environ.get("TODO_ID_BLOCK", id_block or 0))
+        if id_block:
+            repository.use_shared_ids(id_block)
+        # Kalt-Archiv wird schon für die Kennzahlen des ersten Renderns gebraucht (nur index.json)
+        from archive import ColdArchive
+        self.archive = ColdArchive(repository)
+        self.task_controller = TaskController(self.repository, self.archive)
         self.category_controller = CategoryController(self.repository)
+        self.reminders: Optional["ReminderScheduler"] = None
+    
+    def start_reminders(self, notifiers: List["Notifier"]) -> "ReminderScheduler":
+        """Startet Erinnerungen an fällige Tasks im Hintergrund"""
+        if self.reminders is None:
+            from reminders import ReminderScheduler
+            self.reminders = ReminderScheduler(self.repository, notifiers)
+            self.reminders.start()
+        return self.reminders
+    
+    def warm(self) -> None:
+        """Lädt die Daten im Hintergrund vor, bevor die erste Ansicht sie braucht"""
+        self.repository.warm()
     
     def get_task_controller(self) -> TaskController:
         """Gibt Task-Controller zurück"""
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Optional
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
 
 
 # 1. CLIENT-SCHNITTSTELLE (Interface das der Client erwartet)
@@ -13,6 +14,8 @@ class TaskInterface(ABC):
     Das entspricht dem Format unserer internen Task-Klasse aus model.py.
     """
     
+    __slots__ = ()  # erlaubt Subklassen mit __slots__ ohne Instanz-__dict__
+    
     @property
     @abstractmethod
     def id(self) -> int:
@@ -92,9 +95,23 @@ class ExternalProjectAPI:
     unserer internen Task-Klasse kompatibel ist.
     """
     
-    def __init__(self):
-        # Simulierte externe Daten
-        self._external_tasks = [
+    def __init__(self, tasks: Optional[List[ExternalTask]] = None):
+        if tasks is None:
+            tasks = self._demo_tasks()
+        self._external_tasks = list(tasks)
+        # Index task_id → Task für Einzel- und Batch-Abrufe in O(1)
+        self._by_id: Dict[str, ExternalTask] = {t.task_id: t for t in self._external_tasks}
+        # Änderungsprotokoll: jede Änderung erhält eine fortlaufende Revision
+        self._revision = 0
+        self._change_revisions: List[int] = []
+        self._change_ids: List[str] = []
+        for task in self._external_tasks:
+            self._log_change(task.task_id)
+    
+    @staticmethod
+    def _demo_tasks() -> List[ExternalTask]:
+        """Simulierte externe Daten"""
+        return [
             ExternalTask(
                 task_id="PM-001",
                 task_name="Backend API refactoren",
@@ -133,12 +150,61 @@ class ExternalProjectAPI:
         """Holt alle Aufgaben von der externen API"""
         return self._external_tasks
     
+    def fetch_page(self, page: int, page_size: int) -> List[ExternalTask]:
+        """Holt eine Seite von Aufgaben (wie eine paginierte REST-API)"""
+        start = page * page_size
+        return self._external_tasks[start:start + page_size]
+    
     def fetch_task_by_id(self, task_id: str) -> Optional[ExternalTask]:
         """Holt eine einzelne Aufgabe nach ID"""
-        for task in self._external_tasks:
-            if task.task_id == task_id:
-                return task
-        return None
+        return self._by_id.get(task_id)
+    
+    def fetch_tasks_by_ids(self, task_ids: List[str]) -> List[ExternalTask]:
+        """Holt mehrere Aufgaben in einem Aufruf (unbekannte IDs werden übersprungen)"""
+        by_id = self._by_id
+        return [by_id[task_id] for task_id in task_ids if task_id in by_id]
+    
+    # --- Änderungs-Feed (inkrementelle Synchronisation) ---
+    
+    def _log_change(self, task_id: str) -> None:
+        """Vermerkt eine Änderung im Protokoll"""
+        self._revision += 1
+        self._change_revisions.append(self._revision)
+        self._change_ids.append(task_id)
+    
+    def fetch_changes(self, since: Optional[str] = None) -> Tuple[List[ExternalTask], str]:
+        """
+        Holt alle seit dem Token geänderten Aufgaben (wie ETag/High-Water-Mark).
+        
+        Returns:
+            (geänderte Aufgaben, neues Token für den nächsten Abruf)
+        """
+        token = str(self._revision)
+        if since is None:
+            return list(self._external_tasks), token
+        start = bisect_right(self._change_revisions, int(since))
+        changed_ids = list(dict.fromkeys(self._change_ids[start:]))
+        return self.fetch_tasks_by_ids(changed_ids), token
+    
+    def add_task(self, task: ExternalTask) -> None:
+        """Legt eine Aufgabe in der externen Quelle an"""
+        self._external_tasks.append(task)
+        self._by_id[task.task_id] = task
+        self._log_change(task.task_id)
+    
+    def update_task(self, task_id: str, **changes) -> bool:
+        """Ändert Felder einer externen Aufgabe (z. B. task_name, status)"""
+        task = self.fetch_task_by_id(task_id)
+        if task is None:
+            return False
+        for field, value in changes.items():
+            setattr(task, field, value)
+        self._log_change(task_id)
+        return True
+    
+    def set_status(self, task_id: str, status: str) -> bool:
+        """Meldet einen Status ("open"/"done") an die externe Quelle zurück"""
+        return self.update_task(task_id, status=status)
 
 
 # 3. ADAPTER (Übersetzt zwischen externem und internem Format)
@@ -154,8 +220,15 @@ class ExternalTaskAdapter(TaskInterface):
     
     So kann der Client mit externen Tasks arbeiten, ohne zu wissen,
     dass sie aus einer anderen Quelle stammen!
+    
+    Abgeleitete Felder (Fälligkeitsdatum, Dringlichkeit) werden beim ersten
+    Zugriff berechnet und zwischengespeichert; __slots__ hält große
+    Adapter-Listen klein.
     """
     
+    __slots__ = ("_external", "_internal_id", "_deadline", "_due", "_due_iso",
+                 "_urgent_day", "_urgent")
+    
     def __init__(self, external_task: ExternalTask, internal_id: int):
         """
         Args:
@@ -164,6 +237,21 @@ class ExternalTaskAdapter(TaskInterface):
         """
         self._external = external_task
         self._internal_id = internal_id
+        self._deadline = None
+        self._due: Optional[date] = None
+        self._due_iso: Optional[str] = None
+        self._urgent_day: Optional[date] = None
+        self._urgent = False
+    
+    def _due_day(self) -> Optional[date]:
+        """Konvertiert die Deadline nur neu, wenn sie sich geändert hat"""
+        deadline = self._external.deadline
+        if deadline is not self._deadline:
+            self._deadline = deadline
+            self._due = deadline.date() if deadline is not None else None
+            self._due_iso = self._due.isoformat() if self._due is not None else None
+            self._urgent_day = None
+        return self._due
     
     # --- Property-Übersetzungen ---
     
@@ -190,9 +278,8 @@ class ExternalTaskAdapter(TaskInterface):
     @property
     def due_date(self) -> Optional[str]:
         """Übersetzt deadline (datetime) zu due_date (ISO-string)"""
-        if self._external.deadline is None:
-            return None
-        return self._external.deadline.date().isoformat()
+        self._due_day()
+        return self._due_iso
     
     # --- Methoden-Implementierungen ---
     
@@ -202,12 +289,15 @@ class ExternalTaskAdapter(TaskInterface):
     
     def is_urgent(self) -> bool:
         """Prüft ob Aufgabe dringlich ist (heute oder morgen fällig)"""
-        if self._external.deadline is None:
+        due = self._due_day()
+        if due is None:
             return False
-        due = self._external.deadline.date()
         today = date.today()
-        tomorrow = today + timedelta(days=1)
-        return due == today or due == tomorrow
+        # Ergebnis gilt bis Mitternacht
+        if self._urgent_day != today:
+            self._urgent_day = today
+            self._urgent = due == today or due == today + timedelta(days=1)
+        return self._urgent
     
     def to_dict(self) -> Dict:
         """Serialisiert in das interne Dictionary-Format"""
@@ -216,7 +306,8 @@ class ExternalTaskAdapter(TaskInterface):
             "title": self.title,
             "completed": self.completed,
             "category": self.category,
-            "due_date": self.due_date
+            "due_date": self.due_date,
+            "priority": self.get_priority()
         }
     
     # --- Zusätzliche Methode für externe Daten ---
@@ -226,7 +317,7 @@ class ExternalTaskAdapter(TaskInterface):
         return self._external.task_id
     
     def get_priority(self) -> int:
-        """Gibt die Priorität zurück (nur extern verfügbar)"""
+        """Gibt die Priorität zurück (1-5, intern als Task.priority gespeichert)"""
         return self._external.priority
 
 
@@ -0,0 +1,115 @@
+# HISTORY - Rückgängig/Wiederholen für das TaskRepository
+# Verantwortlichkeiten:
+# - Änderungen als kleine inverse Deltas statt als Kopien des Datenbestands
+# - Undo- und Redo-Stapel, begrenzt nach Anzahl Schritte und Bytes
+
+import json
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, List, Optional, Tuple
+
+# Ein Delta ist ein Tupel, z. B. ("insert", "tasks", 3, task_data);
+# ein Schritt ist die Liste der Deltas einer Benutzeraktion
+Step = List[Tuple]
+
+
+def step_size(step: Step) -> int:
+    """Ungefährer Speicherbedarf eines Schritts in Bytes (JSON-Länge)"""
+    return sum(len(json.dumps(delta, ensure_ascii=False, default=str)) for delta in step)
+
+
+class UndoHistory:
+    """
+    Sammelt die inversen Deltas eines Schritts und verwaltet die Stapel.
+
+    begin()/commit() klammern eine Aktion (verschachtelbar). Eine neue Aktion
+    leert den Redo-Stapel. Werden die Grenzen überschritten, fallen die
+    ältesten Schritte weg; ein einzelner Schritt über dem Byte-Budget leert
+    die Historie, da ältere Schritte ohne ihn nicht mehr anwendbar wären.
+    Gleiches gilt für Änderungen, die sich nicht als Deltas abbilden lassen
+    (invalidate()).
+    """
+
+    def __init__(self, max_steps: int = 100, max_bytes: int = 2_000_000):
+        self.max_steps = max_steps
+        self.max_bytes = max_bytes
+        self._undo: Deque[Tuple[Step, int]] = deque()
+        self._redo: Deque[Tuple[Step, int]] = deque()
+        self._current: Optional[Step] = None
+        self._depth = 0
+        self._invalid = False
+
+    def begin(self) -> None:
+        """Beginnt eine Aktion"""
+        self._depth += 1
+        if self._depth == 1:
+            self._current = []
+            self._invalid = False
+
+    def record(self, delta: Tuple) -> None:
+        """Merkt ein inverses Delta der laufenden Aktion"""
+        if self._current is not None:
+            self._current.append(delta)
+
+    def invalidate(self) -> None:
+        """Die laufende Aktion ist nicht umkehrbar - Historie wird verworfen"""
+        self._invalid = True
+
+    def commit(self) -> None:
+        """Schließt eine Aktion ab und legt ihren Schritt auf den Undo-Stapel"""
+        self._depth -= 1
+        if self._depth:
+            return
+        step, self._current = self._current, None
+        if self._invalid:
+            self.clear()
+        elif step:
+            self._redo.clear()
+            self._push(self._undo, step)
+
+    @contextmanager
+    def capture(self):
+        """Zeichnet die Deltas beim Anwenden eines Schritts auf (für den Gegen-Stapel)"""
+        outer, self._current = self._current, []
+        try:
+            yield self._current
+        finally:
+            self._current = outer
+
+    def _push(self, stack: Deque, step: Step) -> None:
+        size = step_size(step)
+        if size > self.max_bytes:
+            self.clear()
+            return
+        stack.append((step, size))
+        while len(stack) > self.max_steps or sum(s for _, s in stack) > self.max_bytes:
+            stack.popleft()
+
+    def pop_undo(self) -> Optional[Step]:
+        return self._undo.pop()[0] if self._undo else None
+
+    def pop_redo(self) -> Optional[Step]:
+        return self._redo.pop()[0] if self._redo else None
+
+    def push_undo(self, step: Step) -> None:
+        self._push(self._undo, step)
+
+    def push_redo(self, step: Step) -> None:
+        self._push(self._redo, step)
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self) -> None:
+        """Verwirft Undo- und Redo-Stapel"""
+        self._undo.clear()
+        self._redo.clear()
+
+    def get_stats(self) -> dict:
+        """Anzahl Schritte und Bytes je Stapel"""
+        return {"undo_steps": len(self._undo), "redo_steps": len(self._redo),
+                "undo_bytes": sum(s for _, s in self._undo),
+                "redo_bytes": sum(s for _, s in self._redo)}
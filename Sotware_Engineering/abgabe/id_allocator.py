@@ -0,0 +1,101 @@
+# ID_ALLOCATOR - Eindeutige Task-IDs über Sitzungen und Prozesse hinweg
+# Verantwortlichkeiten:
+# - ID-Blöcke aus einer gemeinsamen Zählerdatei reservieren (Datei-Lock)
+# - IDs aus dem reservierten Block ohne Datei-Zugriff vergeben
+# - Nie unter den next_id eines bestehenden Datenbestands fallen
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Tuple
+
+
+@contextmanager
+def _locked(path: Path):
+    """Exklusiver Datei-Lock über Prozesse hinweg (fcntl bzw. msvcrt unter Windows)"""
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class BlockIdAllocator:
+    """
+    Vergibt Task-IDs aus Blöcken, die in einer Zählerdatei reserviert werden.
+
+    Die Zählerdatei enthält die erste noch nicht reservierte ID. Eine
+    Reservierung liest und erhöht sie unter einem Datei-Lock und schreibt
+    sie per os.replace - jeder Prozess erhält so disjunkte Blöcke. Innerhalb
+    eines Blocks vergibt next_id() IDs nur im Speicher. Nicht genutzte IDs
+    eines Blocks (Prozessende) bleiben als Lücke, werden aber nie doppelt
+    vergeben.
+    """
+
+    def __init__(self, counter_file: Path, block_size: int = 100):
+        if block_size < 1:
+            raise ValueError("block_size muss >= 1 sein")
+        self.counter_file = Path(counter_file)
+        self.lock_file = self.counter_file.with_name(self.counter_file.name + ".lock")
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0  # exklusiv
+        self._lock = threading.Lock()
+        self.reservations = 0
+
+    def _read_counter(self) -> int:
+        try:
+            return int(self.counter_file.read_text(encoding="ascii").strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _reserve(self, count: int, floor: int) -> Tuple[int, int]:
+        """Reserviert count IDs ab frühestens floor (eine Datei-Operation)"""
+        with _locked(self.lock_file):
+            start = max(self._read_counter(), floor)
+            tmp = self.counter_file.with_name(self.counter_file.name + ".tmp")
+            with open(tmp, "w", encoding="ascii") as f:
+                f.write(str(start + count))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.counter_file)
+        self.reservations += 1
+        return start, start + count
+
+    def next_id(self, floor: int = 1) -> int:
+        """Nächste freie ID, mindestens floor (z. B. next_id des Datenbestands)"""
+        with self._lock:
+            if self._next < floor:
+                self._next = floor  # IDs unter dem Bestand wurden anderswo vergeben
+            if self._next >= self._end:
+                self._next, self._end = self._reserve(self.block_size, floor)
+            task_id = self._next
+            self._next += 1
+            return task_id
+
+    def allocate(self, count: int, floor: int = 1) -> List[int]:
+        """count IDs auf einmal (Massenimport) - höchstens eine Reservierung"""
+        with self._lock:
+            self._next = max(self._next, floor)
+            ids = list(range(self._next, min(self._end, self._next + count)))
+            if len(ids) < count:
+                missing = count - len(ids)
+                start, self._end = self._reserve(max(missing, self.block_size), floor)
+                ids += range(start, start + missing)
+                self._next = start + missing
+            else:
+                self._next += count
+            return ids
@@ -0,0 +1,176 @@
+# IMPORTER - Massenimport aus externen Projekt-APIs
+# Verantwortlichkeiten:
+# - Seitenweises, nebenläufiges Abrufen (asyncio, begrenzte Parallelität)
+# - Übersetzung ins interne Format über den ExternalTaskAdapter
+# - Prüfung seitenweise im Block (BatchValidator)
+# - Gebündeltes Speichern im TaskRepository, Herkunft im Sync-Mapping merken
+# - Durchsatz-Metriken
+
+import asyncio
+import inspect
+import time
+from typing import Dict, List, Tuple
+
+from model import Task, TaskRepository
+from validation import BatchValidator
+from design_patterns.adapter_pattern import ExternalTask, ExternalTaskAdapter
+
+# Höchstzahl gemerkter Fehlermeldungen pro Lauf (die Anzahl zählt rejected)
+MAX_ERRORS = 100
+
+
+class ImportStats:
+    """Metriken eines Importlaufs"""
+
+    def __init__(self):
+        self.pages = 0
+        self.fetched = 0
+        self.imported = 0
+        self.rejected = 0
+        self.skipped = 0
+        self.errors: List[Dict] = []
+        self.batches = 0
+        self.elapsed = 0.0
+
+    @property
+    def tasks_per_second(self) -> float:
+        """Durchsatz der importierten Tasks"""
+        return self.imported / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        """Serialisiert die Metriken (z. B. für Logs)"""
+        return {
+            "pages": self.pages,
+            "fetched": self.fetched,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "batches": self.batches,
+            "elapsed": round(self.elapsed, 4),
+            "tasks_per_second": round(self.tasks_per_second, 1)
+        }
+
+
+class AsyncTaskImporter:
+    """
+    Importiert Aufgaben aus einer externen Quelle in das Repository.
+
+    Die Quelle muss fetch_page(page, page_size) anbieten (synchron wie
+    ExternalProjectAPI oder als Coroutine). Es laufen höchstens
+    max_concurrency Abrufe gleichzeitig; eine Seite mit weniger als
+    page_size Einträgen markiert das Ende. Seiten werden in Reihenfolge
+    adaptiert und alle batch_size Tasks gemeinsam gespeichert.
+
+    Jede Task wird unter source_name mit ihrer externen ID im Sync-Mapping
+    vermerkt (wie beim SyncEngine mit gleichem Namen); bereits zugeordnete
+    IDs werden übersprungen, ein späterer Sync legt sie nicht doppelt an.
+    """
+
+    def __init__(self, repository: TaskRepository, source, page_size: int = 100,
+                 max_concurrency: int = 4, batch_size: int = 500, source_name: str = "external"):
+        if page_size < 1 or max_concurrency < 1 or batch_size < 1:
+            raise ValueError("page_size, max_concurrency und batch_size müssen >= 1 sein")
+        self.repository = repository
+        self.source = source
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.source_name = source_name
+        # Externe Projekte werden zu Kategorien - daher ohne Kategorie-Prüfung
+        self.validator = BatchValidator()
+
+    def run_sync(self) -> ImportStats:
+        """Führt den Import blockierend aus (z. B. aus Skripten)"""
+        return asyncio.run(self.run())
+
+    async def run(self) -> ImportStats:
+        """Führt den Import aus und gibt die Metriken zurück"""
+        stats = ImportStats()
+        start = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+        state = {"next_page": 0, "last_page": None}
+
+        async def worker() -> None:
+            while True:
+                page = state["next_page"]
+                if state["last_page"] is not None and page > state["last_page"]:
+                    return
+                state["next_page"] += 1
+                items = await self._fetch(page)
+                if len(items) < self.page_size:
+                    last = state["last_page"]
+                    state["last_page"] = page if last is None else min(last, page)
+                await queue.put((page, items))
+
+        async def produce() -> None:
+            workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+            try:
+                done, _ = await asyncio.wait(workers, return_when=asyncio.FIRST_EXCEPTION)
+                for task in done:
+                    task.result()  # erster Abruffehler wird weitergereicht
+            finally:
+                # Bei Fehler oder Abbruch rufen die übrigen Worker keine Seiten mehr ab
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                await queue.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            await self._consume(queue, stats)
+        except BaseException:
+            producer.cancel()
+            raise
+        # Fehler beim Abruf werden hier weitergereicht
+        await producer
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    async def _fetch(self, page: int) -> List[ExternalTask]:
+        """Ruft eine Seite ab - synchrone Quellen laufen im Thread-Pool"""
+        if inspect.iscoroutinefunction(self.source.fetch_page):
+            return await self.source.fetch_page(page, self.page_size)
+        return await asyncio.to_thread(self.source.fetch_page, page, self.page_size)
+
+    async def _consume(self, queue: asyncio.Queue, stats: ImportStats) -> None:
+        """Adaptiert eintreffende Seiten in Reihenfolge und speichert gebündelt"""
+        pending: Dict[int, List[ExternalTask]] = {}
+        expected = 0
+        batch: List[Tuple[str, Task]] = []
+        _, data = self.repository.snapshot("sync")
+        seen = set(data.get("sync", {}).get(self.source_name, {}).get("mapping", {}))
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            page, items = item
+            pending[page] = items
+            stats.pages += 1
+            while expected in pending:
+                externals = pending.pop(expected)
+                stats.fetched += len(externals)
+                fresh = [external for external in externals if external.task_id not in seen]
+                stats.skipped += len(externals) - len(fresh)
+                seen.update(external.task_id for external in fresh)
+                result = self.validator.validate(
+                    [{**ExternalTaskAdapter(external, internal_id=0).to_dict(),
+                      "external_source": self.source_name, "external_id": external.task_id}
+                     for external in fresh])
+                stats.rejected += result.rejected
+                room = MAX_ERRORS - len(stats.errors)
+                stats.errors += [{"page": expected, **error} for error in result.errors_to_dicts()[:room]]
+                for task, extra in zip(result.tasks(), result.extra_fields):
+                    batch.append((extra["external_id"], task))
+                    if len(batch) >= self.batch_size:
+                        await self._flush(batch, stats)
+                        batch = []
+                expected += 1
+        if batch:
+            await self._flush(batch, stats)
+
+    async def _flush(self, batch: List[Tuple[str, Task]], stats: ImportStats) -> None:
+        """Speichert einen Batch samt Mapping (Datei-I/O außerhalb der Event-Loop)"""
+        stats.imported += await asyncio.to_thread(self.repository.add_external_tasks,
+                                                  self.source_name, batch)
+        stats.batches += 1
@@ -0,0 +1,185 @@
+# INDEXES - Inkrementell gepflegte Suchstrukturen über den Task-Daten
+# Verantwortlichkeiten:
+# - Schnelle Abfragen ohne komplettes Sortieren bei jedem Rendern
+# - Aktualisierung über die Beobachter-Events des TaskRepository
+
+import heapq
+from bisect import bisect_left, insort
+from itertools import chain, count
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Tasks ohne Fälligkeitsdatum werden nach allen datierten einsortiert
+NO_DUE_DATE = "9999-12-31"
+
+
+class PriorityIndex:
+    """
+    Heap offener Tasks: höchste Priorität zuerst, dann frühestes Fälligkeitsdatum.
+
+    Änderungen legen neue Heap-Einträge an; veraltete Einträge bleiben liegen
+    und werden beim Lesen übersprungen (Lazy Deletion). top(k) läuft den Heap
+    mit einem Hilfs-Heap ab und kostet O(k log k) statt eines Sortierens.
+    """
+
+    def __init__(self, tasks_data: Iterable[Dict] = ()):
+        self._heap: List[Tuple] = []
+        self._live: Dict[int, Tuple] = {}
+        self._seq = count()
+        self.rebuild(tasks_data)
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def _entry(self, task_data: Dict) -> Tuple:
+        """Sortierschlüssel + Laufnummer (eindeutig) + Task-Daten"""
+        return (-task_data.get("priority", 3), task_data.get("due_date") or NO_DUE_DATE,
+                task_data["id"], next(self._seq), task_data)
+
+    def rebuild(self, tasks_data: Iterable[Dict]) -> None:
+        """Baut den Index komplett neu auf (O(n) mit heapify)"""
+        self._live = {t["id"]: self._entry(t) for t in tasks_data if not t.get("completed")}
+        self._heap = list(self._live.values())
+        heapq.heapify(self._heap)
+
+    def add(self, task_data: Dict) -> None:
+        """Nimmt eine offene Task auf bzw. ersetzt ihren Eintrag"""
+        entry = self._entry(task_data)
+        self._live[task_data["id"]] = entry
+        heapq.heappush(self._heap, entry)
+
+    def discard(self, task_id: int) -> None:
+        """Entfernt eine Task (der Heap-Eintrag verfällt)"""
+        if self._live.pop(task_id, None) is not None:
+            self._compact_if_needed()
+
+    def on_change(self, event: str, task_data: Optional[Dict],
+                  old_data: Optional[Dict] = None) -> None:
+        """Beobachter-Callback für TaskRepository.add_listener"""
+        if event == "delete" or task_data.get("completed"):
+            self.discard(task_data["id"])
+        else:
+            self.add(task_data)
+            self._compact_if_needed()
+
+    def top(self, k: int) -> List[Dict]:
+        """Gibt die k wichtigsten offenen Tasks zurück, ohne den Heap zu verändern"""
+        result: List[Dict] = []
+        heap, live = self._heap, self._live
+        if k <= 0 or not heap:
+            return result
+        candidates = [(heap[0], 0)]
+        while candidates and len(result) < k:
+            entry, i = heapq.heappop(candidates)
+            if live.get(entry[2]) is entry:
+                result.append(entry[4])
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(candidates, (heap[child], child))
+        return result
+
+    def _compact_if_needed(self) -> None:
+        """Räumt veraltete Einträge auf, sobald sie überwiegen"""
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = list(self._live.values())
+            heapq.heapify(self._heap)
+
+
+class DueDateIndex:
+    """
+    Offene Tasks mit Fälligkeit, sortiert nach (Fälligkeit, ID).
+
+    Bereichsabfragen (z. B. heute bis morgen) laufen per bisect in
+    O(log n + k). Wiederkehrende Tasks werden zusätzlich separat geführt,
+    damit ihre Regeln ohne Durchlauf aller Tasks ausgewertet werden können.
+    """
+
+    def __init__(self, tasks_data: Iterable[Dict] = ()):
+        self._keys: List[Tuple[str, int]] = []
+        self._tasks: Dict[int, Dict] = {}
+        # Schlüssel, unter dem jede Task einsortiert wurde - das Dict kann sich inzwischen geändert haben
+        self._indexed: Dict[int, Tuple[str, int]] = {}
+        self._recurring: Dict[int, Dict] = {}
+        self.rebuild(tasks_data)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def rebuild(self, tasks_data: Iterable[Dict]) -> None:
+        """Baut den Index komplett neu auf (ein Sortieren)"""
+        self._tasks, self._indexed, self._recurring = {}, {}, {}
+        for task_data in tasks_data:
+            if not task_data.get("completed"):
+                self._track(task_data)
+        self._keys = sorted(self._indexed.values())
+
+    def _track(self, task_data: Dict) -> bool:
+        if task_data.get("recurrence"):
+            self._recurring[task_data["id"]] = task_data
+        if not task_data.get("due_date"):
+            return False
+        self._tasks[task_data["id"]] = task_data
+        self._indexed[task_data["id"]] = (task_data["due_date"], task_data["id"])
+        return True
+
+    def add(self, task_data: Dict) -> None:
+        """Nimmt eine offene Task auf"""
+        if self._track(task_data):
+            insort(self._keys, self._indexed[task_data["id"]])
+
+    def discard(self, task_id: int) -> None:
+        """Entfernt eine Task"""
+        self._recurring.pop(task_id, None)
+        self._tasks.pop(task_id, None)
+        key = self._indexed.pop(task_id, None)
+        if key is not None:
+            position = bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+
+    def on_change(self, event: str, task_data: Optional[Dict],
+                  old_data: Optional[Dict] = None) -> None:
+        """Beobachter-Callback für TaskRepository.add_listener"""
+        self.discard(task_data["id"])
+        if event != "delete" and not task_data.get("completed"):
+            self.add(task_data)
+
+    def between(self, start: str, end: str) -> List[Dict]:
+        """Offene Tasks mit start <= Fälligkeit < end (ISO-Texte)"""
+        low = bisect_left(self._keys, (start,))
+        high = bisect_left(self._keys, (end,))
+        return [self._tasks[task_id] for _, task_id in self._keys[low:high]]
+
+    def count_between(self, start: str, end: str) -> int:
+        """Anzahl offener Tasks mit start <= Fälligkeit < end - O(log n)"""
+        return bisect_left(self._keys, (end,)) - bisect_left(self._keys, (start,))
+
+    def recurring(self) -> List[Dict]:
+        """Alle offenen wiederkehrenden Tasks"""
+        return list(self._recurring.values())
+
+
+class TaskIdIndex:
+    """
+    Task-ID → aktuelles Task-Dict über aktive Liste und Archiv.
+
+    Die Liste ergibt sich aus completed (erledigte Tasks liegen im Archiv);
+    die Position sucht der Aufrufer nur für die gefundenen Tasks. So kostet
+    das Nachschlagen weniger Tasks nicht mehr einen Durchlauf über alle.
+    """
+
+    def __init__(self, tasks_data: Iterable[Dict] = (), archived_data: Iterable[Dict] = ()):
+        self._tasks: Dict[int, Dict] = {t["id"]: t for t in chain(tasks_data, archived_data)}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        return self._tasks.get(task_id)
+
+    def on_change(self, event: str, task_data: Optional[Dict],
+                  old_data: Optional[Dict] = None) -> None:
+        """Beobachter-Callback für TaskRepository.add_listener"""
+        if event == "delete":
+            self._tasks.pop(task_data["id"], None)
+        else:
+            self._tasks[task_data["id"]] = task_data
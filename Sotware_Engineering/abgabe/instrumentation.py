@@ -0,0 +1,221 @@
+# INSTRUMENTATION - Opt-in Laufzeitmessung der Hot Paths
+# Verantwortlichkeiten:
+# - Aufrufzähler, Wall-Time und allokierte Bytes pro Methode
+# - Export als JSON oder Prometheus-Text (Datei oder lokaler HTTP-Endpunkt)
+# - Kein Overhead im ausgeschalteten Zustand (Methoden bleiben unverändert)
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from model import TaskRepository
+from controller import TaskController, CategoryController
+
+
+def _public_methods(cls: type) -> List[str]:
+    """Alle öffentlichen Methoden, die direkt in der Klasse definiert sind"""
+    return [name for name, value in vars(cls).items()
+            if inspect.isfunction(value) and not name.startswith("_")]
+
+
+class Instrumentation:
+    """
+    Misst Aufrufe ausgewählter Methoden von Repository und Controllern.
+
+    enable() ersetzt die Methoden auf Klassenebene durch messende Wrapper,
+    disable() stellt die Originale wieder her. Ausgeschaltet entsteht also
+    kein zusätzlicher Aufruf-Overhead. Allokationen werden nur mit
+    track_memory=True über tracemalloc erfasst (Spitzenwert je Aufruf,
+    verschachtelte Aufrufe eingerechnet).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.track_memory = False
+        self._stats: Dict[str, Dict] = {}
+        self._originals: Dict[tuple, Callable] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def targets(self) -> Dict[type, List[str]]:
+        """Instrumentierte Klassen und Methoden"""
+        return {
+            TaskRepository: ["_load_data"] + _public_methods(TaskRepository),
+            TaskController: _public_methods(TaskController),
+            CategoryController: _public_methods(CategoryController)
+        }
+
+    def enable(self, track_memory: bool = False) -> None:
+        """Schaltet die Messung ein"""
+        if self.enabled:
+            return
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        for cls, methods in self.targets().items():
+            for name in methods:
+                original = vars(cls)[name]
+                self._originals[(cls, name)] = original
+                setattr(cls, name, self._wrap(f"{cls.__name__}.{name}", original))
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Schaltet die Messung aus und stellt die Originalmethoden wieder her"""
+        for (cls, name), original in self._originals.items():
+            setattr(cls, name, original)
+        self._originals.clear()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Setzt alle Zähler zurück"""
+        with self._lock:
+            self._stats.clear()
+
+    def _wrap(self, name: str, func: Callable) -> Callable:
+        """Erzeugt den messenden Wrapper für eine Methode"""
+        instrumentation = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = getattr(instrumentation._local, "stack", None)
+            if stack is None:
+                stack = instrumentation._local.stack = []
+            tracking = instrumentation.track_memory and tracemalloc.is_tracing()
+            if tracking:
+                current, peak = tracemalloc.get_traced_memory()
+                if stack:
+                    stack[-1] = max(stack[-1], peak)  # Spitze des Aufrufers sichern
+                tracemalloc.reset_peak()
+                stack.append(0)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                allocated = 0
+                if tracking:
+                    child_peak = stack.pop()
+                    peak = max(tracemalloc.get_traced_memory()[1], child_peak)
+                    allocated = max(0, peak - current)
+                    if stack:
+                        stack[-1] = max(stack[-1], peak)
+                instrumentation._record(name, elapsed, allocated)
+
+        return wrapper
+
+    def _record(self, name: str, elapsed: float, allocated: int) -> None:
+        with self._lock:
+            entry = self._stats.get(name)
+            if entry is None:
+                entry = self._stats[name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0, "alloc_bytes": 0}
+            entry["calls"] += 1
+            entry["total_s"] += elapsed
+            entry["max_s"] = max(entry["max_s"], elapsed)
+            entry["alloc_bytes"] += allocated
+
+    # --- Stats-API und Export ---
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Gibt die Messwerte pro Methode zurück (sortiert nach Gesamtzeit)"""
+        with self._lock:
+            items = [(name, dict(entry)) for name, entry in self._stats.items()]
+        items.sort(key=lambda item: item[1]["total_s"], reverse=True)
+        result = {}
+        for name, entry in items:
+            entry["total_ms"] = round(entry.pop("total_s") * 1000, 3)
+            entry["max_ms"] = round(entry.pop("max_s") * 1000, 3)
+            entry["avg_ms"] = round(entry["total_ms"] / entry["calls"], 3)
+            result[name] = entry
+        return result
+
+    def to_json(self) -> str:
+        """Messwerte als JSON"""
+        return json.dumps(self.get_stats(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Messwerte im Prometheus-Textformat"""
+        stats = self.get_stats()
+        metrics = [
+            ("todo_calls_total", "counter", "Anzahl Aufrufe", lambda e: e["calls"]),
+            ("todo_call_seconds_total", "counter", "Summierte Laufzeit", lambda e: e["total_ms"] / 1000),
+            ("todo_call_seconds_max", "gauge", "Längster Aufruf", lambda e: e["max_ms"] / 1000),
+            ("todo_call_alloc_bytes_total", "counter", "Allokierte Bytes", lambda e: e["alloc_bytes"])
+        ]
+        lines = []
+        for metric, kind, help_text, value in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, entry in stats.items():
+                lines.append(f'{metric}{{method="{name}"}} {value(entry)}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: Path) -> None:
+        """Schreibt die Messwerte als Datei (.prom → Prometheus-Text, sonst JSON)"""
+        path = Path(path)
+        text = self.to_prometheus() if path.suffix == ".prom" else self.to_json()
+        path.write_text(text, encoding="utf-8")
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> int:
+        """Startet einen lokalen Endpunkt (/metrics, /metrics.json) im Hintergrund"""
+        if self._server is not None:
+            return self._server.server_address[1]
+        instrumentation = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = instrumentation.to_prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = instrumentation.to_json(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def stop_serving(self) -> None:
+        """Beendet den lokalen Endpunkt"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# Globale Instanz; über Umgebungsvariablen aktivierbar:
+# TODO_INSTRUMENT=1 (Messung), TODO_INSTRUMENT_MEMORY=1 (Allokationen),
+# TODO_METRICS_PORT=9464 (lokaler Endpunkt)
+instrumentation = Instrumentation()
+
+
+def configure_from_env() -> Instrumentation:
+    """Aktiviert die Messung gemäß Umgebungsvariablen (idempotent)"""
+    if os.environ.get("TODO_INSTRUMENT") == "1" and not instrumentation.enabled:
+        instrumentation.enable(track_memory=os.environ.get("TODO_INSTRUMENT_MEMORY") == "1")
+        port = os.environ.get("TODO_METRICS_PORT")
+        if port:
+            instrumentation.serve(int(port))
+    return instrumentation
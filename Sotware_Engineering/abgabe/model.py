@@ -4,25 +4,69 @@
 # - Datenzugriff und Persistierung
 # - Validierungslogik
 
+import atexit
+import copy
+import functools
+import importlib
 import json
+import logging
+import os
+import threading
+import weakref
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from datetime import date, datetime, timedelta
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict, Set, Tuple
+
+from history import UndoHistory
+from id_allocator import BlockIdAllocator
+from indexes import DueDateIndex, PriorityIndex, TaskIdIndex
+from recurrence import RecurrenceRule
+from rwlock import ReadWriteLock
+from task_statistics import TaskStatistics
+
+logger = logging.getLogger("todo.model")
 
 
 class Task:
     """Erstellung einer Task FR-01"""
     
+    # Typ-Kennung für die Persistierung (siehe TaskTypeFactory)
+    TYPE = "todo"
+    ICON = ""
+    
+    # Priorität wie in der externen API: 1 (niedrig) bis 5 (hoch), FR-10
+    MIN_PRIORITY = 1
+    MAX_PRIORITY = 5
+    DEFAULT_PRIORITY = 3
+    
+    # Wiederholungsregel als Dict (siehe recurrence.RecurrenceRule), None = einmalig
+    recurrence: Optional[Dict] = None
+    
     def __init__(self, id: int, title: str, completed: bool = False, 
-                 category: str = "Keine", due_date: Optional[str] = None):
+                 category: str = "Keine", due_date: Optional[str] = None,
+                 priority: int = DEFAULT_PRIORITY, task_type: Optional[str] = None,
+                 recurrence: Optional[Dict] = None):
         self.id = id
         self.title = title
         self.completed = completed
         self.category = category
         self.due_date = due_date
+        self.priority = priority
+        # Unbekannte Typen (z. B. Plugin fehlt) behalten ihre Kennung
+        self.task_type = task_type or self.TYPE
+        self.recurrence = recurrence
+    
+    def describe(self) -> str:
+        """Beschreibt die Aufgabe"""
+        return "ToDo-Aufgabe"
     
     def validate(self) -> bool:
         """Validiert die Task-Daten"""
+        if not (self.MIN_PRIORITY <= self.priority <= self.MAX_PRIORITY):
+            return False
+        if self.recurrence and not RecurrenceRule.from_dict(self.recurrence).validate():
+            return False
         return bool(self.title and self.title.strip())
     
     def is_urgent(self) -> bool:
@@ -40,26 +84,152 @@ class Task:
     
     def to_dict(self) -> Dict:
         """Serialisiert Task für JSON-Speicherung"""
-        return {
+        data = {
             "id": self.id,
             "title": self.title,
             "completed": self.completed,
             "category": self.category,
-            "due_date": self.due_date
+            "due_date": self.due_date,
+            "priority": self.priority,
+            "type": self.task_type
         }
+        # Nur wiederkehrende Tasks tragen eine Regel (hält die Datei klein)
+        if self.recurrence:
+            data["recurrence"] = self.recurrence
+        return data
     
     @staticmethod
     def from_dict(data: Dict) -> 'Task':
-        """Erstellt Task aus Dictionary"""
-        return Task(
+        """Erstellt Task aus Dictionary (Klasse anhand der Typ-Kennung)"""
+        task_type = data.get("type", Task.TYPE)
+        task_class = TaskTypeFactory.get_task_class(task_type)
+        return task_class(
             id=data["id"],
             title=data["title"],
             completed=data.get("completed", False),
             category=data.get("category", "Keine"),
-            due_date=data.get("due_date")
+            due_date=data.get("due_date"),
+            priority=data.get("priority", Task.DEFAULT_PRIORITY),
+            task_type=task_type,
+            recurrence=data.get("recurrence")
         )
 
 
+class ShoppingTask(Task):
+    """Einkaufsaufgabe"""
+    
+    TYPE = "shopping"
+    ICON = "🛒"
+    
+    def describe(self) -> str:
+        return "Einkauf"
+
+
+class WorkTask(Task):
+    """Arbeitsaufgabe"""
+    
+    TYPE = "work"
+    ICON = "💼"
+    
+    def describe(self) -> str:
+        return "Arbeit"
+
+
+class TaskTypeFactory:
+    """
+    Factory für Task-Typen (Factory Pattern wie design_patterns/factory_pattern.py).
+    
+    Die Dispatch-Tabelle _task_types bildet Typ-Kennungen auf Klassen ab.
+    Plugins können per Import-Pfad ("modul:Klasse") registriert werden und
+    werden erst beim ersten Zugriff importiert; danach liegt die Klasse in
+    der Tabelle. Über die Umgebungsvariable TODO_TASK_TYPES lassen sich
+    Plugins als "typ=modul:Klasse,..." vorab registrieren.
+    """
+    
+    _task_types: Dict[str, type] = {
+        Task.TYPE: Task,
+        ShoppingTask.TYPE: ShoppingTask,
+        WorkTask.TYPE: WorkTask
+    }
+    _lazy_paths: Dict[str, str] = {}
+    # Plugins, deren Import fehlschlug - einmal gewarnt, danach direkt Task
+    _broken_paths: Set[str] = set()
+    
+    @classmethod
+    def register_task_type(cls, type_name: str, task_class: type) -> None:
+        """Registriert einen Task-Typ mit bereits importierter Klasse"""
+        if not issubclass(task_class, Task):
+            raise TypeError(f"{task_class} muss von Task erben")
+        cls._lazy_paths.pop(type_name.lower(), None)
+        cls._task_types[type_name.lower()] = task_class
+    
+    @classmethod
+    def register_task_type_path(cls, type_name: str, import_path: str) -> None:
+        """Registriert einen Task-Typ per Import-Pfad "modul:Klasse" (lazy)"""
+        if ":" not in import_path:
+            raise ValueError(f"Import-Pfad '{import_path}' muss die Form 'modul:Klasse' haben")
+        cls._task_types.pop(type_name.lower(), None)
+        cls._broken_paths.discard(type_name.lower())
+        cls._lazy_paths[type_name.lower()] = import_path
+    
+    @classmethod
+    def get_type_names(cls) -> List[str]:
+        """Gibt alle registrierten Typ-Kennungen zurück (ohne Plugins zu importieren)"""
+        return list(cls._task_types) + [t for t in cls._lazy_paths if t not in cls._task_types]
+    
+    @classmethod
+    def get_task_class(cls, type_name: str) -> type:
+        """Löst eine Typ-Kennung auf; unbekannte Typen fallen auf Task zurück"""
+        task_class = cls._task_types.get(type_name)
+        if task_class is not None:
+            return task_class
+        import_path = cls._lazy_paths.get(type_name)
+        if import_path is None or type_name in cls._broken_paths:
+            return Task
+        # Erst jetzt wird das Plugin importiert; danach liegt es in der Tabelle
+        module_name, class_name = import_path.split(":", 1)
+        try:
+            task_class = getattr(importlib.import_module(module_name), class_name)
+            cls.register_task_type(type_name, task_class)
+        except (ImportError, AttributeError, TypeError) as e:
+            # Fehlkonfiguriertes Plugin darf die App nicht lahmlegen - Task behält ihre Typ-Kennung
+            cls._broken_paths.add(type_name)
+            logger.warning("Task-Typ '%s' (%s) nicht ladbar, verwende Task: %s", type_name, import_path, e)
+            return Task
+        return task_class
+    
+    @classmethod
+    def create_task(cls, type_name: str = Task.TYPE, **fields) -> Task:
+        """Erzeugt eine Task des angegebenen Typs"""
+        type_name = type_name.lower()
+        return cls.get_task_class(type_name)(task_type=type_name, **fields)
+    
+    @classmethod
+    def from_dicts(cls, tasks_data: List[Dict]) -> List[Task]:
+        """Hydriert gemischte Task-Listen über die Dispatch-Tabelle"""
+        table = cls._task_types
+        result = []
+        for data in tasks_data:
+            task_type = data.get("type", Task.TYPE)
+            task_class = table.get(task_type) or cls.get_task_class(task_type)
+            result.append(task_class(data["id"], data["title"], data.get("completed", False),
+                                     data.get("category", "Keine"), data.get("due_date"),
+                                     data.get("priority", Task.DEFAULT_PRIORITY), task_type,
+                                     data.get("recurrence")))
+        return result
+    
+    @classmethod
+    def register_from_env(cls, value: Optional[str] = None) -> None:
+        """Registriert Plugins aus "typ=modul:Klasse,..." (Standard: TODO_TASK_TYPES)"""
+        value = os.environ.get("TODO_TASK_TYPES", "") if value is None else value
+        for entry in filter(None, (e.strip() for e in value.split(","))):
+            type_name, _, import_path = entry.partition("=")
+            cls.register_task_type_path(type_name.strip(), import_path.strip())
+
+
+TaskTypeFactory.register_from_env()
+
+
 class Category:
     """Implementierung von Kategorien FR-05/ FR-12"""
     
@@ -74,12 +244,143 @@ class Category:
         return bool(self.name and self.name.strip())
 
 
+def _now() -> str:
+    """Zeitstempel für created_at/completed_at (ISO, sekundengenau - als Text sortierbar)"""
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _parse_day(value: Optional[str]) -> Optional[date]:
+    """Datum aus einer Fälligkeit ("YYYY-MM-DD" oder mit Uhrzeit), None wenn ungültig"""
+    try:
+        return date.fromisoformat(value[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def _synchronized(method: Callable) -> Callable:
+    """Führt eine ändernde Repository-Methode unter dem Schreib-Lock als einen Undo-Schritt aus"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            self.history.begin()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.history.commit()
+    return wrapper
+
+
+def _reading(method: Callable) -> Callable:
+    """Führt eine lesende Repository-Methode unter dem Lese-Lock aus"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._read_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# Repositories mit Write-Behind; werden beim Beenden des Prozesses gespeichert
+_write_behind_repositories = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_write_behind() -> None:
+    for repository in list(_write_behind_repositories):
+        repository.stop_write_behind()
+
+
 class TaskRepository:
     """Datenzugriff und Persistierung FR-00"""
     
-    def __init__(self, data_file: Path = Path("todo_data.json")):
+    def __init__(self, data_file: Path = Path("todo_data.json"), thread_safe: bool = False):
         self.data_file = data_file
-        self.data = self._load_data()
+        # Daten werden erst beim ersten Zugriff geladen (schneller Start)
+        self._data: Optional[Dict] = None
+        self._load_lock = threading.Lock()
+        # Änderungszeit der Datei beim Laden/Speichern (erkennt fremde Schreiber)
+        self._file_mtime: Optional[int] = None
+        # Datenversion: steigt bei jeder Änderung (z. B. für ETags)
+        self.version = 0
+        self._batch_depth = 0
+        self._dirty = False
+        # Änderungen und Serialisierung laufen unter dem Schreib-Lock. Thread-sicherer
+        # Modus (von mehreren Sessions geteilt): Lese-/Schreib-Lock, Lesende laufen
+        # parallel und sehen nie halb geänderte Listen; sonst lesen sie ohne Lock.
+        self.thread_safe = thread_safe
+        if thread_safe:
+            lock = ReadWriteLock()
+            self._write_lock, self._read_lock = lock.write, lock.read
+        else:
+            self._write_lock, self._read_lock = threading.RLock(), nullcontext()
+        self._file_lock = threading.Lock()
+        # Write-Behind: Speichern im Hintergrund (None = synchron)
+        self.persisted_version = 0
+        self._durable = threading.Condition()
+        self._write_behind_delay: Optional[float] = None
+        self._write_behind_thread: Optional[threading.Thread] = None
+        self._write_behind_wakeup = threading.Event()
+        self._write_behind_stop = threading.Event()
+        self.write_error: Optional[Exception] = None
+        # Beobachter für Änderungen: callback(event, task_data, old_data)
+        self._listeners: List[Callable[[str, Optional[Dict], Optional[Dict]], None]] = []
+        self._priority_index: Optional[PriorityIndex] = None
+        self._due_index: Optional[DueDateIndex] = None
+        self._id_index: Optional[TaskIdIndex] = None
+        self._statistics: Optional[TaskStatistics] = None
+        # Rückgängig/Wiederholen als inverse Deltas; Sessions können eine eigene Historie nutzen
+        self._history = UndoHistory()
+        self._session = threading.local()
+        self._session_histories: "weakref.WeakSet[UndoHistory]" = weakref.WeakSet()
+        # Gemeinsame ID-Vergabe mehrerer Prozesse (None = next_id im Datenbestand)
+        self.id_allocator: Optional[BlockIdAllocator] = None
+    
+    @property
+    def data(self) -> Dict:
+        """Datenbestand - wird beim ersten Zugriff aus der Datei gelesen"""
+        if self._data is None:
+            with self._load_lock:
+                if self._data is None:
+                    self._file_mtime = self._stat_mtime()
+                    self._data = self._load_data()
+        return self._data
+    
+    @data.setter
+    def data(self, value: Dict) -> None:
+        self._data = value
+        for history in [self._history, *self._session_histories]:
+            history.clear()
+    
+    @property
+    def history(self) -> UndoHistory:
+        """Historie des aktuellen Threads (use_history) oder die gemeinsame"""
+        history = getattr(self._session, "history", None)
+        return self._history if history is None else history
+    
+    @contextmanager
+    def use_history(self, history: UndoHistory):
+        """
+        Ordnet Änderungen dieses Threads einer eigenen Historie zu (eine je Benutzer-Session).
+
+        Die Deltas beziehen sich auf Listenpositionen; ändert eine andere
+        Session den Bestand, werden alle übrigen Historien verworfen.
+        """
+        self._session_histories.add(history)
+        previous = getattr(self._session, "history", None)
+        self._session.history = history
+        try:
+            yield history
+        finally:
+            self._session.history = previous
+    
+    def is_loaded(self) -> bool:
+        """Prüft, ob der Datenbestand bereits geladen ist"""
+        return self._data is not None
+    
+    def warm(self) -> threading.Thread:
+        """Lädt den Datenbestand in einem Hintergrund-Thread vor"""
+        thread = threading.Thread(target=lambda: self.data, daemon=True)
+        thread.start()
+        return thread
     
     def _load_data(self) -> Dict:
         """Lädt Daten aus JSON-Datei"""
@@ -103,19 +404,342 @@ class TaskRepository:
     
     def save(self) -> None:
         """Speichert Daten in JSON-Datei"""
-        with open(self.data_file, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        with self._write_lock:
+            # Unter dem Lock serialisieren, die Datei wird danach geschrieben
+            text = json.dumps(self.data, ensure_ascii=False, indent=2)
+            version = self.version
+            self._dirty = False
+        with self._file_lock:
+            if version < self.persisted_version:
+                return  # eine neuere Fassung wurde bereits geschrieben
+            try:
+                with open(self.data_file, "w", encoding="utf-8") as f:
+                    f.write(text)
+            except OSError:
+                # Nicht gespeichert: bleibt dirty, persisted_version bleibt stehen
+                with self._write_lock:
+                    self._dirty = True
+                raise
+            self._file_mtime = self._stat_mtime()
+            self._mark_durable(version)
+    
+    def _mark_durable(self, version: int) -> None:
+        """Merkt die zuletzt gespeicherte Version und weckt wartende Aufrufer"""
+        with self._durable:
+            self.persisted_version = max(self.persisted_version, version)
+            self._durable.notify_all()
+    
+    def _stat_mtime(self) -> Optional[int]:
+        try:
+            return self.data_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _reset(self, data: Dict) -> None:
+        """Tauscht den Datenbestand aus und meldet "reset" an die Beobachter"""
+        self.data = data
+        for index in (self._priority_index, self._due_index, self._id_index, self._statistics):
+            if index is not None:
+                self.remove_listener(index.on_change)
+        self._priority_index = self._due_index = self._id_index = self._statistics = None
+        self._notify("reset")
+
+    def replace_data(self, data: Dict) -> None:
+        """Ersetzt den kompletten Datenbestand (z. B. Snapshot-Wiederherstellung)"""
+        with self._write_lock:
+            self._reset(data)
+            self._persist()
+
+    def reload_if_changed(self) -> bool:
+        """
+        Lädt neu, wenn ein anderer Prozess die Datei geschrieben hat.
+
+        Nur ein stat()-Aufruf; ungespeicherte eigene Änderungen haben Vorrang.
+        """
+        if not self.is_loaded() or self._dirty:
+            return False
+        mtime = self._stat_mtime()
+        if mtime is None or mtime == self._file_mtime:
+            return False
+        with self._write_lock:
+            self._file_mtime = mtime
+            self._reset(self._load_data())
+            self._mark_durable(self.version)
+        return True
+
+    def flush(self) -> None:
+        """Schreibt noch nicht gespeicherte Änderungen sofort"""
+        if self._dirty:
+            self.save()
+    
+    def _persist(self, lists_changed: bool = True) -> None:
+        """
+        Speichert nach einer Änderung - innerhalb von batch() erst am Ende.
+
+        lists_changed=False für Änderungen außerhalb der Task-Listen (Sync-Token,
+        Outbox): die Undo-Historien anderer Sessions bleiben dann gültig.
+        """
+        self.version += 1
+        self._dirty = True
+        if lists_changed and self._session_histories:
+            current = self.history
+            for history in [self._history, *self._session_histories]:
+                if history is not current:
+                    history.clear()
+        if not self._batch_depth:
+            self._commit()
+    
+    def _commit(self) -> None:
+        """Synchron speichern oder den Write-Behind-Thread wecken"""
+        if self._write_behind_thread is not None:
+            self._write_behind_wakeup.set()
+        else:
+            self.save()
+    
+    def snapshot(self, *keys: str) -> Tuple[int, Dict]:
+        """
+        Konsistente Kopie von Teilen des Datenbestands samt Datenversion.
+
+        Liefert (version, {key: Kopie}) für die angegebenen Schlüssel (ohne
+        Angabe: alle). Listen werden flach kopiert - Task-Dicts werden bei
+        Änderungen ersetzt, nie verändert -, alles andere tief. Erweiterungen
+        lesen hierüber statt über die Locks des Repositorys; für Lesen mit
+        anschließendem Schreiben dient batch().
+        """
+        with self._read_lock:
+            data = self.data
+            copies = {key: list(value) if isinstance(value, list) else copy.deepcopy(value)
+                      for key, value in data.items() if not keys or key in keys}
+            return self.version, copies
+
+    @contextmanager
+    def batch(self):
+        """
+        Fasst viele Änderungen zu einem einzigen Speichervorgang zusammen.
+
+        Hält dabei den Schreib-Lock - Erweiterungen, die lesen und abhängig
+        davon ändern, sehen so keinen Zwischenstand anderer Schreiber.
+        """
+        with self._write_lock:
+            self._batch_depth += 1
+            self.history.begin()
+            try:
+                yield self
+            finally:
+                self.history.commit()
+                self._batch_depth -= 1
+                if not self._batch_depth and self._dirty:
+                    self._commit()
+    
+    # --- Write-Behind ---
+    
+    def start_write_behind(self, max_delay: float = 0.5) -> None:
+        """
+        Speichert Änderungen ab jetzt im Hintergrund.
+        
+        Änderungen wirken sofort im Speicher; ein Thread schreibt spätestens
+        max_delay Sekunden nach der ersten ungespeicherten Änderung (plus
+        Schreibdauer). Beim Beenden des Prozesses wird automatisch gespeichert.
+        """
+        if self._write_behind_thread is not None:
+            return
+        self._write_behind_delay = max_delay
+        self._write_behind_stop.clear()
+        self._write_behind_thread = threading.Thread(target=self._write_behind_loop, daemon=True)
+        self._write_behind_thread.start()
+        _write_behind_repositories.add(self)
+    
+    def stop_write_behind(self) -> None:
+        """Beendet den Hintergrund-Thread und speichert ausstehende Änderungen"""
+        thread = self._write_behind_thread
+        if thread is None:
+            return
+        self._write_behind_stop.set()
+        self._write_behind_wakeup.set()
+        thread.join()
+        self._write_behind_thread = None
+        _write_behind_repositories.discard(self)
+        self.flush()
+    
+    def _write_behind_loop(self) -> None:
+        while not self._write_behind_stop.is_set():
+            self._write_behind_wakeup.wait()
+            # Weitere Änderungen sammeln, aber höchstens max_delay warten
+            self._write_behind_stop.wait(self._write_behind_delay)
+            self._write_behind_wakeup.clear()
+            try:
+                self.flush()
+                self.write_error = None
+            except OSError as e:
+                # Bleibt dirty - nächster Versuch bei der nächsten Änderung oder flush()
+                self.write_error = e
+    
+    def wait_durable(self, timeout: Optional[float] = None) -> bool:
+        """Wartet, bis alle bisherigen Änderungen gespeichert sind"""
+        target = self.version
+        with self._durable:
+            return self._durable.wait_for(
+                lambda: self.persisted_version >= target or not self._dirty, timeout)
     
+    def close(self) -> None:
+        """Speichert ausstehende Änderungen und beendet den Hintergrund-Thread"""
+        self.stop_write_behind()
+        self.flush()
+    
+    @_synchronized
+    def compact(self) -> Dict[str, int]:
+        """Räumt leere Sync-Zustände auf und schreibt die Datei neu"""
+        before = self.data_file.stat().st_size if self.data_file.exists() else 0
+        for state in self.data.get("sync", {}).values():
+            if not state.get("outbox"):
+                state.pop("outbox", None)
+        self.data.setdefault("archived_tasks", [])
+        self.save()
+        return {"bytes_before": before, "bytes_after": self.data_file.stat().st_size}
+    
+    def add_listener(self, listener: Callable[[str, Optional[Dict], Optional[Dict]], None]) -> None:
+        """
+        Registriert einen Beobachter für Task-Änderungen.
+        
+        Events: "add" (neue Task), "update" (inkl. Erledigen/Wiederherstellen,
+        mit alter Version), "delete" (auch beim Auslagern ins Kalt-Archiv) und
+        "reset" (Daten komplett ersetzt).
+        Erledigte Tasks liegen immer im Archiv, offene in der aktiven Liste.
+        """
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable) -> None:
+        """Entfernt einen Beobachter"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _notify(self, event: str, task_data: Optional[Dict] = None,
+                old_data: Optional[Dict] = None) -> None:
+        """Informiert alle Beobachter über eine Änderung"""
+        self.version += 1
+        for listener in self._listeners:
+            listener(event, task_data, old_data)
+
+    # --- Rückgängig/Wiederholen ---
+
+    def _insert(self, list_name: str, index: int, task_data: Dict) -> None:
+        self.data.setdefault(list_name, []).insert(index, task_data)
+        self.history.record(("remove", list_name, index))
+
+    def _pop(self, list_name: str, index: int) -> Dict:
+        task_data = self.data[list_name].pop(index)
+        self.history.record(("insert", list_name, index, task_data))
+        return task_data
+
+    def _replace(self, list_name: str, index: int, task_data: Dict) -> None:
+        old_data = self.data[list_name][index]
+        self.data[list_name][index] = task_data
+        self.history.record(("replace", list_name, index, old_data))
+
+    def _prepend(self, list_name: str, tasks: List[Dict]) -> None:
+        if tasks:
+            self.data.setdefault(list_name, [])[:0] = tasks
+            self.history.record(("drop_front", list_name, len(tasks)))
+
+    def _drop_front(self, list_name: str, count: int) -> List[Dict]:
+        tasks = self.data[list_name][:count]
+        del self.data[list_name][:count]
+        self.history.record(("prepend", list_name, tasks))
+        return tasks
+
+    def _set_categories(self, categories: List[Dict]) -> None:
+        self.history.record(("categories", self.data["categories"]))
+        self.data["categories"] = categories
+
+    def _apply_step(self, step: List[tuple]) -> List[tuple]:
+        """
+        Wendet die inversen Deltas eines Schritts rückwärts an.
+
+        Gibt die dabei entstehenden Gegen-Deltas zurück und meldet den
+        Beobachtern je betroffener Task nur das Nettoergebnis.
+        """
+        before: Dict[int, Optional[Dict]] = {}
+        after: Dict[int, Optional[Dict]] = {}
+
+        def removed(tasks):
+            for task_data in tasks:
+                before.setdefault(task_data["id"], task_data)
+                after[task_data["id"]] = None
+
+        def inserted(tasks):
+            for task_data in tasks:
+                before.setdefault(task_data["id"], None)
+                after[task_data["id"]] = task_data
+
+        with self.history.capture() as inverse:
+            for kind, *args in reversed(step):
+                if kind == "insert":
+                    self._insert(*args)
+                    inserted([args[2]])
+                elif kind == "remove":
+                    removed([self._pop(*args)])
+                elif kind == "replace":
+                    removed([self.data[args[0]][args[1]]])
+                    self._replace(*args)
+                    inserted([args[2]])
+                elif kind == "prepend":
+                    self._prepend(*args)
+                    inserted(args[1])
+                elif kind == "drop_front":
+                    removed(self._drop_front(*args))
+                elif kind == "categories":
+                    self._set_categories(*args)
+
+        for task_id, new_data in after.items():
+            old_data = before[task_id]
+            if old_data is None and new_data is not None:
+                self._notify("add", new_data)
+            elif new_data is None and old_data is not None:
+                self._notify("delete", old_data)
+            elif new_data is not old_data:
+                if new_data.get("completed") != old_data.get("completed"):
+                    # Rückgängig gemachte Erledigung: Outbox meldet den jetzigen Stand zurück
+                    self._record_external_change(new_data)
+                self._notify("update", new_data, old_data)
+        return inverse
+
+    def undo(self) -> bool:
+        """Macht die letzte Änderung rückgängig (ohne Neuladen der Daten)"""
+        with self._write_lock:
+            step = self.history.pop_undo()
+            if step is None:
+                return False
+            self.history.push_redo(self._apply_step(step))
+            self._persist()
+            return True
+
+    def redo(self) -> bool:
+        """Wiederholt die zuletzt rückgängig gemachte Änderung"""
+        with self._write_lock:
+            step = self.history.pop_redo()
+            if step is None:
+                return False
+            self.history.push_undo(self._apply_step(step))
+            self._persist()
+            return True
+
+    def can_undo(self) -> bool:
+        return self.history.can_undo()
+
+    def can_redo(self) -> bool:
+        return self.history.can_redo()
+
+    @_reading
     def get_all_tasks(self) -> List[Task]:
         """Gibt alle aktiven Tasks zurück"""
-        return [Task.from_dict(t) for t in self.data["tasks"]]
+        return TaskTypeFactory.from_dicts(self.data["tasks"])
     
+    @_reading
     def get_archived_tasks(self) -> List[Task]:
         """Gibt alle archivierten Tasks zurück"""
-        if "archived_tasks" not in self.data:
-            self.data["archived_tasks"] = []
-        return [Task.from_dict(t) for t in self.data["archived_tasks"]]
+        return TaskTypeFactory.from_dicts(self.data.get("archived_tasks", []))
     
+    @_reading
     def get_task_by_id(self, task_id: int) -> Optional[Task]:
         """Findet Task nach ID"""
         for task_data in self.data["tasks"]:
@@ -123,78 +747,324 @@ class TaskRepository:
                 return Task.from_dict(task_data)
         return None
     
+    @_synchronized
     def add_task(self, task: Task) -> bool:
         """Fügt neue Task hinzu"""
         if not task.validate():
             return False
-        task.id = self.data["next_id"]
-        self.data["tasks"].insert(0, task.to_dict())  # Neue oben einfügen
-        self.data["next_id"] += 1
-        self.save()
+        task.id = self._allocate_ids(1)[0]
+        task_data = task.to_dict()
+        task_data["created_at"] = _now()
+        self._insert("tasks", 0, task_data)  # Neue oben einfügen
+        self._notify("add", task_data)
+        self._persist()
         return True
-    
+
+    @_synchronized
+    def add_tasks(self, tasks: List[Task], extra_fields: Optional[List[Dict]] = None,
+                  save: bool = True) -> int:
+        """Fügt mehrere Tasks mit einem einzigen Speichervorgang hinzu (Massenimport)"""
+        open_tasks, done_tasks = [], []
+        now = _now()
+        valid = [i for i, task in enumerate(tasks) if task.validate()]
+        for i, task_id in zip(valid, self._allocate_ids(len(valid))):
+            task = tasks[i]
+            task.id = task_id
+            task_data = task.to_dict()
+            if extra_fields:
+                task_data.update(extra_fields[i])
+            # Importe dürfen ihre ursprünglichen Zeitstempel mitbringen
+            task_data.setdefault("created_at", now)
+            if task.completed:
+                task_data.setdefault("completed_at", now)
+            # Erledigte Tasks landen wie beim Abhaken direkt im Archiv
+            (done_tasks if task.completed else open_tasks).append(task_data)
+        if not open_tasks and not done_tasks:
+            return 0
+        # Neue oben einfügen - ein Slice statt vieler insert(0, ...)
+        self._prepend("tasks", open_tasks[::-1])
+        self._prepend("archived_tasks", done_tasks[::-1])
+        for task_data in open_tasks + done_tasks:
+            self._notify("add", task_data)
+        if save:
+            self._persist()
+        return len(open_tasks) + len(done_tasks)
+
+    @_synchronized
     def update_task(self, task: Task) -> bool:
         """Aktualisiert existierende Task (FR-03)"""
         if not task.validate():
             return False
         for i, t in enumerate(self.data["tasks"]):
             if t["id"] == task.id:
-                self.data["tasks"][i] = task.to_dict()
-                self.save()
+                # Zusatzfelder (z. B. externe ID) bleiben erhalten
+                self._replace("tasks", i, {**t, **task.to_dict()})
+                self._notify("update", self.data["tasks"][i], t)
+                self._persist()
                 return True
         return False
     
+    @_synchronized
     def delete_task(self, task_id: int) -> bool:
         """Löscht Task (FR-02) - löscht endgültig (egal ob aktiv oder archiviert)"""
         # Aus aktiven Tasks entfernen
         for i, task_data in enumerate(self.data["tasks"]):
             if task_data["id"] == task_id:
-                self.data["tasks"].pop(i)
-                self.save()
+                self._pop("tasks", i)
+                self._notify("delete", task_data)
+                self._persist()
                 return True
         
         # Falls nicht in aktiven Tasks: Aus Archiv endgültig löschen
-        if "archived_tasks" in self.data:
-            original_archived_len = len(self.data["archived_tasks"])
-            self.data["archived_tasks"] = [t for t in self.data["archived_tasks"] if t["id"] != task_id]
-            if len(self.data["archived_tasks"]) < original_archived_len:
-                self.save()
+        for i, task_data in enumerate(self.data.get("archived_tasks", [])):
+            if task_data["id"] == task_id:
+                self._pop("archived_tasks", i)
+                self._notify("delete", task_data)
+                self._persist()
                 return True
         
         return False
     
+    @_synchronized
     def toggle_task_completion(self, task_id: int) -> bool:
         """Markiert Task als erledigt/offen (FR-04)"""
         for i, task_data in enumerate(self.data["tasks"]):
             if task_data["id"] == task_id:
-                task_data["completed"] = not task_data["completed"] #invertieren
+                # Neues Dict statt Änderung an Ort und Stelle (Undo behält die alte Fassung)
+                old_data = task_data
+                task_data = {**old_data, "completed": not old_data["completed"]} #invertieren
+                self._record_external_change(task_data)
                 # Bei Erledigung ins Archiv verschieben
+                follow_up = None
                 if task_data["completed"]:
-                    if "archived_tasks" not in self.data:
-                        self.data["archived_tasks"] = []
-                    self.data["archived_tasks"].insert(0, task_data)
-                    self.data["tasks"].pop(i)
-                self.save()
+                    task_data["completed_at"] = _now()
+                    if task_data.get("recurrence"):
+                        # Die Serie geht auf die Folge-Task über, das Archiv behält eine einmalige Kopie
+                        follow_up = self._next_occurrence(task_data.pop("recurrence"), old_data)
+                    self._pop("tasks", i)
+                    self._insert("archived_tasks", 0, task_data)
+                else:
+                    self._replace("tasks", i, task_data)
+                self._notify("update", task_data, old_data)
+                if follow_up is not None:
+                    self._insert("tasks", 0, follow_up)
+                    self._notify("add", follow_up)
+                self._persist()
                 return True
         return False
     
+    def use_shared_ids(self, block_size: int = 100) -> BlockIdAllocator:
+        """
+        IDs ab jetzt über die Zählerdatei <name>.ids vergeben.
+
+        Für mehrere Prozesse auf derselben Datendatei (App, CLI, API): jeder
+        reserviert eigene Blöcke, doppelte IDs sind ausgeschlossen.
+        """
+        if self.id_allocator is None:
+            self.id_allocator = BlockIdAllocator(
+                self.data_file.with_name(self.data_file.stem + ".ids"), block_size)
+        return self.id_allocator
+
+    def _allocate_ids(self, count: int) -> List[int]:
+        """Vergibt count neue IDs; next_id im Datenbestand bleibt dahinter"""
+        if count == 0:
+            return []
+        if self.id_allocator is None:
+            start = self.data["next_id"]
+            ids = list(range(start, start + count))
+        else:
+            ids = self.id_allocator.allocate(count, floor=self.data["next_id"])
+        self.data["next_id"] = max(self.data["next_id"], ids[-1] + 1)
+        return ids
+
+    def _next_occurrence(self, recurrence: Dict, task_data: Dict) -> Dict:
+        """Folge-Task einer wiederkehrenden Task (nächster Termin ab heute)"""
+        rule = RecurrenceRule.from_dict(recurrence)
+        today = date.today()
+        current = _parse_day(task_data.get("due_date")) or today
+        follow_up = {key: value for key, value in task_data.items()
+                     if key not in ("completed_at", "external_source", "external_id")}
+        follow_up.update(id=self._allocate_ids(1)[0], completed=False, created_at=_now(),
+                         due_date=rule.next_on_or_after(current, today).isoformat())
+        return follow_up
+
+    @_synchronized
+    def set_recurrence(self, task_id: int, rule: Optional[RecurrenceRule]) -> bool:
+        """Setzt oder entfernt die Wiederholungsregel einer offenen Task"""
+        if rule is not None and not rule.validate():
+            return False
+        for i, old_data in enumerate(self.data["tasks"]):
+            if old_data["id"] == task_id:
+                task_data = {k: v for k, v in old_data.items() if k != "recurrence"}
+                if rule is not None:
+                    task_data["recurrence"] = rule.to_dict()
+                    # Ohne Fälligkeit beginnt die Serie heute
+                    task_data["due_date"] = task_data.get("due_date") or date.today().isoformat()
+                self._replace("tasks", i, task_data)
+                self._notify("update", task_data, old_data)
+                self._persist()
+                return True
+        return False
+
+    @_synchronized
+    def remove_archived(self, task_ids: Set[int]) -> List[Dict]:
+        """Nimmt archivierte Tasks aus dem Datenbestand (Auslagerung, siehe archive.py)"""
+        archive = self.data.get("archived_tasks", [])
+        removed = [t for t in archive if t["id"] in task_ids]
+        if not removed:
+            return []
+        self.data["archived_tasks"] = [t for t in archive if t["id"] not in task_ids]
+        self.history.invalidate()
+        for task_data in removed:
+            self._notify("delete", task_data)
+        self._persist()
+        return removed
+
+    @_synchronized
+    def insert_restored(self, task_data: Dict) -> None:
+        """Fügt eine aus dem Kalt-Archiv zurückgeholte Task als offene Task ein"""
+        task_data = {**task_data, "completed": False}
+        task_data.pop("completed_at", None)
+        self._record_external_change(task_data)
+        self.data["tasks"].insert(0, task_data)
+        self.history.invalidate()
+        self._notify("add", task_data)
+        self._persist()
+
+    @_synchronized
     def restore_task(self, task_id: int) -> bool:
         """Stellt archivierte Task wieder her"""
         if "archived_tasks" not in self.data:
             return False
         for i, task_data in enumerate(self.data["archived_tasks"]):
             if task_data["id"] == task_id:
-                task_data["completed"] = False
-                self.data["tasks"].insert(0, task_data)
-                self.data["archived_tasks"].pop(i)
-                self.save()
+                old_data = task_data
+                task_data = {**old_data, "completed": False}
+                task_data.pop("completed_at", None)
+                self._record_external_change(task_data)
+                self._pop("archived_tasks", i)
+                self._insert("tasks", 0, task_data)
+                self._notify("update", task_data, old_data)
+                self._persist()
                 return True
         return False
     
+    # --- Synchronisation mit externen Quellen ---
+
+    def get_sync_state(self, source: str) -> Dict:
+        """Gibt den Sync-Zustand einer Quelle zurück (Token, ID-Mapping, Outbox)"""
+        state = self.data.setdefault("sync", {}).setdefault(source, {})
+        state.setdefault("token", None)
+        state.setdefault("mapping", {})
+        state.setdefault("outbox", {})
+        return state
+
+    def _record_external_change(self, task_data: Dict) -> None:
+        """Merkt lokale Statusänderungen importierter Tasks für den Rückweg vor (vor jeder anderen Änderung)"""
+        source, external_id = task_data.get("external_source"), task_data.get("external_id")
+        if source and external_id:
+            outbox = self.get_sync_state(source)["outbox"]
+            outbox[external_id] = task_data["completed"]
+
+    @_synchronized
+    def apply_external_changes(self, source: str, changes: List[tuple],
+                               token: Optional[str]) -> Dict[str, int]:
+        """
+        Übernimmt geänderte externe Tasks [(external_id, Task), ...] und speichert einmal.
+
+        Bekannte Tasks werden aktualisiert (inkl. Wechsel zwischen aktiv und
+        Archiv), unbekannte neu angelegt. Lokal gelöschte Tasks bleiben gelöscht.
+        """
+        state = self.get_sync_state(source)
+        mapping = state["mapping"]
+        result = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+
+        # Bekannte Tasks über den ID-Index nachschlagen - kein Durchlauf über alle Tasks
+        known = [(mapping[ext_id], task) for ext_id, task in changes if ext_id in mapping]
+        index = self._get_id_index() if known else None
+        for task_id, task in known:
+            old_data = index.get(task_id)
+            if old_data is None:
+                result["skipped"] += 1  # lokal gelöscht
+                continue
+            # Neues Dict statt Änderung an Ort und Stelle (Indizes kennen noch die alte Fassung)
+            task_data = {**old_data, "title": task.title, "category": task.category,
+                         "due_date": task.due_date, "completed": task.completed,
+                         "priority": task.priority}
+            if task_data == old_data:
+                result["unchanged"] += 1  # z. B. Echo einer eigenen Rückmeldung
+                continue
+            list_name = "archived_tasks" if old_data.get("completed") else "tasks"
+            i = self.data[list_name].index(old_data)
+            if task.completed != bool(old_data.get("completed")):
+                if task.completed:
+                    task_data["completed_at"] = _now()
+                else:
+                    task_data.pop("completed_at", None)
+                self._pop(list_name, i)
+                self._insert("archived_tasks" if task.completed else "tasks", 0, task_data)
+            else:
+                self._replace(list_name, i, task_data)
+            self._notify("update", task_data, old_data)
+            result["updated"] += 1
+
+        result["created"] = self._add_external(source, [(ext_id, task) for ext_id, task in changes
+                                                          if ext_id not in mapping])
+
+        changed = bool(result["updated"] or result["created"])
+        if changed:
+            # Mapping ist nicht Teil der Undo-Deltas - ältere Schritte passen nicht mehr dazu
+            self.history.invalidate()
+        if changed or token != state["token"]:
+            state["token"] = token
+            self._persist(lists_changed=changed)
+        return result
+
+    def _add_external(self, source: str, items: List[tuple]) -> int:
+        """Legt externe Tasks an und merkt ihre IDs im Mapping (ohne Speichern)"""
+        mapping = self.get_sync_state(source)["mapping"]
+        new = {ext_id: task for ext_id, task in items if ext_id not in mapping}
+        if not new:
+            return 0
+        tasks = list(new.values())
+        self.add_tasks(tasks, [{"external_source": source, "external_id": ext_id} for ext_id in new],
+                       save=False)
+        created = 0
+        for ext_id, task in zip(new, tasks):
+            if task.id:
+                mapping[ext_id] = task.id
+                created += 1
+        return created
+
+    @_synchronized
+    def add_external_tasks(self, source: str, items: List[tuple]) -> int:
+        """
+        Importiert externe Tasks [(external_id, Task), ...] mit einem Speichervorgang.
+
+        Bereits zugeordnete IDs werden übersprungen; neue landen im Mapping
+        der Quelle, sodass ein späterer Sync sie wiedererkennt.
+        """
+        created = self._add_external(source, items)
+        if created:
+            # Mapping ist nicht Teil der Undo-Deltas
+            self.history.invalidate()
+            self._persist()
+        return created
+
+    @_synchronized
+    def clear_sync_outbox(self, source: str, external_ids: List[str]) -> None:
+        """Entfernt zurückgemeldete Einträge aus der Outbox"""
+        outbox = self.get_sync_state(source)["outbox"]
+        removed = [ext_id for ext_id in external_ids if outbox.pop(ext_id, None) is not None]
+        if removed:
+            self._persist(lists_changed=False)
+
+    @_reading
     def get_categories(self) -> List[Dict]:
         """Gibt alle Kategorien als Dicts zurück"""
         return self.data.get("categories", [])
     
+    @_reading
     def get_category_color(self, name: str) -> str:
         """Gibt die Farbe einer Kategorie zurück"""
         for cat in self.data.get("categories", []):
@@ -202,6 +1072,7 @@ class TaskRepository:
                 return cat["color"]
         return "#e8e8e8"
     
+    @_synchronized
     def add_category(self, category: Category) -> bool:
         """Fügt neue Kategorie hinzu (FR-05)"""
         if not category.validate():
@@ -210,21 +1081,22 @@ class TaskRepository:
             return False
         if len(self.data["categories"]) >= Category.MAX_CATEGORIES:
             return False
-        self.data["categories"].append({"name": category.name, "color": category.color})
-        self.save()
+        self._set_categories(self.data["categories"] + [{"name": category.name, "color": category.color}])
+        self._persist()
         return True
     
+    @_synchronized
     def delete_category(self, category_name: str) -> bool:
         """Löscht Kategorie"""
-        self.data["categories"] = [c for c in self.data["categories"] if c["name"] != category_name]
+        self._set_categories([c for c in self.data["categories"] if c["name"] != category_name])
         # Tasks auf "Keine" setzen
-        for task in self.data["tasks"]:
-            if task["category"] == category_name:
-                task["category"] = "Keine"
-        for task in self.data.get("archived_tasks", []):
-            if task["category"] == category_name:
-                task["category"] = "Keine"
-        self.save()
+        for list_name in ("tasks", "archived_tasks"):
+            for i, task in enumerate(self.data.get(list_name, [])):
+                if task["category"] == category_name:
+                    new_data = {**task, "category": "Keine"}
+                    self._replace(list_name, i, new_data)
+                    self._notify("update", new_data, task)
+        self._persist()
         return True
     
     def filter_tasks(self, status: Optional[str] = None, 
@@ -244,7 +1116,96 @@ class TaskRepository:
         
         return tasks
     
+    def _get_due_index(self) -> DueDateIndex:
+        """Fälligkeits-Index; Aufbau zählt als Änderung (Schreib-Lock), also vor dem Lese-Lock holen"""
+        index = self._due_index
+        if index is None:
+            with self._write_lock:
+                if self._due_index is None:
+                    # Wie der Prioritäts-Index erst bei Bedarf aufgebaut
+                    self._due_index = DueDateIndex(self.data["tasks"])
+                    self.add_listener(self._due_index.on_change)
+                index = self._due_index
+        return index
+
+    def _get_id_index(self) -> TaskIdIndex:
+        """ID-Index über beide Listen; wie die anderen Indizes erst bei Bedarf aufgebaut"""
+        index = self._id_index
+        if index is None:
+            with self._write_lock:
+                if self._id_index is None:
+                    self._id_index = TaskIdIndex(self.data["tasks"], self.data.get("archived_tasks", []))
+                    self.add_listener(self._id_index.on_change)
+                index = self._id_index
+        return index
+
     def get_urgent_tasks(self) -> List[Task]:
-        """Gibt alle dringlichen Tasks zurück"""
-        return [t for t in self.get_all_tasks() if t.is_urgent()]
+        """Gibt alle dringlichen Tasks zurück (heute oder morgen fällig, über den Fälligkeits-Index)"""
+        today = date.today()
+        index = self._get_due_index()
+        with self._read_lock:
+            rows = index.between(today.isoformat(), (today + timedelta(days=2)).isoformat())
+        return [task for task in TaskTypeFactory.from_dicts(rows) if task.is_urgent()]
+
+    def get_occurrences(self, start: date, end: date) -> List[tuple]:
+        """
+        Termine offener Tasks im Fenster [start, end] als (Datum, Task), nach Datum sortiert.
+
+        Wiederkehrende Tasks werden lazy über ihre Regel erweitert; nur der
+        aktuelle Termin existiert als Task, spätere werden nicht angelegt.
+        """
+        index = self._get_due_index()
+        with self._read_lock:
+            rows, recurring = index.between(start.isoformat(), (end + timedelta(days=1)).isoformat()), index.recurring()
+        result = []
+        for task_data in rows:
+            day = _parse_day(task_data["due_date"])
+            if day is not None and not task_data.get("recurrence"):
+                result.append((day, task_data))
+        for task_data in recurring:
+            first = _parse_day(task_data["due_date"])
+            if first is not None:
+                rule = RecurrenceRule.from_dict(task_data["recurrence"])
+                result.extend((day, task_data) for day in rule.occurrences(first, start, end))
+        result.sort(key=lambda entry: (entry[0], entry[1]["id"]))
+        return [(day, Task.from_dict(task_data)) for day, task_data in result]
+    
+    def get_statistics(self, today: Optional[date] = None) -> Dict:
+        """
+        Dashboard-Kennzahlen ohne Durchlauf über alle Tasks.
+
+        Zähler werden beim ersten Aufruf aufgebaut und danach über die
+        Beobachter-Events gepflegt; überfällig/diese Woche kommen per bisect
+        aus dem Fälligkeits-Index.
+        """
+        statistics = self._statistics
+        if statistics is None:
+            with self._write_lock:
+                if self._statistics is None:
+                    self._statistics = TaskStatistics(
+                        self.data["tasks"] + self.data.get("archived_tasks", []))
+                    self.add_listener(self._statistics.on_change)
+                statistics = self._statistics
+        index = self._get_due_index()
+        with self._read_lock:
+            today = today or date.today()
+            stats = statistics.get_stats(today)
+            stats["overdue"] = index.count_between("", today.isoformat())
+            stats["due_this_week"] = index.count_between(
+                today.isoformat(), (today + timedelta(days=7)).isoformat())
+            return stats
+
+    def get_next_tasks(self, limit: int = 5) -> List[Task]:
+        """Gibt die nächsten offenen Tasks zurück (Priorität, dann Fälligkeit) FR-10"""
+        index = self._priority_index
+        if index is None:
+            with self._write_lock:
+                if self._priority_index is None:
+                    # Index erst bei Bedarf aufbauen und danach inkrementell pflegen
+                    self._priority_index = PriorityIndex(self.data["tasks"])
+                    self.add_listener(self._priority_index.on_change)
+                index = self._priority_index
+        with self._read_lock:
+            rows = index.top(limit)
+        return [Task.from_dict(t) for t in rows]
 
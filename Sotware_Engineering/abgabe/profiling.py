@@ -0,0 +1,215 @@
+# PROFILING - Profiling-Modus für einzelne Streamlit-Reruns
+# Verantwortlichkeiten:
+# - Kompletten Skriptlauf mit cProfile und tracemalloc messen
+# - Laufzeit den Schichten view / controller / model zuordnen
+# - Report pro Rerun und rollierende Übersicht der langsamsten Reruns
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Dateien der App und ihre MVC-Schicht
+LAYER_FILES = {
+    "view.py": "view",
+    "controller.py": "controller",
+    "model.py": "model",
+    "indexes.py": "model",
+    "sharding.py": "model",
+    "tenants.py": "model",
+    "sync.py": "model",
+    "importer.py": "model",
+    "history.py": "model",
+    "snapshots.py": "model",
+    "archive.py": "model",
+    "recurrence.py": "model",
+    "task_statistics.py": "model",
+    "analytics.py": "model",
+    "reminders.py": "model",
+    "validation.py": "model",
+    "id_allocator.py": "model",
+    "rwlock.py": "model",
+    "app.py": "app",
+    "cli.py": "app",
+    "api_server.py": "app",
+    "instrumentation.py": "instrumentation",
+    "profiling.py": "instrumentation"
+}
+
+_summary_lock = threading.Lock()
+# cProfile verträgt keine zwei aktiven Profiler (ab Python 3.12 ValueError) - ein Rerun zur Zeit
+_profile_lock = threading.Lock()
+# tracemalloc ist prozessweit: gleichzeitige Reruns teilen sich eine Messung
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def profiling_requested(query_params=None) -> bool:
+    """Profiling per Umgebungsvariable TODO_PROFILE=1 oder Query-Parameter ?profile=1"""
+    if os.environ.get("TODO_PROFILE") == "1":
+        return True
+    return query_params is not None and query_params.get("profile") == "1"
+
+
+def _own_layer(func: tuple) -> Optional[str]:
+    """Schicht einer Funktion anhand ihrer Datei (None = Builtin/Standardbibliothek)"""
+    filename = func[0].replace("\\", "/")
+    if "/streamlit/" in filename:
+        return "streamlit"
+    return LAYER_FILES.get(filename.rsplit("/", 1)[-1])
+
+
+def attribute_layers(stats: pstats.Stats) -> Dict[str, float]:
+    """
+    Summiert die Eigenzeit (tottime) pro Schicht.
+
+    Builtins und Standardbibliothek (z. B. json-Parsing) werden der Schicht
+    ihres dominierenden Aufrufers zugerechnet, sonst "other".
+    """
+    raw = stats.stats
+    resolved: Dict[tuple, str] = {}
+
+    def resolve(func: tuple, depth: int = 0) -> str:
+        if func in resolved:
+            return resolved[func]
+        layer = _own_layer(func)
+        if layer is None:
+            callers = raw.get(func, (0, 0, 0, 0, {}))[4]
+            if callers and depth < 20:
+                dominant = max(callers.items(), key=lambda item: item[1][3])[0]
+                layer = resolve(dominant, depth + 1)
+            else:
+                layer = "other"
+        resolved[func] = layer
+        return layer
+
+    layers: Dict[str, float] = {}
+    for func, (_, _, tottime, _, _) in raw.items():
+        layer = resolve(func)
+        layers[layer] = layers.get(layer, 0.0) + tottime
+    return {layer: round(seconds, 6) for layer, seconds in sorted(layers.items(), key=lambda i: -i[1])}
+
+
+class RerunProfiler:
+    """
+    Kontextmanager, der einen kompletten App-Lauf profiliert.
+
+    Schreibt pro Lauf einen JSON-Report nach report_dir und pflegt
+    summary.json mit den keep_slowest langsamsten Läufen. Ausnahmen (auch
+    Streamlits Rerun-Signal) werden nicht verschluckt.
+
+    Es wird immer nur ein Rerun zur Zeit profiliert; gleichzeitige Reruns
+    anderer Sessions (oder ein bereits aktiver fremder Profiler) laufen
+    ungemessen weiter, report bleibt dann None. tracemalloc wird über einen
+    Referenzzähler gestartet und gestoppt; hat jemand anderes es gestartet,
+    bleibt der Speicherteil leer.
+    """
+
+    def __init__(self, report_dir: Optional[Path] = None, keep_slowest: int = 20,
+                 track_memory: bool = True, label: str = "rerun"):
+        self.report_dir = Path(report_dir or os.environ.get("TODO_PROFILE_DIR", "profiles"))
+        self.keep_slowest = keep_slowest
+        self.track_memory = track_memory
+        self.label = label
+        self.report: Optional[Dict] = None
+        self._profile = cProfile.Profile()
+        self._active = False
+        self._tracing = False
+
+    def __enter__(self) -> "RerunProfiler":
+        global _tracemalloc_users
+        if not _profile_lock.acquire(blocking=False):
+            return self  # ein anderer Rerun wird gerade profiliert
+        try:
+            self._profile.enable()
+        except ValueError:
+            # Fremder Profiler aktiv (Python >= 3.12)
+            _profile_lock.release()
+            return self
+        self._active = True
+        if self.track_memory:
+            with _tracemalloc_lock:
+                # Fremd gestartetes tracemalloc nicht anfassen (kein reset_peak/stop)
+                if _tracemalloc_users or not tracemalloc.is_tracing():
+                    if not _tracemalloc_users:
+                        tracemalloc.start()
+                    _tracemalloc_users += 1
+                    self._tracing = True
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if not self._active:
+            return False
+        self._profile.disable()
+        self._active = False
+        _profile_lock.release()
+        wall = time.perf_counter() - self._start
+        memory = self._stop_tracing() if self._tracing else {}
+        self.report = self._build_report(wall, memory, exc_type)
+        self._write(self.report)
+        return False
+
+    def _stop_tracing(self) -> Dict:
+        """Liest die Speicherwerte; der letzte Rerun stoppt tracemalloc"""
+        global _tracemalloc_users
+        with _tracemalloc_lock:
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:10]
+            _tracemalloc_users -= 1
+            if not _tracemalloc_users:
+                tracemalloc.stop()
+        self._tracing = False
+        return {
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top_allocations": [{"where": str(stat.traceback), "bytes": stat.size} for stat in top]
+        }
+
+    def _build_report(self, wall: float, memory: Dict, exc_type) -> Dict:
+        stats = pstats.Stats(self._profile)
+        top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:25]
+        return {
+            "label": self.label,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "wall_s": round(wall, 6),
+            # Streamlit beendet Reruns über Ausnahmen - kein Fehler im eigentlichen Sinn
+            "ended_by": exc_type.__name__ if exc_type else None,
+            "layers": attribute_layers(stats),
+            "top_functions": [
+                {
+                    "function": f"{Path(func[0]).name}:{func[1]}({func[2]})",
+                    "layer": _own_layer(func) or "other",
+                    "calls": nc,
+                    "tottime_s": round(tt, 6),
+                    "cumtime_s": round(ct, 6)
+                }
+                for func, (_, nc, tt, ct, _) in top
+            ],
+            "memory": memory
+        }
+
+    def _write(self, report: Dict) -> None:
+        """Schreibt den Report und aktualisiert die Übersicht der langsamsten Läufe"""
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self.report_dir / f"{self.label}-{stamp}-{threading.get_ident()}-{time.perf_counter_ns()}.json"
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        entry = {"report": path.name, "timestamp": report["timestamp"],
+                 "wall_s": report["wall_s"], "layers": report["layers"]}
+        summary_path = self.report_dir / "summary.json"
+        with _summary_lock:
+            summary: List[Dict] = []
+            if summary_path.exists():
+                try:
+                    summary = json.loads(summary_path.read_text(encoding="utf-8"))
+                except json.JSONDecodeError:
+                    summary = []
+            summary.append(entry)
+            summary.sort(key=lambda e: e["wall_s"], reverse=True)
+            summary_path.write_text(json.dumps(summary[:self.keep_slowest], indent=2), encoding="utf-8")
@@ -0,0 +1,94 @@
+# RECURRENCE - Wiederkehrende Aufgaben
+# Verantwortlichkeiten:
+# - Wiederholungsregeln (täglich, wöchentlich, monatlich, bestimmte Wochentage)
+# - Nächsten Termin berechnen (beim Erledigen wird genau eine Folge-Task angelegt)
+# - Termine in einem Zeitfenster lazy erzeugen, ohne sie als Tasks anzulegen
+
+import calendar
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+FREQUENCIES = ("daily", "weekly", "monthly", "custom")
+FREQUENCY_LABELS = {"daily": "Täglich", "weekly": "Wöchentlich",
+                    "monthly": "Monatlich", "custom": "Wochentage"}
+
+
+class RecurrenceRule:
+    """
+    Wiederholungsregel einer Task (im Task-Dict unter "recurrence").
+
+    daily/weekly/monthly wiederholen alle interval Tage/Wochen/Monate;
+    monatlich bleibt der Tag erhalten (31. -> letzter Tag kürzerer Monate).
+    custom wiederholt an den Wochentagen weekdays (0 = Montag) in jeder
+    interval-ten Woche.
+    """
+
+    def __init__(self, freq: str, interval: int = 1, weekdays: Optional[List[int]] = None,
+                 day: Optional[int] = None):
+        self.freq = freq
+        self.interval = interval
+        self.weekdays = sorted(set(weekdays or []))
+        self.day = day
+
+    def validate(self) -> bool:
+        """Prüft die Regel"""
+        if self.freq not in FREQUENCIES or self.interval < 1:
+            return False
+        if self.freq == "custom":
+            return bool(self.weekdays) and all(0 <= d <= 6 for d in self.weekdays)
+        return self.day is None or 1 <= self.day <= 31
+
+    def to_dict(self) -> Dict:
+        data = {"freq": self.freq, "interval": self.interval}
+        if self.weekdays:
+            data["weekdays"] = self.weekdays
+        if self.day is not None:
+            data["day"] = self.day
+        return data
+
+    @staticmethod
+    def from_dict(data: Dict) -> "RecurrenceRule":
+        return RecurrenceRule(data["freq"], data.get("interval", 1),
+                              data.get("weekdays"), data.get("day"))
+
+    def describe(self) -> str:
+        """Kurzbeschreibung für die Anzeige"""
+        label = FREQUENCY_LABELS.get(self.freq, self.freq)
+        if self.freq == "custom":
+            names = "Mo Di Mi Do Fr Sa So".split()
+            label = ", ".join(names[d] for d in self.weekdays)
+        return label if self.interval == 1 else f"{label} (alle {self.interval})"
+
+    def next_after(self, current: date) -> date:
+        """Erster Termin nach current (current gilt als Termin der Serie)"""
+        if self.freq == "daily":
+            return current + timedelta(days=self.interval)
+        if self.freq == "weekly":
+            return current + timedelta(weeks=self.interval)
+        if self.freq == "monthly":
+            month_index = current.month - 1 + self.interval
+            year, month = current.year + month_index // 12, month_index % 12 + 1
+            day = min(self.day or current.day, calendar.monthrange(year, month)[1])
+            return date(year, month, day)
+        # custom: nächster passender Wochentag, nach der letzten Woche interval-1 Wochen überspringen
+        for weekday in self.weekdays:
+            if weekday > current.weekday():
+                return current + timedelta(days=weekday - current.weekday())
+        week_start = current - timedelta(days=current.weekday())
+        return week_start + timedelta(weeks=self.interval, days=self.weekdays[0])
+
+    def next_on_or_after(self, current: date, earliest: date) -> date:
+        """Nächster Termin nach current, frühestens earliest (überspringt Verpasstes)"""
+        following = self.next_after(current)
+        while following < earliest:
+            following = self.next_after(following)
+        return following
+
+    def occurrences(self, first: date, start: date, end: date) -> Iterator[date]:
+        """Termine ab first im Fenster [start, end] - lazy, einer nach dem anderen"""
+        current = first
+        while current < start:
+            current = self.next_after(current)
+        while current <= end:
+            yield current
+            current = self.next_after(current)
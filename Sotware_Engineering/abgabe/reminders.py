@@ -0,0 +1,246 @@
+# REMINDERS - Erinnerungen an fällige Tasks
+# Verantwortlichkeiten:
+# - Erinnerungszeitpunkte offener Tasks in einem Min-Heap führen
+# - Heap über die Beobachter des Repositorys inkrementell aktualisieren
+# - Zum richtigen Zeitpunkt Benachrichtigungen auslösen (Log, Datei, Webhook)
+
+import heapq
+import json
+import logging
+import threading
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from model import TaskRepository
+
+logger = logging.getLogger("todo.reminders")
+
+# Spätestens so oft (Sekunden) aufwachen - fängt Uhrsprünge ab, ohne Tasks zu durchsuchen
+MAX_WAIT = 300.0
+
+Notifier = Callable[[Dict], None]
+
+
+class LogNotifier:
+    """Schreibt Erinnerungen ins Log"""
+
+    def __call__(self, reminder: Dict) -> None:
+        logger.info("Erinnerung: #%s %s (fällig %s)",
+                    reminder["id"], reminder["title"], reminder["due_date"])
+
+
+class FileNotifier:
+    """Hängt Erinnerungen als JSON-Zeilen an eine Datei an"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def __call__(self, reminder: Dict) -> None:
+        line = json.dumps(reminder, ensure_ascii=False) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class WebhookNotifier:
+    """Sendet Erinnerungen per POST als JSON an eine URL"""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, reminder: Dict) -> None:
+        import urllib.request  # nur bei Webhook-Nutzung laden
+        request = urllib.request.Request(
+            self.url, data=json.dumps(reminder, ensure_ascii=False).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def notifier_from_spec(spec: str) -> Notifier:
+    """Notifier aus einer Angabe wie "log", "file:<pfad>" oder einer http(s)-URL"""
+    if spec == "log":
+        return LogNotifier()
+    if spec.startswith("file:"):
+        return FileNotifier(Path(spec[len("file:"):]))
+    if spec.startswith(("http://", "https://")):
+        return WebhookNotifier(spec)
+    raise ValueError(f"Unbekannter Notifier: {spec}")
+
+
+class ReminderScheduler:
+    """
+    Erinnert an offene Tasks kurz vor ihrer Fälligkeit.
+
+    Jede offene Task mit Fälligkeit hat einen Erinnerungszeitpunkt: Fälligkeit
+    minus lead, bei reinen Datumsangaben bezogen auf remind_at Uhr. Die
+    Zeitpunkte liegen in einem Min-Heap; der Thread schläft bis zum ersten
+    Eintrag und wird bei Änderungen geweckt. Geänderte oder gelöschte Tasks
+    werden nicht aus dem Heap entfernt, sondern in _scheduled überschrieben
+    bzw. gestrichen - veraltete Einträge fallen beim Entnehmen heraus.
+
+    Jede Fälligkeit wird höchstens einmal gemeldet; bereits überfällige Tasks
+    lösen keine Erinnerung aus. clock ist austauschbar (Tests).
+    """
+
+    def __init__(self, repository: TaskRepository, notifiers: Optional[List[Notifier]] = None,
+                 lead: timedelta = timedelta(days=1), remind_at: time = time(9, 0),
+                 clock: Callable[[], datetime] = datetime.now):
+        self.repository = repository
+        self.notifiers = list(notifiers) if notifiers is not None else [LogNotifier()]
+        self.lead = lead
+        self.remind_at = remind_at
+        self.clock = clock
+        self._heap: List[Tuple[datetime, int, str]] = []
+        # Gültiger Eintrag je Task: (Zeitpunkt, Fälligkeit)
+        self._scheduled: Dict[int, Tuple[datetime, str]] = {}
+        self._tasks: Dict[int, Dict] = {}
+        # Bereits gemeldete Fälligkeit je Task
+        self._fired: Dict[int, str] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = False
+        self._attached = False
+        self.last_error: Optional[Exception] = None
+
+    # --- Heap pflegen ---
+
+    def _fire_time(self, due_date: str) -> Optional[datetime]:
+        try:
+            if len(due_date) > 10:
+                due = datetime.fromisoformat(due_date)
+            else:
+                due = datetime.combine(date.fromisoformat(due_date), self.remind_at)
+        except (TypeError, ValueError):
+            return None
+        if due.date() < self.clock().date():
+            return None  # schon überfällig - dafür gibt es keine Erinnerung mehr
+        return due - self.lead
+
+    def _schedule(self, task_data: Dict) -> None:
+        task_id, due_date = task_data["id"], task_data.get("due_date")
+        self._scheduled.pop(task_id, None)
+        self._tasks.pop(task_id, None)
+        if task_data.get("completed") or not due_date or self._fired.get(task_id) == due_date:
+            return
+        fire_at = self._fire_time(due_date)
+        if fire_at is None:
+            return
+        self._scheduled[task_id] = (fire_at, due_date)
+        self._tasks[task_id] = task_data
+        heapq.heappush(self._heap, (fire_at, task_id, due_date))
+        if len(self._heap) > 2 * len(self._scheduled) + 64:
+            # Überwiegend veraltete Einträge: Heap aus den gültigen neu aufbauen
+            self._heap = [(f, i, d) for i, (f, d) in self._scheduled.items()]
+            heapq.heapify(self._heap)
+
+    def _rebuild(self) -> None:
+        self._heap, self._scheduled, self._tasks = [], {}, {}
+        for task_data in self.repository.data.get("tasks", []):
+            self._schedule(task_data)
+
+    def _on_change(self, event: str, task_data: Optional[Dict], old_data: Optional[Dict]) -> None:
+        with self._condition:
+            if event == "reset":
+                self._rebuild()
+            elif event == "delete":
+                for table in (self._scheduled, self._tasks, self._fired):
+                    table.pop(task_data["id"], None)
+            else:
+                self._schedule(task_data)
+            self._condition.notify()
+
+    def attach(self) -> None:
+        """Baut den Heap aus dem Repository und folgt ab jetzt seinen Änderungen"""
+        if self._attached:
+            return
+        with self.repository.batch(), self._condition:
+            self._rebuild()
+            self.repository.add_listener(self._on_change)
+            self._attached = True
+
+    def detach(self) -> None:
+        with self.repository.batch():
+            self.repository.remove_listener(self._on_change)
+            self._attached = False
+
+    # --- Auslösen ---
+
+    def pending(self) -> List[Dict]:
+        """Geplante Erinnerungen in zeitlicher Reihenfolge"""
+        with self._condition:
+            return [self._reminder(task_id, fire_at)
+                    for task_id, (fire_at, _) in sorted(self._scheduled.items(), key=lambda e: e[1])]
+
+    def _reminder(self, task_id: int, fire_at: datetime) -> Dict:
+        task_data = self._tasks[task_id]
+        return {"id": task_id, "title": task_data.get("title"),
+                "category": task_data.get("category"), "due_date": task_data.get("due_date"),
+                "remind_at": fire_at.isoformat(timespec="seconds")}
+
+    def _seconds_until_next(self) -> Optional[float]:
+        """Wartezeit bis zum ersten gültigen Eintrag (veraltete werden dabei verworfen)"""
+        while self._heap:
+            fire_at, task_id, due_date = self._heap[0]
+            if self._scheduled.get(task_id) == (fire_at, due_date):
+                return max((fire_at - self.clock()).total_seconds(), 0.0)
+            heapq.heappop(self._heap)
+        return None
+
+    def run_pending(self) -> List[Dict]:
+        """Meldet alle fälligen Erinnerungen und gibt sie zurück"""
+        due: List[Dict] = []
+        with self._condition:
+            now = self.clock()
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, task_id, due_date = heapq.heappop(self._heap)
+                if self._scheduled.get(task_id) != (fire_at, due_date):
+                    continue  # veraltet (Task geändert, erledigt oder gelöscht)
+                due.append(self._reminder(task_id, fire_at))
+                del self._scheduled[task_id]
+                del self._tasks[task_id]
+                self._fired[task_id] = due_date
+        # Benachrichtigen ohne Sperre - ein langsamer Webhook blockiert keine Änderungen
+        for reminder in due:
+            for notifier in self.notifiers:
+                try:
+                    notifier(reminder)
+                except Exception as e:
+                    self.last_error = e
+                    logger.warning("Benachrichtigung fehlgeschlagen: %s", e)
+        return due
+
+    # --- Hintergrund-Thread ---
+
+    def start(self) -> None:
+        """Startet den Hintergrund-Thread (hängt sich bei Bedarf ans Repository)"""
+        if self._thread is not None:
+            return
+        self.attach()
+        self._stop = False
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        with self._condition:
+            self._stop = True
+            self._condition.notify()
+        thread.join()
+        self._thread = None
+
+    def _loop(self) -> None:
+        while True:
+            with self._condition:
+                if self._stop:
+                    return
+                wait = self._seconds_until_next()
+                if wait is None or wait > 0:
+                    self._condition.wait(MAX_WAIT if wait is None else min(wait, MAX_WAIT))
+                if self._stop:
+                    return
+            self.run_pending()
@@ -0,0 +1,94 @@
+# RWLOCK - Lese-/Schreib-Lock für gemeinsam genutzte Repositories
+# Verantwortlichkeiten:
+# - Viele gleichzeitige Leser, exklusive Schreiber
+# - Schreiber haben Vorrang (keine Aushungerung durch Dauer-Leser)
+# - Reentrant wie threading.RLock: verschachtelte Schreib-/Lesezugriffe im selben Thread
+
+import threading
+from typing import Callable
+
+
+class _Side:
+    """Kontextmanager für eine Seite des Locks (with lock.read / with lock.write)"""
+
+    def __init__(self, acquire: Callable[[], None], release: Callable[[], None]):
+        self.acquire = acquire
+        self.release = release
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class ReadWriteLock:
+    """
+    Lese-/Schreib-Lock mit Schreiber-Vorrang.
+
+    Ein Thread, der schreibt, darf beliebig verschachtelt lesen und schreiben.
+    Ein lesender Thread darf erneut lesen (auch wenn ein Schreiber wartet),
+    aber nicht zum Schreiben aufwerten - das würde sich selbst blockieren und
+    wird als RuntimeError gemeldet.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+        # Je Thread: Stapel der Lesezugriffe (True = zählt als Leser, False = innerhalb eines Schreibzugriffs)
+        self._local = threading.local()
+        self.read = _Side(self.acquire_read, self.release_read)
+        self.write = _Side(self.acquire_write, self.release_write)
+
+    def _reads(self) -> list:
+        stack = getattr(self._local, "reads", None)
+        if stack is None:
+            stack = self._local.reads = []
+        return stack
+
+    def acquire_read(self) -> None:
+        reads = self._reads()
+        if self._writer == threading.get_ident():
+            reads.append(False)
+            return
+        with self._condition:
+            if not any(reads):
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+            self._readers += 1
+        reads.append(True)
+
+    def release_read(self) -> None:
+        if self._reads().pop():
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        if self._writer == me:
+            self._write_depth += 1
+            return
+        if any(self._reads()):
+            raise RuntimeError("Lesezugriff kann nicht zum Schreibzugriff aufgewertet werden")
+        with self._condition:
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        self._write_depth -= 1
+        if not self._write_depth:
+            with self._condition:
+                self._writer = None
+                self._condition.notify_all()
@@ -0,0 +1,257 @@
+# SHARDING - Aufgeteilte Ablage großer Datenbestände
+# Verantwortlichkeiten:
+# - Tasks nach Kategorie oder ID-Hash auf Segmentdateien verteilen
+# - Kleines Manifest mit next_id, Kategorien, Sync-Zustand und Segmentliste
+# - Beim Speichern nur geänderte Segmente neu schreiben
+
+import hashlib
+import json
+import re
+from itertools import chain
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from model import Task, TaskRepository, TaskTypeFactory
+
+LISTS = ("tasks", "archived_tasks")
+SHARD_MODES = ("category", "hash")
+
+
+class ShardedTaskRepository(TaskRepository):
+    """
+    TaskRepository mit Segmentdateien statt einer einzigen JSON-Datei.
+
+    data_file ist das Manifest, die Segmente liegen daneben in
+    <name>.shards/. Im Speicher bleibt die gewohnte Struktur (tasks,
+    archived_tasks, ...) erhalten, sodass alle Methoden unverändert
+    funktionieren. Über die Beobachter-Events wird gemerkt, welche Segmente
+    sich geändert haben; save() schreibt nur diese und das Manifest (falls
+    es sich geändert hat).
+
+    Die Reihenfolge der Listen (neueste vorne) wird über eine Laufnummer pro
+    Task abgebildet: Neue Einträge kommen immer vorne hinzu und erhalten beim
+    Speichern die nächsthöheren Nummern. Beim Laden werden die Segmente nach
+    absteigender Laufnummer zusammengeführt.
+
+    Ein bestehender ungeteilter Datenbestand wird beim ersten Speichern
+    vollständig in Segmente überführt.
+    """
+
+    def __init__(self, data_file: Path = Path("todo_data.json"),
+                 shard_by: str = "category", shard_count: int = 16, thread_safe: bool = False):
+        if shard_by not in SHARD_MODES:
+            raise ValueError(f"Unbekannte Aufteilung: {shard_by}")
+        self.shard_by = shard_by
+        self.shard_count = shard_count
+        self.shard_dir = data_file.with_name(data_file.stem + ".shards")
+        self._seqs: Dict[str, Dict[int, int]] = {name: {} for name in LISTS}
+        self._next_seq = 1
+        self._dirty_shards: Set[str] = set()
+        self._written_manifest: Optional[str] = None
+        self._category_keys: Dict[str, str] = {}
+        # Undo/Redo fügt Tasks auch mitten in die Listen ein
+        self._renumber = False
+        super().__init__(data_file, thread_safe)
+        self.add_listener(self._track_change)
+
+    # --- Segmente ---
+
+    def shard_key(self, task_data: Dict) -> str:
+        """Segment, in das eine Task gehört"""
+        if self.shard_by == "hash":
+            return f"hash-{task_data['id'] % self.shard_count}"
+        category = task_data.get("category", "Keine")
+        key = self._category_keys.get(category)
+        if key is None:
+            safe = re.sub(r"[^A-Za-z0-9_-]", "_", category)[:40]
+            digest = hashlib.sha1(category.encode("utf-8")).hexdigest()[:8]
+            key = self._category_keys[category] = f"cat-{safe}-{digest}"
+        return key
+
+    def _shard_path(self, key: str) -> Path:
+        return self.shard_dir / f"{key}.json"
+
+    def _track_change(self, event: str, task_data: Optional[Dict],
+                      old_data: Optional[Dict] = None) -> None:
+        """Beobachter: betroffene Segmente und Laufnummern pflegen"""
+        if event == "reset" or task_data is None:
+            self._dirty_shards.update(self._all_keys())
+            return
+        self._dirty_shards.add(self.shard_key(task_data))
+        if old_data is not None:
+            self._dirty_shards.add(self.shard_key(old_data))
+        moved = old_data is not None and old_data.get("completed") != task_data.get("completed")
+        if event == "delete" or moved:
+            # Beim Einfügen in die andere Liste gibt es eine neue Laufnummer
+            for seqs in self._seqs.values():
+                seqs.pop(task_data["id"], None)
+
+    def _stat_mtime(self) -> Optional[int]:
+        """Jüngste Änderung an Manifest oder Segmenten"""
+        mtime = super()._stat_mtime()
+        if mtime is not None and self.shard_dir.exists():
+            mtime = max([mtime] + [p.stat().st_mtime_ns for p in self.shard_dir.glob("*.json")])
+        return mtime
+
+    def replace_data(self, data: Dict) -> None:
+        with self._write_lock:
+            # Neuer Bestand: alle Laufnummern neu vergeben
+            self._seqs = {name: {} for name in LISTS}
+            super().replace_data(data)
+
+    def reload_if_changed(self) -> bool:
+        with self._write_lock:
+            reloaded = super().reload_if_changed()
+            if reloaded:
+                self._dirty_shards = set()
+            return reloaded
+
+    def _apply_step(self, step: List[tuple]) -> List[tuple]:
+        inverse = super()._apply_step(step)
+        self._renumber = True
+        return inverse
+
+    def _all_keys(self) -> Set[str]:
+        keys = {self.shard_key(t) for name in LISTS for t in self.data.get(name, [])}
+        if self.shard_dir.exists():
+            keys.update(p.stem for p in self.shard_dir.glob("*.json"))
+        return keys
+
+    # --- Laden ---
+
+    def _load_data(self) -> Dict:
+        """Lädt Manifest und Segmente (oder einen ungeteilten Bestand)"""
+        data = super()._load_data()
+        shards = data.pop("shards", None)
+        if shards is None:
+            # Ungeteilter Bestand: beim nächsten Speichern komplett aufteilen
+            self._dirty_shards = {"*"}
+            return data
+        self.shard_by, self.shard_count = shards["by"], shards["count"]
+        self._next_seq = shards["next_seq"]
+        self._written_manifest = self._manifest_text(data, shards["files"])
+        rows: Dict[str, List[List]] = {name: [] for name in LISTS}
+        for key in shards["files"]:
+            segment = self._read_shard(key)
+            for name in LISTS:
+                rows[name].append(segment.get(name, []))
+        for name in LISTS:
+            # Segmente sind bereits absteigend sortiert - Timsort verschmilzt die Läufe
+            merged = sorted(chain.from_iterable(rows[name]), key=itemgetter(0), reverse=True)
+            self._seqs[name] = {task["id"]: seq for seq, task in merged}
+            data[name] = [task for _, task in merged]
+        return data
+
+    def _read_shard(self, key: str) -> Dict:
+        try:
+            with open(self._shard_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {}
+
+    def filter_tasks(self, status: Optional[str] = None,
+                     category: Optional[str] = None) -> List[Task]:
+        """Liest bei ungeladenem Bestand nur Manifest und Segment der Kategorie"""
+        if not self.is_loaded() and category not in (None, "Alle") and status != "Erledigt":
+            shards = super()._load_data().get("shards")
+            if shards is not None and shards["by"] == "category":
+                key = self.shard_key({"category": category})
+                rows = self._read_shard(key).get("tasks", []) if key in shards["files"] else []
+                return TaskTypeFactory.from_dicts([task for _, task in rows])
+        return super().filter_tasks(status, category)
+
+    # --- Speichern ---
+
+    def _assign_sequence(self) -> None:
+        """Vergibt Laufnummern an neue Einträge (sie stehen immer vorne)"""
+        if self._renumber:
+            self._renumber_lists()
+        for name in LISTS:
+            tasks, seqs = self.data.get(name, []), self._seqs[name]
+            fresh = 0
+            while fresh < len(tasks) and tasks[fresh]["id"] not in seqs:
+                fresh += 1
+            for position in range(fresh):
+                seqs[tasks[position]["id"]] = self._next_seq + fresh - 1 - position
+            self._next_seq += fresh
+
+    def _renumber_lists(self) -> None:
+        """Nummeriert Listen neu, in denen Einträge außerhalb des Anfangs fehlen"""
+        self._renumber = False
+        for name in LISTS:
+            tasks, seqs = self.data.get(name, []), self._seqs[name]
+            fresh = 0
+            while fresh < len(tasks) and tasks[fresh]["id"] not in seqs:
+                fresh += 1
+            if all(task["id"] in seqs for task in tasks[fresh:]):
+                continue
+            count = len(tasks)
+            self._seqs[name] = {task["id"]: self._next_seq + count - 1 - position
+                                for position, task in enumerate(tasks)}
+            self._next_seq += count
+            self._dirty_shards.add("*")
+
+    def _manifest_text(self, data: Dict, files: List[str]) -> str:
+        manifest = {key: value for key, value in data.items() if key not in LISTS}
+        manifest["shards"] = {"by": self.shard_by, "count": self.shard_count,
+                              "next_seq": self._next_seq, "files": sorted(files)}
+        return json.dumps(manifest, ensure_ascii=False, indent=2)
+
+    def save(self) -> None:
+        """Schreibt geänderte Segmente und bei Bedarf das Manifest"""
+        with self._write_lock:
+            self._save_shards()
+            self._mark_durable(self.version)
+
+    def _save_shards(self) -> None:
+        """Segmente sind klein - sie werden komplett unter dem Schreib-Lock geschrieben"""
+        self._assign_sequence()
+        dirty = self._all_keys() if "*" in self._dirty_shards else self._dirty_shards
+        segments: Dict[str, Dict[str, List]] = {key: {name: [] for name in LISTS} for key in dirty}
+        files = set(self._existing_files())
+        if dirty:
+            # Ein Durchlauf über alle Tasks, geschrieben werden nur betroffene Segmente
+            for name in LISTS:
+                seqs = self._seqs[name]
+                for task in self.data.get(name, []):
+                    key = self.shard_key(task)
+                    if key in segments:
+                        segments[key][name].append([seqs.get(task["id"], 0), task])
+            self.shard_dir.mkdir(parents=True, exist_ok=True)
+        for key, segment in segments.items():
+            path = self._shard_path(key)
+            if segment["tasks"] or segment["archived_tasks"]:
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(segment, f, ensure_ascii=False)
+                files.add(key)
+            else:
+                path.unlink(missing_ok=True)
+                files.discard(key)
+        manifest = self._manifest_text(self.data, list(files))
+        if manifest != self._written_manifest or not self.data_file.exists():
+            with open(self.data_file, "w", encoding="utf-8") as f:
+                f.write(manifest)
+            self._written_manifest = manifest
+        self._dirty_shards = set()
+        self._dirty = False
+        self._file_mtime = self._stat_mtime()
+
+    def _existing_files(self) -> List[str]:
+        if self._written_manifest is None:
+            return []
+        return json.loads(self._written_manifest)["shards"]["files"]
+
+    def compact(self) -> Dict[str, int]:
+        """Schreibt Manifest und alle Segmente neu"""
+        self._dirty_shards.add("*")
+        before = self.storage_size()
+        super().compact()
+        return {"bytes_before": before, "bytes_after": self.storage_size()}
+
+    def storage_size(self) -> int:
+        """Belegter Platz von Manifest und Segmenten in Bytes"""
+        size = self.data_file.stat().st_size if self.data_file.exists() else 0
+        if self.shard_dir.exists():
+            size += sum(p.stat().st_size for p in self.shard_dir.glob("*.json"))
+        return size
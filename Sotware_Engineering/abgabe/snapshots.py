@@ -0,0 +1,226 @@
+# SNAPSHOTS - Zeitpunkt-Sicherungen des Datenbestands
+# Verantwortlichkeiten:
+# - Inkrementelle Snapshots: jede Task-Fassung wird nur einmal gespeichert (Inhalts-Hash)
+# - Snapshots auflisten, vergleichen und im laufenden Repository wiederherstellen
+# - Nicht mehr benötigte Snapshots und Task-Fassungen aufräumen
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from model import TaskRepository
+
+LISTS = ("tasks", "archived_tasks")
+HASH_LENGTH = 40
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Schreibt über eine temporäre Datei, damit nie ein halber Snapshot entsteht"""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class SnapshotStore:
+    """
+    Snapshots eines TaskRepository unter <name>.snapshots/.
+
+    objects.jsonl ist ein Anhänge-Speicher mit einer Zeile "<hash> <json>"
+    pro Task-Fassung. Ein Snapshot (snapshots/<id>.json) enthält nur
+    [id, hash]-Paare je Liste sowie die übrigen Felder (Kategorien, next_id,
+    Sync-Zustand); unveränderte Tasks kosten also nur ihren Verweis.
+    Hashes werden pro Task zwischengespeichert und über die Beobachter-Events
+    verworfen, sodass ein Folge-Snapshot nur geänderte Tasks serialisiert.
+    index.jsonl hält die Kurzinfos für get_snapshots().
+    """
+
+    def __init__(self, repository: TaskRepository, directory: Optional[Path] = None):
+        self.repository = repository
+        data_file = repository.data_file
+        self.directory = directory or data_file.with_name(data_file.stem + ".snapshots")
+        self.objects_file = self.directory / "objects.jsonl"
+        self.index_file = self.directory / "index.jsonl"
+        self._hashes: Dict[int, Tuple[Dict, str]] = {}
+        self._known: Optional[Set[str]] = None
+        repository.add_listener(self._on_change)
+
+    def _on_change(self, event: str, task_data: Optional[Dict],
+                   old_data: Optional[Dict] = None) -> None:
+        """Beobachter: zwischengespeicherte Hashes geänderter Tasks verwerfen"""
+        if event == "reset" or task_data is None:
+            self._hashes.clear()
+        else:
+            self._hashes.pop(task_data["id"], None)
+
+    # --- Task-Fassungen ---
+
+    @staticmethod
+    def _encode(task_data: Dict) -> str:
+        return json.dumps(task_data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+    def _task_hash(self, task_data: Dict) -> Tuple[str, Optional[str]]:
+        """Hash einer Task und - falls neu berechnet - ihre Serialisierung"""
+        cached = self._hashes.get(task_data["id"])
+        if cached is not None and cached[0] is task_data:
+            return cached[1], None
+        text = self._encode(task_data)
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        self._hashes[task_data["id"]] = (task_data, digest)
+        return digest, text
+
+    def _known_hashes(self) -> Set[str]:
+        if self._known is None:
+            self._known = set()
+            if self.objects_file.exists():
+                with open(self.objects_file, "r", encoding="utf-8") as f:
+                    self._known.update(line[:HASH_LENGTH] for line in f)
+        return self._known
+
+    def _read_objects(self, wanted: Set[str]) -> Dict[str, Dict]:
+        """Liest nur die benötigten Fassungen (Hash-Präfix vor json.loads prüfen)"""
+        objects = {}
+        with open(self.objects_file, "r", encoding="utf-8") as f:
+            for line in f:
+                digest = line[:HASH_LENGTH]
+                if digest in wanted and digest not in objects:
+                    objects[digest] = json.loads(line[HASH_LENGTH + 1:])
+        return objects
+
+    # --- Snapshots ---
+
+    def _snapshot_path(self, snapshot_id: str) -> Path:
+        return self.directory / "snapshots" / f"{snapshot_id}.json"
+
+    def _read_snapshot(self, snapshot_id: str) -> Dict:
+        path = self._snapshot_path(snapshot_id)
+        if not path.exists():
+            raise KeyError(f"Snapshot {snapshot_id} nicht gefunden")
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def create(self, label: Optional[str] = None) -> Dict:
+        """Legt einen Snapshot des aktuellen Stands an und gibt seine Kurzinfo zurück"""
+        repo = self.repository
+        version, data = repo.snapshot()
+        lists = {name: data.pop(name, []) for name in LISTS}
+        rest = data
+
+        known = self._known_hashes()
+        new_lines: List[str] = []
+        refs: Dict[str, List[List]] = {}
+        for name in LISTS:
+            rows = refs[name] = []
+            for task_data in lists[name]:
+                digest, text = self._task_hash(task_data)
+                if digest not in known:
+                    known.add(digest)
+                    new_lines.append(f"{digest} {text or self._encode(task_data)}\n")
+                rows.append([task_data["id"], digest])
+
+        created = datetime.now()
+        info = {
+            "id": created.strftime("%Y%m%d-%H%M%S-%f"),
+            "created": created.isoformat(timespec="seconds"),
+            "label": label,
+            "version": version,
+            "counts": {name: len(refs[name]) for name in LISTS},
+            "new_objects": len(new_lines)
+        }
+        (self.directory / "snapshots").mkdir(parents=True, exist_ok=True)
+        if new_lines:
+            with open(self.objects_file, "a", encoding="utf-8") as f:
+                f.writelines(new_lines)
+        _write_atomic(self._snapshot_path(info["id"]),
+                      json.dumps({**info, "lists": refs, "data": rest}, ensure_ascii=False))
+        with open(self.index_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(info, ensure_ascii=False) + "\n")
+        return info
+
+    def get_snapshots(self) -> List[Dict]:
+        """Kurzinfos aller Snapshots, älteste zuerst"""
+        if not self.index_file.exists():
+            return []
+        with open(self.index_file, "r", encoding="utf-8") as f:
+            infos = [json.loads(line) for line in f if line.strip()]
+        return [info for info in infos if self._snapshot_path(info["id"]).exists()]
+
+    def _refs(self, snapshot_id: Optional[str]) -> Dict[int, str]:
+        """id -> Hash eines Snapshots (None = aktueller Stand)"""
+        if snapshot_id is None:
+            _, data = self.repository.snapshot(*LISTS)
+            tasks = [t for name in LISTS for t in data.get(name, [])]
+            return {t["id"]: self._task_hash(t)[0] for t in tasks}
+        lists = self._read_snapshot(snapshot_id)["lists"]
+        return {task_id: digest for name in LISTS for task_id, digest in lists[name]}
+
+    def diff(self, old_id: str, new_id: Optional[str] = None) -> Dict[str, List[int]]:
+        """
+        Vergleicht zwei Snapshots (new_id=None: mit dem aktuellen Stand).
+
+        Liefert die IDs neuer, entfernter und geänderter Tasks; verglichen
+        werden nur die Hashes, Task-Inhalte werden nicht gelesen.
+        """
+        old, new = self._refs(old_id), self._refs(new_id)
+        return {
+            "added": sorted(task_id for task_id in new if task_id not in old),
+            "removed": sorted(task_id for task_id in old if task_id not in new),
+            "changed": sorted(task_id for task_id, digest in new.items()
+                              if task_id in old and old[task_id] != digest)
+        }
+
+    def restore(self, snapshot_id: str, backup: bool = True) -> Dict:
+        """
+        Stellt einen Snapshot im laufenden Repository wieder her.
+
+        Vorher wird (optional) der aktuelle Stand gesichert. Beobachter
+        erhalten ein "reset"; andere Prozesse bemerken die neue Datei über
+        reload_if_changed(). IDs werden nicht wiederverwendet (next_id bleibt
+        mindestens auf dem aktuellen Wert).
+        """
+        snapshot = self._read_snapshot(snapshot_id)
+        backup_info = self.create(label=f"vor Wiederherstellung {snapshot_id}") if backup else None
+        lists = snapshot["lists"]
+        objects = self._read_objects({digest for name in LISTS for _, digest in lists[name]})
+        data = dict(snapshot["data"])
+        for name in LISTS:
+            data[name] = [dict(objects[digest]) for _, digest in lists[name]]
+
+        repo = self.repository
+        with repo.batch():
+            data["next_id"] = max(data.get("next_id", 1), repo.data.get("next_id", 1))
+            repo.replace_data(data)
+            # Hashes der wiederhergestellten Fassungen sind bekannt
+            for name in LISTS:
+                for task_data, (_, digest) in zip(data[name], lists[name]):
+                    self._hashes[task_data["id"]] = (task_data, digest)
+        return {"restored": snapshot_id, "counts": snapshot["counts"],
+                "backup": backup_info["id"] if backup_info else None}
+
+    def prune(self, keep: int) -> Dict[str, int]:
+        """Behält die neuesten keep Snapshots und entfernt nicht mehr benötigte Fassungen"""
+        infos = self.get_snapshots()
+        removed = infos[:max(len(infos) - keep, 0)]
+        for info in removed:
+            self._snapshot_path(info["id"]).unlink(missing_ok=True)
+        kept = infos[len(removed):]
+        _write_atomic(self.index_file, "".join(json.dumps(i, ensure_ascii=False) + "\n" for i in kept))
+
+        referenced: Set[str] = set()
+        for info in kept:
+            lists = self._read_snapshot(info["id"])["lists"]
+            referenced.update(digest for name in LISTS for _, digest in lists[name])
+        before = after = 0
+        if self.objects_file.exists():
+            lines = []
+            with open(self.objects_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    before += 1
+                    if line[:HASH_LENGTH] in referenced:
+                        lines.append(line)
+            after = len(lines)
+            _write_atomic(self.objects_file, "".join(lines))
+        self._known = referenced
+        return {"removed": len(removed), "objects_before": before, "objects_after": after}
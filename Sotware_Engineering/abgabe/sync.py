@@ -0,0 +1,59 @@
+# SYNC - Inkrementelle Zwei-Wege-Synchronisation mit externen Quellen
+# Verantwortlichkeiten:
+# - Lokale Erledigungen importierter Tasks zurückmelden (Outbox)
+# - Nur seit dem letzten Token geänderte Tasks abrufen
+# - Übersetzung über den ExternalTaskAdapter, Übernahme ins Repository
+
+from typing import Dict
+
+from model import Task, TaskRepository
+from design_patterns.adapter_pattern import ExternalTaskAdapter
+
+
+class SyncEngine:
+    """
+    Synchronisiert das Repository mit einer externen Quelle.
+
+    Die Quelle muss fetch_changes(since) -> (Tasks, Token) und
+    set_status(task_id, status) anbieten (siehe ExternalProjectAPI).
+    Token, ID-Mapping (extern → intern) und Outbox liegen im Repository,
+    damit jeder Lauf nur das Delta seit dem letzten Lauf überträgt.
+    """
+
+    def __init__(self, repository: TaskRepository, source, source_name: str = "external"):
+        self.repository = repository
+        self.source = source
+        self.source_name = source_name
+
+    def sync(self) -> Dict[str, int]:
+        """Führt einen Sync-Lauf aus: erst Push, dann Pull"""
+        pushed = self.push()
+        result = self.pull()
+        result["pushed"] = pushed
+        return result
+
+    def push(self) -> int:
+        """Meldet lokal geänderte Erledigt-Status an die Quelle zurück"""
+        outbox = self.repository.get_sync_state(self.source_name)["outbox"]
+        pushed = []
+        for ext_id, completed in list(outbox.items()):
+            if self.source.set_status(ext_id, "done" if completed else "open"):
+                pushed.append(ext_id)
+        if pushed:
+            # Speichern über den Persistenz-Pfad des Repositorys (auch Write-Behind)
+            self.repository.clear_sync_outbox(self.source_name, pushed)
+        return len(pushed)
+
+    def pull(self) -> Dict[str, int]:
+        """Holt Änderungen seit dem gespeicherten Token und übernimmt sie"""
+        token = self.repository.get_sync_state(self.source_name)["token"]
+        changed, new_token = self.source.fetch_changes(token)
+        changes = []
+        for external in changed:
+            adapter = ExternalTaskAdapter(external, internal_id=0)
+            if not adapter.validate():
+                continue
+            changes.append((adapter.get_original_id(), Task.from_dict(adapter.to_dict())))
+        result = self.repository.apply_external_changes(self.source_name, changes, new_token)
+        result["fetched"] = len(changed)
+        return result
@@ -0,0 +1,65 @@
+# TASK_STATISTICS - Kennzahlen für das Dashboard
+# Verantwortlichkeiten:
+# - Zähler (offen, archiviert, pro Kategorie) und Erledigungen pro Tag
+# - Aktualisierung über die Beobachter-Events des TaskRepository
+# - Abfrage in O(1) pro Rerun statt eines Durchlaufs über alle Tasks
+
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+
+class TaskStatistics:
+    """
+    Inkrementell gepflegte Aggregate über aktive und archivierte Tasks.
+
+    Jede Änderung zieht die alte Fassung einer Task ab und addiert die neue.
+    Zeitabhängige Werte (überfällig, diese Woche) hängen vom heutigen Datum
+    ab und werden deshalb nicht gezählt, sondern per bisect über den
+    Fälligkeits-Index des Repositorys ermittelt.
+    """
+
+    def __init__(self, tasks_data: Iterable[Dict] = ()):
+        self.rebuild(tasks_data)
+
+    def rebuild(self, tasks_data: Iterable[Dict]) -> None:
+        """Zählt alles neu (beim Laden bzw. nach einem "reset")"""
+        self.open = 0
+        self.archived = 0
+        self.open_per_category: Counter = Counter()
+        self.completions_per_day: Counter = Counter()
+        for task_data in tasks_data:
+            self._apply(task_data, 1)
+
+    def _apply(self, task_data: Dict, sign: int) -> None:
+        if task_data.get("completed"):
+            self.archived += sign
+            completed_at = task_data.get("completed_at")
+            if completed_at:
+                self.completions_per_day[completed_at[:10]] += sign
+        else:
+            self.open += sign
+            self.open_per_category[task_data.get("category", "Keine")] += sign
+
+    def on_change(self, event: str, task_data: Optional[Dict],
+                  old_data: Optional[Dict] = None) -> None:
+        """Beobachter-Callback für TaskRepository.add_listener"""
+        if event == "delete":
+            self._apply(task_data, -1)
+            return
+        if old_data is not None:
+            self._apply(old_data, -1)
+        self._apply(task_data, 1)
+
+    def get_stats(self, today: Optional[date] = None, days: int = 7) -> Dict:
+        """Zähler und Erledigungen der letzten days Tage (ältester Tag zuerst)"""
+        today = today or date.today()
+        history = [self.completions_per_day.get((today - timedelta(days=offset)).isoformat(), 0)
+                   for offset in range(days - 1, -1, -1)]
+        return {
+            "open": self.open,
+            "archived": self.archived,
+            "open_per_category": {name: n for name, n in self.open_per_category.items() if n},
+            "completed_today": history[-1],
+            "completions_last_days": history
+        }
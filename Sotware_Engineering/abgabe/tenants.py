@@ -0,0 +1,217 @@
+# TENANTS - Eigene Datenbestände pro Nutzer
+# Verantwortlichkeiten:
+# - Nutzer-/Mandanten-Schlüssel auf eine eigene Datendatei abbilden
+# - Zuletzt genutzte Repositories im Speicher halten (LRU, Speicherbudget)
+# - Inaktive Repositories speichern und freigeben (auch periodisch im Hintergrund)
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from model import TaskRepository
+from controller import ApplicationController
+
+# Gemessener Speicherbedarf einer geladenen Task (dict mit Strings), gerundet
+BYTES_PER_TASK = 550
+
+
+class _Tenant:
+    """Geöffneter Datenbestand eines Mandanten"""
+
+    def __init__(self, repository: TaskRepository, now: float):
+        self.repository = repository
+        self.controller = ApplicationController(repository=repository)
+        self.last_used = now
+        # Laufende Anfragen (lease) - solange > 0 wird nicht freigegeben
+        self.active = 0
+
+    def estimate(self) -> int:
+        """Geschätzter Speicherbedarf (0, solange die Daten nicht geladen sind)"""
+        if not self.repository.is_loaded():
+            return 0
+        data = self.repository.data
+        return (len(data["tasks"]) + len(data.get("archived_tasks", []))) * BYTES_PER_TASK
+
+
+class RepositoryManager:
+    """
+    Verwaltet ein TaskRepository pro Mandant.
+
+    Jeder Mandant erhält eine eigene Datei unter base_dir. Geöffnet bleiben
+    höchstens max_open Repositories und (geschätzt) memory_budget Bytes;
+    darüber hinaus und nach idle_seconds ohne Zugriff wird das am längsten
+    ungenutzte Repository gespeichert und freigegeben. Da Repositories ihre
+    Daten erst beim ersten Zugriff laden, ist das Öffnen selbst billig.
+    Aufrufer holen Repository/Controller daher pro Anfrage neu (lease())
+    und halten keine Referenzen über eine mögliche Freigabe hinweg; ein
+    Repository mit laufender Anfrage wird nie freigegeben.
+
+    Die Repositories sind Thread-sicher (parallele Anfragen, z. B. im
+    API-Server). Ohne Zugriffe räumt nur start_sweeper() inaktive auf.
+    """
+
+    def __init__(self, base_dir: Path, max_open: int = 32,
+                 memory_budget: Optional[int] = None, idle_seconds: Optional[float] = 600,
+                 clock: Callable[[], float] = time.monotonic):
+        self.base_dir = Path(base_dir)
+        self.max_open = max_open
+        self.memory_budget = memory_budget
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        self._open: "OrderedDict[str, _Tenant]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Beobachter für Freigaben: callback(tenant)
+        self._evict_listeners: List[Callable[[str], None]] = []
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop = threading.Event()
+
+    def path_for(self, tenant: str) -> Path:
+        """Datendatei eines Mandanten (Schlüssel wird für Dateinamen bereinigt)"""
+        if not tenant:
+            raise ValueError("Mandanten-Schlüssel darf nicht leer sein")
+        safe = re.sub(r"[^A-Za-z0-9_-]", "_", tenant)[:64]
+        if safe != tenant:
+            # Kollisionen bereinigter Namen vermeiden
+            safe += "-" + hashlib.sha1(tenant.encode("utf-8")).hexdigest()[:8]
+        return self.base_dir / f"{safe}.json"
+
+    def get_repository(self, tenant: str) -> TaskRepository:
+        """Repository eines Mandanten (öffnet es bei Bedarf)"""
+        return self._get(tenant).repository
+
+    def get_controller(self, tenant: str) -> ApplicationController:
+        """ApplicationController eines Mandanten (wird mit dem Repository gehalten)"""
+        return self._get(tenant).controller
+
+    @contextmanager
+    def lease(self, tenant: str):
+        """Controller eines Mandanten für die Dauer einer Anfrage (wird solange nicht freigegeben)"""
+        with self._lock:
+            entry = self._get(tenant)
+            entry.active += 1
+        try:
+            yield entry.controller
+        finally:
+            with self._lock:
+                entry.active -= 1
+                entry.last_used = self.clock()
+
+    def add_evict_listener(self, listener: Callable[[str], None]) -> None:
+        """Registriert einen Beobachter, der bei jeder Freigabe den Mandanten erhält"""
+        self._evict_listeners.append(listener)
+
+    def _get(self, tenant: str) -> _Tenant:
+        with self._lock:
+            now = self.clock()
+            entry = self._open.get(tenant)
+            if entry is None:
+                self.misses += 1
+                self.base_dir.mkdir(parents=True, exist_ok=True)
+                repository = TaskRepository(self.path_for(tenant), thread_safe=True)
+                entry = self._open[tenant] = _Tenant(repository, now)
+            else:
+                self.hits += 1
+                self._open.move_to_end(tenant)
+                entry.last_used = now
+            self.evict_idle()
+            self._enforce_limits(keep=tenant)
+            return entry
+
+    def _evict(self, tenant: str) -> None:
+        entry = self._open.pop(tenant)
+        entry.repository.close()
+        self.evictions += 1
+        for listener in self._evict_listeners:
+            listener(tenant)
+
+    def _enforce_limits(self, keep: Optional[str] = None) -> None:
+        """Gibt die am längsten ungenutzten Repositories frei, bis die Grenzen passen"""
+        while len(self._open) > self.max_open or self._over_budget():
+            victim = next((t for t, e in self._open.items() if t != keep and not e.active), None)
+            if victim is None:
+                break
+            self._evict(victim)
+
+    def _over_budget(self) -> bool:
+        return (self.memory_budget is not None
+                and self.estimated_bytes() > self.memory_budget)
+
+    def estimated_bytes(self) -> int:
+        """Geschätzter Speicherbedarf aller geöffneten Repositories"""
+        return sum(entry.estimate() for entry in self._open.values())
+
+    def evict_idle(self) -> List[str]:
+        """Gibt Repositories frei, die länger als idle_seconds nicht genutzt wurden"""
+        if self.idle_seconds is None:
+            return []
+        with self._lock:
+            limit = self.clock() - self.idle_seconds
+            # LRU-Reihenfolge: der erste noch aktive Eintrag beendet die Suche
+            idle = []
+            for tenant, entry in self._open.items():
+                if entry.last_used > limit:
+                    break
+                if not entry.active:
+                    idle.append(tenant)
+            for tenant in idle:
+                self._evict(tenant)
+            return idle
+
+    def start_sweeper(self, interval: Optional[float] = None) -> None:
+        """Gibt inaktive Repositories periodisch frei, auch wenn keine Anfragen kommen"""
+        if self._sweeper is not None or self.idle_seconds is None:
+            return
+        interval = interval if interval is not None else max(self.idle_seconds / 2, 1.0)
+        self._sweeper_stop.clear()
+
+        def sweep():
+            while not self._sweeper_stop.wait(interval):
+                self.evict_idle()
+
+        self._sweeper = threading.Thread(target=sweep, daemon=True, name="tenant-sweeper")
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        if self._sweeper is None:
+            return
+        self._sweeper_stop.set()
+        self._sweeper.join()
+        self._sweeper = None
+
+    def flush_all(self) -> None:
+        """Speichert alle ausstehenden Änderungen, ohne Repositories freizugeben"""
+        with self._lock:
+            for entry in self._open.values():
+                entry.repository.flush()
+
+    def close(self) -> None:
+        """Speichert und gibt alle Repositories frei"""
+        self.stop_sweeper()
+        with self._lock:
+            for tenant in list(self._open):
+                self._evict(tenant)
+
+    def open_tenants(self) -> List[str]:
+        """Geöffnete Mandanten, zuletzt genutzter zuletzt"""
+        with self._lock:
+            return list(self._open)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Kennzahlen des Managers"""
+        with self._lock:
+            return {
+                "open": len(self._open),
+                "loaded": sum(1 for e in self._open.values() if e.repository.is_loaded()),
+                "estimated_bytes": self.estimated_bytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,18 @@
+"""
+Performance-Benchmarks für TODO-App
+
+Enthält:
+- run_bench.py: Zeitmessung für Repository, Controller und HTML-Rendering
+  auf synthetischen Datenbeständen (1k bis 1M Tasks), JSON-Ausgabe und
+  Vergleich gegen eine gespeicherte Baseline
+- generator.py: Synthetische Datenbestände (Kategorien, Fälligkeiten, Archiv-Anteil)
+- replay.py: Operationsströme über mehrere Sitzungen abspielen, Latenz-Perzentile
+- startup.py: Kaltstart in frischen Prozessen (Imports, erstes Rendern) je Bestandsgröße
+- api_load.py: Lasttest der lokalen HTTP-API (Keep-Alive-Clients, Requests/s)
+- snapshot_bench.py: Snapshot anlegen (voll/inkrementell), vergleichen, wiederherstellen
+- id_bench.py: Blockweise ID-Vergabe mit vielen gleichzeitigen Prozessen/Threads
+- concurrency_bench.py: Stresstest gemischter Lese-/Schreiblast im Thread-sicheren Modus
+- test_bench.py: Schneller Smoke-Test der Benchmarks im normalen Testlauf
+
+python -m tests.bench.run_bench --sizes 1000 10000 100000 --output bench.json
+"""
@@ -0,0 +1,118 @@
+"""
+Lasttest für die lokale TODO-API
+Startet api_server auf einem synthetischen Datenbestand und schickt von
+mehreren Clients (je eine Keep-Alive-Verbindung) einen Mix aus Lese- und
+Schreibzugriffen. Listen werden mit If-None-Match revalidiert.
+
+python -m tests.bench.api_load --size 100000 --clients 8 --requests 500
+python -m tests.bench.api_load --size 10000 --write-ratio 0.2 --output api.json
+"""
+import argparse
+import http.client
+import json
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from api_server import ApiServer
+from controller import ApplicationController
+from tests.bench.replay import percentile
+from tests.bench.run_bench import generate_store
+
+# Anteile der Lesezugriffe (Rest gemäß write_ratio: POST /tasks)
+READ_MIX = {"list_page": 0.4, "list_revalidate": 0.3, "get_task": 0.2, "next": 0.1}
+
+
+def _client(port: int, requests: int, write_ratio: float, max_id: int, seed: int,
+            latencies: Dict[str, List[float]], lock: threading.Lock) -> None:
+    """Ein Client mit einer einzigen Keep-Alive-Verbindung"""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    etag = None
+    local: Dict[str, List[float]] = {}
+    ops, weights = list(READ_MIX), list(READ_MIX.values())
+    for i in range(requests):
+        if rng.random() < write_ratio:
+            op, method, path, body = "create", "POST", "/tasks", json.dumps({"title": f"Last {seed}-{i}"})
+        else:
+            op = rng.choices(ops, weights)[0]
+            method, body = "GET", None
+            path = {"list_page": "/tasks?limit=50", "list_revalidate": "/tasks?limit=50",
+                    "get_task": f"/tasks/{rng.randint(1, max_id)}", "next": "/tasks/next"}[op]
+        headers = {"If-None-Match": etag} if op == "list_revalidate" and etag else {}
+        start = time.perf_counter()
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        local.setdefault(op, []).append(time.perf_counter() - start)
+        if op.startswith("list"):
+            etag = response.getheader("ETag") or etag
+    conn.close()
+    with lock:
+        for op, values in local.items():
+            latencies.setdefault(op, []).extend(values)
+
+
+def run_load(size: int, clients: int = 4, requests: int = 200, write_ratio: float = 0.1,
+             workdir: Optional[Path] = None) -> Dict:
+    """Führt den Lasttest aus und liefert Durchsatz und Latenz-Perzentile"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = (workdir or Path(tmp)) / f"api_{size}.json"
+        generate_store(store, size)
+        app = ApplicationController(store)
+        app.warm()
+        server = ApiServer(app, port=0)
+        port = server.start_in_thread()
+        latencies: Dict[str, List[float]] = {}
+        lock = threading.Lock()
+        threads = [threading.Thread(target=_client, args=(port, requests, write_ratio, size, seed,
+                                                          latencies, lock))
+                   for seed in range(clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        server.stop()
+    total = sum(len(v) for v in latencies.values())
+    return {
+        "size": size,
+        "clients": clients,
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1) if elapsed else 0.0,
+        "operations": {
+            op: {"count": len(values),
+                 "p50_ms": round(percentile(values, 50) * 1000, 3),
+                 "p95_ms": round(percentile(values, 95) * 1000, 3),
+                 "max_ms": round(max(values) * 1000, 3)}
+            for op, values in sorted(latencies.items())
+        }
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Lasttest für die TODO-API")
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200, help="Requests pro Client")
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    report = run_load(args.size, args.clients, args.requests, args.write_ratio)
+    print(f"{report['requests']} Requests in {report['elapsed_s']} s "
+          f"= {report['requests_per_second']} req/s")
+    for op, stats in report["operations"].items():
+        print(f"{op:<16} n={stats['count']:<6} p50={stats['p50_ms']:.2f} ms p95={stats['p95_ms']:.2f} ms")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+"""
+Stresstest für den Thread-sicheren Modus des Repositorys
+Viele Threads lesen und schreiben gemischt auf einem geteilten Repository
+(wie Streamlit-Sessions eines Serverprozesses). Geprüft wird, dass keine
+Änderung verloren geht und kein Leser eine halb geänderte Liste sieht;
+gemessen wird der Durchsatz je Thread-Anzahl.
+
+python -m tests.bench.concurrency_bench --threads 1 2 4 8 --ops 2000
+python -m tests.bench.concurrency_bench --size 10000 --read-ratio 0.95 --output stress.json
+"""
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from model import Task, TaskRepository
+from tests.bench.run_bench import generate_store
+
+
+def _worker(repo: TaskRepository, n: int, ops: int, read_ratio: float, result: Dict) -> None:
+    rng = random.Random(n)
+    added, toggled, inconsistent = 0, 0, 0
+    for i in range(ops):
+        if rng.random() < read_ratio:
+            choice = rng.random()
+            if choice < 0.4:
+                ids = [t.id for t in repo.get_all_tasks()]
+                inconsistent += len(ids) != len(set(ids))
+            elif choice < 0.7:
+                repo.get_next_tasks(5)
+            elif choice < 0.9:
+                repo.get_statistics()
+            else:
+                repo.filter_tasks(status="Offen", category="Kategorie 1")
+        elif i % 2:
+            repo.add_task(Task(0, f"Stress {n}/{i}"))
+            added += 1
+        else:
+            # Nur eigene Tasks abhaken (Titel-Präfix), damit jede Erledigung genau einmal zählt
+            own = [t.id for t in repo.get_all_tasks()[:50] if t.title.startswith(f"Stress {n}/")]
+            if own and repo.toggle_task_completion(own[0]):
+                toggled += 1
+    result[n] = {"added": added, "toggled": toggled, "inconsistent_reads": inconsistent}
+
+
+def run_stress(thread_counts: Optional[List[int]] = None, ops: int = 1000, size: int = 2000,
+               read_ratio: float = 0.9, workdir: Optional[Path] = None) -> Dict:
+    """Ein frischer Bestand je Thread-Anzahl; liefert Durchsatz und Prüfergebnisse"""
+    thread_counts = thread_counts or [1, 2, 4, 8]
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = workdir or Path(tmp)
+        for threads in thread_counts:
+            path = directory / f"stress_{threads}.json"
+            generate_store(path, size)
+            repo = TaskRepository(path, thread_safe=True)
+            open_before = len(repo.get_all_tasks())
+            archived_before = len(repo.get_archived_tasks())
+            repo.start_write_behind(0.05)
+
+            results: Dict[int, Dict] = {}
+            workers = [threading.Thread(target=_worker, args=(repo, n, ops, read_ratio, results))
+                       for n in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+            repo.stop_write_behind()
+
+            added = sum(r["added"] for r in results.values())
+            toggled = sum(r["toggled"] for r in results.values())
+            reloaded = TaskRepository(path)
+            all_ids = [t.id for t in reloaded.get_all_tasks() + reloaded.get_archived_tasks()]
+            rows.append({
+                "threads": threads,
+                "ops": threads * ops,
+                "s": round(elapsed, 4),
+                "ops_per_second": round(threads * ops / elapsed),
+                "added": added,
+                "toggled": toggled,
+                "inconsistent_reads": sum(r["inconsistent_reads"] for r in results.values()),
+                # Keine verlorene Änderung: Bestand auf der Platte passt exakt zu den Operationen
+                "lost_updates": (open_before + added - toggled - len(reloaded.get_all_tasks()))
+                                + (archived_before + toggled - len(reloaded.get_archived_tasks())),
+                "duplicate_ids": len(all_ids) - len(set(all_ids))
+            })
+    return {"size": size, "read_ratio": read_ratio, "runs": rows}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stresstest Thread-sicheres Repository")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ops", type=int, default=2000, help="Operationen pro Thread")
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--read-ratio", type=float, default=0.9)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    report = run_stress(args.threads, args.ops, args.size, args.read_ratio)
+    for row in report["runs"]:
+        print(f"{row['threads']:>3} Threads: {row['ops_per_second']:>8} Ops/s  "
+              f"verloren {row['lost_updates']}  inkonsistent {row['inconsistent_reads']}  "
+              f"doppelt {row['duplicate_ids']}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+"""
+Generator für synthetische Datenbestände der TODO-App
+Erzeugt realistische todo_data.json-Dateien mit konfigurierbarer Größe,
+Kategorie-Verteilung, Fälligkeits-Schiefe und Archiv-Anteil.
+
+python -m tests.bench.generator --tasks 100000 --categories 8 --archive-ratio 0.3 --output store.json
+"""
+import argparse
+import json
+import random
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from model import Task, Category
+
+PALETTE = ["#4e73df", "#1cc88a", "#36b9cc", "#f6c23e", "#e74a3b", "#858796", "#5a5c69", "#fd7e14"]
+
+
+def category_names(count: int) -> List[str]:
+    """Namen der generierten Kategorien ("Keine" zählt zum Limit dazu)"""
+    if count > Category.MAX_CATEGORIES - 1:
+        raise ValueError(f"Maximal {Category.MAX_CATEGORIES - 1} Kategorien neben 'Keine' erlaubt")
+    return [f"Kategorie {i}" for i in range(count)]
+
+
+def generate_store_data(task_count: int, categories: int = 8, category_skew: float = 1.0,
+                        archive_ratio: float = 0.1, no_due_ratio: float = 0.3,
+                        overdue_ratio: float = 0.1, due_window_days: int = 30,
+                        due_skew: float = 2.0, seed: int = 0) -> Dict:
+    """
+    Erzeugt die Datenstruktur eines TaskRepository.
+
+    Args:
+        category_skew: Zipf-Exponent der Kategorie-Verteilung (0 = gleichverteilt)
+        archive_ratio: Anteil erledigter (archivierter) Tasks
+        no_due_ratio: Anteil offener Tasks ohne Fälligkeitsdatum
+        overdue_ratio: Anteil datierter Tasks mit Datum in der Vergangenheit
+        due_skew: > 1 häuft Fälligkeiten kurz nach heute, 1 = gleichverteilt im Fenster
+    """
+    rng = random.Random(seed)
+    # Eigener Zufallsstrom für Zeitstempel - die übrigen Felder bleiben je Seed unverändert
+    time_rng = random.Random(seed + 1)
+    now = datetime.now().replace(microsecond=0)
+    today = date.today()
+    names = category_names(categories)
+    pool = names + ["Keine"]
+    weights = [1 / (rank + 1) ** category_skew for rank in range(len(pool))]
+
+    tasks, archived = [], []
+    for task_id in range(task_count, 0, -1):
+        if rng.random() < no_due_ratio:
+            due = None
+        else:
+            offset = int(due_window_days * rng.random() ** due_skew)
+            if rng.random() < overdue_ratio:
+                offset = -offset - 1
+            due = (today + timedelta(days=offset)).isoformat()
+        completed = rng.random() < archive_ratio
+        task = {
+            "id": task_id,
+            "title": f"Aufgabe {task_id}",
+            "completed": completed,
+            "category": rng.choices(pool, weights)[0],
+            "due_date": due,
+            "priority": rng.randint(Task.MIN_PRIORITY, Task.MAX_PRIORITY),
+            "type": "todo"
+        }
+        created = now - timedelta(seconds=time_rng.randrange(180 * 86400))
+        task["created_at"] = created.isoformat()
+        if completed:
+            done = min(now, created + timedelta(seconds=time_rng.randrange(30 * 86400)))
+            task["completed_at"] = done.isoformat()
+        (archived if completed else tasks).append(task)
+    return {
+        "tasks": tasks,
+        "archived_tasks": archived,
+        "categories": [{"name": "Keine", "color": "#e8e8e8"}]
+                      + [{"name": name, "color": PALETTE[i % len(PALETTE)]} for i, name in enumerate(names)],
+        "next_id": task_count + 1
+    }
+
+
+def write_store(path: Path, task_count: int, **options) -> Path:
+    """Schreibt einen generierten Datenbestand als JSON-Datei"""
+    data = generate_store_data(task_count, **options)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Synthetische TODO-Datenbestände erzeugen")
+    parser.add_argument("--tasks", type=int, required=True)
+    parser.add_argument("--output", type=Path, default=Path("generated_store.json"))
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--category-skew", type=float, default=1.0)
+    parser.add_argument("--archive-ratio", type=float, default=0.1)
+    parser.add_argument("--no-due-ratio", type=float, default=0.3)
+    parser.add_argument("--overdue-ratio", type=float, default=0.1)
+    parser.add_argument("--due-window-days", type=int, default=30)
+    parser.add_argument("--due-skew", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    write_store(args.output, args.tasks, categories=args.categories,
+                category_skew=args.category_skew, archive_ratio=args.archive_ratio,
+                no_due_ratio=args.no_due_ratio, overdue_ratio=args.overdue_ratio,
+                due_window_days=args.due_window_days, due_skew=args.due_skew, seed=args.seed)
+    print(f"{args.tasks} Tasks → {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+"""
+Benchmark für die ID-Vergabe
+Misst die blockweise Reservierung aus der Zählerdatei mit vielen
+gleichzeitigen Schreibern: Prozesse, die nur IDs ziehen (Blockgröße 1 zum
+Vergleich), und Threads, die Tasks in einem Repository anlegen. Prüft
+jeweils, dass keine ID doppelt vergeben wurde.
+
+python -m tests.bench.id_bench --processes 8 --ids 20000
+python -m tests.bench.id_bench --threads 8 --tasks 5000 --block-sizes 1 100 1000 --output ids.json
+"""
+import argparse
+import json
+import multiprocessing
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from id_allocator import BlockIdAllocator
+from model import Task, TaskRepository
+
+
+def _allocate_worker(args) -> List[int]:
+    """Läuft in einem eigenen Prozess: zieht count IDs einzeln"""
+    counter_file, block_size, count = args
+    allocator = BlockIdAllocator(Path(counter_file), block_size)
+    return [allocator.next_id() for _ in range(count)]
+
+
+def _bench_processes(workdir: Path, processes: int, ids: int, block_size: int) -> Dict:
+    counter_file = workdir / f"proc_{block_size}.ids"
+    with multiprocessing.get_context().Pool(processes) as pool:
+        start = time.perf_counter()
+        results = pool.map(_allocate_worker, [(str(counter_file), block_size, ids)] * processes)
+        elapsed = time.perf_counter() - start
+    allocated = [task_id for result in results for task_id in result]
+    assert len(set(allocated)) == len(allocated), "doppelte IDs"
+    return {"block_size": block_size, "ids": len(allocated), "s": round(elapsed, 4),
+            "ids_per_second": round(len(allocated) / elapsed)}
+
+
+def _bench_threads(workdir: Path, threads: int, tasks: int, block_size: int) -> Dict:
+    """Threads legen Tasks an; Write-Behind hält die Datei-Schreibvorgänge aus der Messung"""
+    repo = TaskRepository(workdir / f"threads_{block_size}.json")
+    repo.use_shared_ids(block_size)
+    repo.start_write_behind(0.05)
+
+    def writer(n: int) -> None:
+        for i in range(tasks):
+            repo.add_task(Task(0, f"Writer {n} / {i}"))
+
+    workers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    repo.stop_write_behind()
+    allocated = [t["id"] for t in repo.data["tasks"]]
+    assert len(set(allocated)) == len(allocated) == threads * tasks, "doppelte IDs"
+    return {"block_size": block_size, "tasks": len(allocated), "s": round(elapsed, 4),
+            "tasks_per_second": round(len(allocated) / elapsed),
+            "reservations": repo.id_allocator.reservations}
+
+
+def run_ids(processes: int = 4, ids: int = 5000, threads: int = 4, tasks: int = 1000,
+            block_sizes: Optional[List[int]] = None, workdir: Optional[Path] = None) -> Dict:
+    """Führt beide Messungen je Blockgröße aus"""
+    block_sizes = block_sizes or [1, 100]
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = workdir or Path(tmp)
+        return {
+            "processes": processes,
+            "threads": threads,
+            "allocate": [_bench_processes(directory, processes, ids, b) for b in block_sizes],
+            "create_tasks": [_bench_threads(directory, threads, tasks, b) for b in block_sizes]
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark für die ID-Vergabe")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--ids", type=int, default=20000, help="IDs pro Prozess")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--tasks", type=int, default=2000, help="Tasks pro Thread")
+    parser.add_argument("--block-sizes", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    report = run_ids(args.processes, args.ids, args.threads, args.tasks, args.block_sizes)
+    for row in report["allocate"]:
+        print(f"Prozesse  Block {row['block_size']:>5}: {row['ids_per_second']:>10} IDs/s")
+    for row in report["create_tasks"]:
+        print(f"Threads   Block {row['block_size']:>5}: {row['tasks_per_second']:>10} Tasks/s "
+              f"({row['reservations']} Reservierungen)")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,153 @@
+"""
+Replay-Harness für TODO-App
+Treibt ApplicationController-Instanzen (eine pro simulierter Sitzung, wie
+Streamlit-Sessions auf derselben Datei) mit einem aufgezeichneten oder
+zufälligen Strom von Operationen und misst Latenz-Perzentile pro Operation.
+
+python -m tests.bench.replay --store store.json --operations 2000 --sessions 4
+python -m tests.bench.replay --store store.json --input ops.jsonl
+python -m tests.bench.replay --store store.json --operations 500 --record ops.jsonl
+"""
+import argparse
+import json
+import math
+import random
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from controller import ApplicationController
+
+OPERATIONS = ["create", "toggle", "edit", "delete", "restore"]
+DEFAULT_MIX = {"create": 0.35, "toggle": 0.25, "edit": 0.2, "delete": 0.1, "restore": 0.1}
+
+
+def random_operations(count: int, sessions: int = 4, mix: Optional[Dict[str, float]] = None,
+                      seed: int = 0) -> List[Dict]:
+    """Erzeugt einen zufälligen Operationsstrom (Ziel-IDs werden beim Abspielen gewählt)"""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    ops, weights = list(mix), list(mix.values())
+    return [{"session": rng.randrange(sessions), "op": rng.choices(ops, weights)[0]}
+            for _ in range(count)]
+
+
+def load_operations(path: Path) -> List[Dict]:
+    """Liest einen aufgezeichneten Strom (eine JSON-Operation pro Zeile)"""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Perzentil nach Nearest-Rank-Methode (Rang = aufgerundetes pct % von n)"""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class ReplayHarness:
+    """Spielt Operationen gegen simulierte Sitzungen ab"""
+
+    def __init__(self, store: Path, sessions: int = 4, seed: int = 0):
+        self.store = store
+        self.rng = random.Random(seed)
+        self.sessions = [ApplicationController(store) for _ in range(sessions)]
+        self.latencies: Dict[str, List[float]] = {op: [] for op in OPERATIONS}
+        self.recorded: List[Dict] = []
+
+    def _resolve(self, operation: Dict) -> Optional[Dict]:
+        """Ergänzt fehlende Ziel-IDs anhand des Zustands der Sitzung"""
+        op = dict(operation)
+        repo = self.sessions[op.get("session", 0) % len(self.sessions)].repository
+        if op["op"] == "create":
+            op.setdefault("title", f"Replay {self.rng.randrange(10 ** 6)}")
+            op.setdefault("due_in_days", self.rng.choice([None, 0, 1, 3, 14]))
+            return op
+        if "task_id" not in op:
+            source = repo.data.get("archived_tasks", []) if op["op"] == "restore" else repo.data["tasks"]
+            if not source:
+                return None
+            op["task_id"] = self.rng.choice(source)["id"]
+        return op
+
+    def _execute(self, op: Dict) -> None:
+        """Führt eine Operation über den Controller der Sitzung aus"""
+        tasks = self.sessions[op.get("session", 0) % len(self.sessions)].get_task_controller()
+        if op["op"] == "create":
+            due = op.get("due_in_days")
+            tasks.create_task(op["title"], due_date=date.today() + timedelta(days=due) if due is not None else None)
+        elif op["op"] == "toggle":
+            tasks.toggle_task_completion(op["task_id"])
+        elif op["op"] == "edit":
+            task = tasks.get_task(op["task_id"])
+            if task:
+                tasks.update_task(task.id, op.get("title", task.title + " *"), task.category)
+        elif op["op"] == "delete":
+            tasks.delete_task(op["task_id"])
+        elif op["op"] == "restore":
+            tasks.restore_task(op["task_id"])
+        else:
+            raise ValueError(f"Unbekannte Operation: {op['op']}")
+
+    def run(self, operations: Iterable[Dict]) -> Dict[str, Dict]:
+        """Spielt den Strom ab und liefert Latenz-Perzentile in Millisekunden"""
+        for operation in operations:
+            op = self._resolve(operation)
+            if op is None:
+                continue
+            start = time.perf_counter()
+            self._execute(op)
+            self.latencies[op["op"]].append(time.perf_counter() - start)
+            self.recorded.append(op)
+        return self.report()
+
+    def report(self) -> Dict[str, Dict]:
+        """Fasst die gemessenen Latenzen zusammen"""
+        report = {}
+        for op, values in self.latencies.items():
+            if not values:
+                continue
+            report[op] = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p90_ms": round(percentile(values, 90) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+                "max_ms": round(max(values) * 1000, 3)
+            }
+        return report
+
+    def save_recording(self, path: Path) -> None:
+        """Speichert den abgespielten Strom (mit aufgelösten IDs) zum erneuten Abspielen"""
+        with open(path, "w", encoding="utf-8") as f:
+            for op in self.recorded:
+                f.write(json.dumps(op, ensure_ascii=False) + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Lastprofil gegen die TODO-App abspielen")
+    parser.add_argument("--store", type=Path, required=True)
+    parser.add_argument("--input", type=Path, help="Aufgezeichneter Strom (JSON Lines)")
+    parser.add_argument("--operations", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record", type=Path, help="Abgespielten Strom speichern")
+    parser.add_argument("--output", type=Path, help="Report als JSON speichern")
+    args = parser.parse_args(argv)
+
+    operations = (load_operations(args.input) if args.input
+                  else random_operations(args.operations, args.sessions, seed=args.seed))
+    harness = ReplayHarness(args.store, args.sessions, args.seed)
+    report = harness.run(operations)
+    for op, stats in report.items():
+        print(f"{op:<8} n={stats['count']:<6} p50={stats['p50_ms']:.2f} ms "
+              f"p90={stats['p90_ms']:.2f} ms p99={stats['p99_ms']:.2f} ms")
+    if args.record:
+        harness.save_recording(args.record)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
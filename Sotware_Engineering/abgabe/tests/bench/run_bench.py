@@ -0,0 +1,167 @@
+"""
+Benchmark-Suite für TODO-App
+Misst TaskRepository-Operationen und TaskView-HTML-Erzeugung auf
+synthetischen Datenbeständen und vergleicht mit einer Baseline.
+
+python -m tests.bench.run_bench --sizes 1000 10000 100000 1000000 --output bench.json
+python -m tests.bench.run_bench --baseline tests/bench/baseline.json --max-regression 0.25
+python -m tests.bench.run_bench --baseline tests/bench/baseline.json --update-baseline
+"""
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from analytics import TaskAnalytics
+from model import Task, TaskRepository
+from sharding import ShardedTaskRepository
+from tests.bench.generator import write_store
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+CATEGORY_COUNT = 10
+
+
+def generate_store(path: Path, size: int, seed: int = 0) -> None:
+    """Schreibt einen synthetischen Datenbestand (10 % archiviert)"""
+    write_store(path, size, categories=CATEGORY_COUNT, category_skew=0.0,
+                no_due_ratio=0.3, due_window_days=30, due_skew=1.0, seed=seed)
+
+
+def _measure(fn: Callable[[int], object], repeat: int) -> Dict:
+    """Führt fn(i) repeat-mal aus und gibt Laufzeiten in Sekunden zurück"""
+    runs = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        runs.append(time.perf_counter() - start)
+    return {"median": statistics.median(runs), "min": min(runs), "runs": runs}
+
+
+def _load_view():
+    """Importiert TaskView nur, wenn Streamlit installiert ist"""
+    try:
+        from view import TaskView
+    except ImportError:
+        return None
+    return TaskView
+
+
+def bench_size(size: int, workdir: Path, repeat: int = 3) -> Dict[str, Dict]:
+    """Misst alle Operationen für einen Datenbestand der Größe size"""
+    path = workdir / f"store_{size}.json"
+    generate_store(path, size)
+    results: Dict[str, Dict] = {}
+
+    # Lazy Load: erst der Zugriff auf data liest die Datei
+    results["load"] = _measure(lambda i: TaskRepository(path).data, repeat)
+    repo = TaskRepository(path)
+    results["save"] = _measure(lambda i: repo.save(), repeat)
+    results["add_task"] = _measure(lambda i: repo.add_task(Task(0, f"Bench {i}")), repeat)
+    open_ids = [t["id"] for t in repo.data["tasks"][:repeat]]
+    results["toggle_task_completion"] = _measure(
+        lambda i: repo.toggle_task_completion(open_ids[i]), repeat)
+    results["filter_tasks"] = _measure(
+        lambda i: repo.filter_tasks(status="Offen", category="Kategorie 1"), repeat)
+    results["get_urgent_tasks"] = _measure(lambda i: repo.get_urgent_tasks(), repeat)
+    results["get_statistics"] = _measure(lambda i: repo.get_statistics(), repeat)
+    # Neue Instanz je Lauf: misst die Berechnung, nicht den Cache
+    results["analytics_report"] = _measure(lambda i: TaskAnalytics(repo).report(), repeat)
+    results["delete_category"] = _measure(
+        lambda i: repo.delete_category(f"Kategorie {i % CATEGORY_COUNT}"), repeat)
+
+    # Segmentierte Ablage: Änderung schreibt nur das betroffene Segment
+    sharded_path = path.with_name(f"sharded_{size}.json")
+    shutil.copyfile(path, sharded_path)
+    sharded = ShardedTaskRepository(sharded_path)
+    sharded.save()  # überführt den Bestand in Segmente
+    sharded_ids = [t["id"] for t in sharded.data["tasks"][:repeat]]
+    results["toggle_sharded"] = _measure(
+        lambda i: sharded.toggle_task_completion(sharded_ids[i]), repeat)
+
+    view = _load_view()
+    if view is not None:
+        tasks = repo.get_all_tasks()
+        results["render_html"] = _measure(
+            lambda i: [view.build_task_info_html(t, repo.get_category_color) for t in tasks], repeat)
+    return results
+
+
+def run_benchmarks(sizes: List[int], repeat: int = 3,
+                   workdir: Optional[Path] = None) -> Dict:
+    """Führt die Suite aus und liefert ein maschinenlesbares Ergebnis"""
+    output = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat
+        },
+        "results": {}
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        base = workdir or Path(tmp)
+        for size in sizes:
+            for op, timing in bench_size(size, base, repeat).items():
+                output["results"][f"{op}@{size}"] = {"op": op, "size": size, **timing}
+    return output
+
+
+def compare_with_baseline(results: Dict, baseline: Dict, max_regression: float = 0.25,
+                          min_seconds: float = 0.001) -> List[str]:
+    """
+    Vergleicht Mediane mit der Baseline.
+
+    Eine Regression liegt vor, wenn ein Median mehr als max_regression
+    (relativ) über der Baseline liegt; Messungen unter min_seconds gelten
+    als Rauschen.
+    """
+    regressions = []
+    for key, current in results["results"].items():
+        reference = baseline.get("results", {}).get(key)
+        if reference is None:
+            continue
+        limit = reference["median"] * (1 + max_regression)
+        if current["median"] > limit and current["median"] > min_seconds:
+            regressions.append(
+                f"{key}: {current['median'] * 1000:.2f} ms > "
+                f"{reference['median'] * 1000:.2f} ms (+{max_regression:.0%} erlaubt)"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks für die TODO-App")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.repeat)
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    for key, timing in results["results"].items():
+        print(f"{key:<32} {timing['median'] * 1000:10.2f} ms")
+
+    if args.baseline is None:
+        return 0
+    if args.update_baseline or not args.baseline.exists():
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Baseline gespeichert: {args.baseline}")
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare_with_baseline(results, baseline, args.max_regression)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
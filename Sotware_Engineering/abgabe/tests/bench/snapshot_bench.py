@@ -0,0 +1,82 @@
+"""
+Benchmark für Snapshots
+Misst auf einem synthetischen Datenbestand: ersten (vollständigen) Snapshot,
+Folge-Snapshot nach wenigen Änderungen, Vergleich zweier Snapshots und
+Wiederherstellung im laufenden Repository - jeweils mit Speicherbedarf.
+
+python -m tests.bench.snapshot_bench --size 100000
+python -m tests.bench.snapshot_bench --size 10000 --changes 500 --output snap.json
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from model import TaskRepository
+from snapshots import SnapshotStore
+from tests.bench.run_bench import generate_store
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, round(time.perf_counter() - start, 4)
+
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def run_snapshots(size: int, changes: int = 100, workdir: Optional[Path] = None) -> Dict:
+    """Führt die Messung aus und liefert Laufzeiten (s) und Größen (Bytes)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store_file = (workdir or Path(tmp)) / f"snap_{size}.json"
+        generate_store(store_file, size)
+        repo = TaskRepository(store_file)
+        repo.data
+        snapshots = SnapshotStore(repo)
+
+        first, t_first = _timed(snapshots.create)
+        size_first = _dir_size(snapshots.directory)
+        with repo.batch():
+            for task in repo.get_all_tasks()[:changes]:
+                repo.toggle_task_completion(task.id)
+        second, t_second = _timed(snapshots.create)
+        diff, t_diff = _timed(lambda: snapshots.diff(first["id"], second["id"]))
+        _, t_restore = _timed(lambda: snapshots.restore(first["id"], backup=False))
+        assert len(repo.get_archived_tasks()) == first["counts"]["archived_tasks"]
+
+        return {
+            "size": size,
+            "changes": changes,
+            "data_file_bytes": store_file.stat().st_size,
+            "first_snapshot_s": t_first,
+            "first_snapshot_bytes": size_first,
+            "incremental_snapshot_s": t_second,
+            "incremental_snapshot_bytes": _dir_size(snapshots.directory) - size_first,
+            "incremental_new_objects": second["new_objects"],
+            "diff_s": t_diff,
+            "diff_changed": len(diff["changed"]),
+            "restore_s": t_restore
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark für Snapshots")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--changes", type=int, default=100)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    report = run_snapshots(args.size, args.changes)
+    for key, value in report.items():
+        print(f"{key:<28} {value}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
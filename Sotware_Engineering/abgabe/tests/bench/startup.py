@@ -0,0 +1,106 @@
+"""
+Startzeit-Benchmark für TODO-App
+Misst in frischen Interpreter-Prozessen, wie lange ein erster Skriptlauf
+braucht: Imports, Controller-Anlage und das erste Rendern (Kategorien,
+gefilterte Liste, nächste Aufgaben, Task-HTML falls Streamlit installiert).
+Mit --warm wird das Laden wie in app.py im Hintergrund gestartet.
+
+python -m tests.bench.startup --sizes 1000 10000 100000
+python -m tests.bench.startup --baseline tests/bench/startup_baseline.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from tests.bench.run_bench import compare_with_baseline, generate_store
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+APP_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Läuft im Kindprozess; gibt die Phasenzeiten als JSON aus
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from controller import ApplicationController
+try:
+    from view import TaskView
+except ImportError:
+    TaskView = None
+imported = time.perf_counter()
+app = ApplicationController(__import__("pathlib").Path(sys.argv[1]))
+if sys.argv[2] == "1":
+    app.warm()
+constructed = time.perf_counter()
+tasks, categories = app.get_task_controller(), app.get_category_controller()
+names = categories.get_all_categories()
+visible = tasks.get_filtered_tasks(None, "Alle")
+tasks.get_next_tasks(5)
+if TaskView is not None:
+    [TaskView.build_task_info_html(t, categories.get_category_color) for t in visible]
+rendered = time.perf_counter()
+print(json.dumps({"import": imported - start, "first_paint": constructed - start,
+                  "first_render": rendered - start}))
+"""
+
+
+def probe(store: Path, warm: bool = False) -> Dict[str, float]:
+    """Ein Kaltstart in einem neuen Prozess"""
+    result = subprocess.run([sys.executable, "-c", _PROBE, str(store), "1" if warm else "0"],
+                            cwd=APP_DIR, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def run_startup(sizes: List[int], repeat: int = 3, warm: bool = False,
+                workdir: Optional[Path] = None) -> Dict:
+    """Misst die Startphasen je Datenbestand (Median über repeat Prozesse)"""
+    output = {"meta": {"repeat": repeat, "warm": warm}, "results": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        base = workdir or Path(tmp)
+        for size in sizes:
+            store = base / f"startup_{size}.json"
+            generate_store(store, size)
+            runs = [probe(store, warm) for _ in range(repeat)]
+            for phase in runs[0]:
+                timings = [run[phase] for run in runs]
+                output["results"][f"{phase}@{size}"] = {
+                    "op": phase, "size": size, "median": statistics.median(timings),
+                    "min": min(timings), "runs": timings
+                }
+    return output
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Startzeit-Benchmark für die TODO-App")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warm", action="store_true")
+    parser.add_argument("--output", type=Path, default=Path("startup_results.json"))
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = run_startup(args.sizes, args.repeat, args.warm)
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    for key, timing in results["results"].items():
+        print(f"{key:<28} {timing['median'] * 1000:10.2f} ms")
+
+    if args.baseline is None:
+        return 0
+    if not args.baseline.exists():
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Baseline gespeichert: {args.baseline}")
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare_with_baseline(results, baseline, args.max_regression)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
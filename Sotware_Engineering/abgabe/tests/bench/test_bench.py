@@ -0,0 +1,105 @@
+"""
+Smoke-Test der Benchmark-Suite (kleiner Datenbestand, läuft im normalen Testlauf)
+pytest -q tests/bench/test_bench.py
+"""
+import json
+import pytest
+from model import Category
+from tests.bench.run_bench import run_benchmarks, compare_with_baseline, main
+from tests.bench.generator import generate_store_data, write_store
+from tests.bench.replay import ReplayHarness, random_operations, load_operations, percentile
+from tests.bench.startup import run_startup
+from tests.bench.api_load import run_load
+from tests.bench.snapshot_bench import run_snapshots
+from tests.bench.id_bench import run_ids
+from tests.bench.concurrency_bench import run_stress
+
+
+class TestBench:
+    
+    def test_ergebnis_ist_maschinenlesbar(self, tmp_path):
+        results = run_benchmarks([200], repeat=2, workdir=tmp_path)
+        
+        assert "load@200" in results["results"]
+        assert "delete_category@200" in results["results"]
+        assert json.loads(json.dumps(results)) == results
+    
+    def test_regression_wird_erkannt(self):
+        baseline = {"results": {"load@1000": {"median": 0.010}}}
+        langsam = {"results": {"load@1000": {"median": 0.020}}}
+        schnell = {"results": {"load@1000": {"median": 0.011}}}
+        
+        assert len(compare_with_baseline(langsam, baseline, 0.25)) == 1
+        assert compare_with_baseline(schnell, baseline, 0.25) == []
+    
+    def test_cli_schreibt_baseline_und_vergleicht(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        args = ["--sizes", "100", "--repeat", "1", "--output", str(tmp_path / "out.json"),
+                "--baseline", str(baseline)]
+        
+        assert main(args) == 0
+        assert baseline.exists()
+        assert main(args + ["--max-regression", "1000"]) == 0
+    
+    def test_generator_respektiert_verteilungen(self):
+        data = generate_store_data(2000, categories=5, archive_ratio=0.5, no_due_ratio=0.0, seed=1)
+        
+        assert len(data["tasks"]) + len(data["archived_tasks"]) == 2000
+        assert 0.4 < len(data["archived_tasks"]) / 2000 < 0.6
+        assert len(data["categories"]) == 6
+        assert all(t["due_date"] for t in data["tasks"])
+        with pytest.raises(ValueError):
+            generate_store_data(10, categories=Category.MAX_CATEGORIES)
+    
+    def test_replay_misst_perzentile_und_zeichnet_auf(self, tmp_path):
+        store = write_store(tmp_path / "store.json", 300, seed=2)
+        harness = ReplayHarness(store, sessions=3)
+        
+        report = harness.run(random_operations(60, sessions=3, seed=3))
+        
+        assert sum(r["count"] for r in report.values()) == len(harness.recorded)
+        assert report["create"]["p50_ms"] <= report["create"]["max_ms"]
+        harness.save_recording(tmp_path / "ops.jsonl")
+        replayed = ReplayHarness(store, sessions=3).run(load_operations(tmp_path / "ops.jsonl"))
+        assert replayed["create"]["count"] == report["create"]["count"]
+    
+    def test_perzentil_nach_nearest_rank(self):
+        values = [6, 1, 5, 2, 4, 3]
+        # Rang ceil(pct/100 * n): 50 % von 6 ist Rang 3, nicht 4
+        assert [percentile(values, pct) for pct in (0, 50, 90, 99, 100)] == [1, 3, 6, 6, 6]
+        assert percentile(list(range(1, 11)), 90) == 9
+        assert percentile([7.0], 50) == 7.0
+    
+    def test_startzeit_phasen(self, tmp_path):
+        results = run_startup([200], repeat=1, warm=True, workdir=tmp_path)["results"]
+        
+        assert set(results) == {"import@200", "first_paint@200", "first_render@200"}
+        assert results["import@200"]["median"] <= results["first_render@200"]["median"]
+    
+    def test_api_lasttest(self, tmp_path):
+        report = run_load(200, clients=2, requests=20, write_ratio=0.2, workdir=tmp_path)
+        
+        assert report["requests"] == 40
+        assert report["requests_per_second"] > 0
+        assert sum(op["count"] for op in report["operations"].values()) == 40
+    
+    def test_snapshots(self, tmp_path):
+        report = run_snapshots(300, changes=10, workdir=tmp_path)
+        
+        assert report["incremental_new_objects"] == 10
+        assert report["diff_changed"] == 10
+        assert report["incremental_snapshot_bytes"] < report["first_snapshot_bytes"]
+    
+    def test_id_vergabe(self, tmp_path):
+        report = run_ids(processes=2, ids=200, threads=3, tasks=50, workdir=tmp_path)
+        
+        assert [row["ids"] for row in report["allocate"]] == [400, 400]
+        assert [row["reservations"] for row in report["create_tasks"]] == [150, 2]
+    
+    def test_stress_ohne_verlorene_aenderungen(self, tmp_path):
+        report = run_stress([1, 4], ops=100, size=200, read_ratio=0.5, workdir=tmp_path)
+        
+        for row in report["runs"]:
+            assert row["added"] > 0 and row["toggled"] > 0
+            assert row["lost_updates"] == 0 and row["duplicate_ids"] == 0
+            assert row["inconsistent_reads"] == 0
@@ -3,9 +3,27 @@ Integrationstests für TODO-App
 Testet das Zusammenspiel: Controller ↔ Repository ↔ Dateisystem
 pytest -q tests/test_integration.py
 """
+import asyncio
+import http.client
+import io
+import json
+import socket
+import subprocess
+import sys
+import threading
+import urllib.request
+from pathlib import Path
 import pytest
 from model import Task, TaskRepository
 from controller import TaskController
+from importer import AsyncTaskImporter
+from sync import SyncEngine
+from instrumentation import Instrumentation
+from cli import main as cli_main
+from api_server import ApiServer
+from controller import ApplicationController
+from tenants import RepositoryManager
+from design_patterns.adapter_pattern import ExternalTask, ExternalProjectAPI
 
 
 @pytest.fixture
@@ -65,3 +83,447 @@ class TestIntegration:
         # Assert: Abgelehnt, Repository unverändert
         assert result is False
         assert len(repo.get_all_tasks()) == 0
+
+
+class FakePagedAPI:
+    """Lokaler Stand-in für eine paginierte, langsame externe API"""
+    
+    def __init__(self, count):
+        self.tasks = [
+            ExternalTask(f"PM-{i}", f"Extern {i}", "done" if i % 4 == 0 else "open",
+                         "Backend", None, 3)
+            for i in range(count)
+        ]
+        self.active = 0
+        self.max_active = 0
+    
+    async def fetch_page(self, page, page_size):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.001)
+        self.active -= 1
+        return self.tasks[page * page_size:(page + 1) * page_size]
+
+
+class TestImport:
+    """Massenimport externe API → Adapter → Repository"""
+    
+    def test_async_import_begrenzt_und_gebuendelt(self, setup):
+        repo = setup["repo"]
+        api = FakePagedAPI(250)
+        importer = AsyncTaskImporter(repo, api, page_size=20, max_concurrency=3, batch_size=100)
+        
+        stats = importer.run_sync()
+        
+        assert stats.imported == 250
+        assert stats.batches == 3
+        assert api.max_active <= 3
+        assert len(repo.get_all_tasks()) + len(repo.get_archived_tasks()) == 250
+        # Reihenfolge bleibt erhalten: zuletzt importierte Task oben
+        assert repo.get_all_tasks()[0].title == "Extern 249"
+        assert TaskRepository(repo.data_file).data["next_id"] == 251
+    
+    def test_import_aus_synchroner_api(self, setup):
+        repo = setup["repo"]
+        stats = AsyncTaskImporter(repo, ExternalProjectAPI(), page_size=3).run_sync()
+        assert stats.imported == 4
+        assert stats.to_dict()["pages"] >= 2
+        assert [t.title for t in repo.get_archived_tasks()] == ["Unit Tests schreiben"]
+    
+    def test_import_merkt_herkunft_fuer_sync(self, setup):
+        repo = setup["repo"]
+        api = ExternalProjectAPI()
+        AsyncTaskImporter(repo, api, page_size=3, source_name="pm").run_sync()
+        
+        again = AsyncTaskImporter(repo, api, page_size=3, source_name="pm").run_sync()
+        result = SyncEngine(repo, api, "pm").sync()
+        
+        assert again.imported == 0 and again.skipped == 4
+        assert result["created"] == 0
+        assert len(repo.get_all_tasks()) + len(repo.get_archived_tasks()) == 4
+        mapping = TaskRepository(repo.data_file).get_sync_state("pm")["mapping"]
+        assert set(mapping) == {"PM-001", "PM-002", "PM-003", "PM-004"}
+        assert setup["ctrl"].get_task(mapping["PM-001"]).title == api.fetch_task_by_id("PM-001").task_name
+    
+    def test_fehler_eines_workers_stoppt_die_anderen(self, setup):
+        api = FailingPagedAPI()
+        importer = AsyncTaskImporter(setup["repo"], api, page_size=10, max_concurrency=4)
+        
+        async def scenario():
+            with pytest.raises(ConnectionError):
+                await importer.run()
+            calls = api.calls
+            await asyncio.sleep(0.05)
+            return calls, api.calls
+        
+        before, after = asyncio.run(scenario())
+        # Nach dem Fehler ruft kein Worker im Hintergrund weitere Seiten ab
+        assert after == before
+
+
+class FailingPagedAPI(FakePagedAPI):
+    """Seite 1 schlägt fehl, alle anderen Seiten sind voll und langsam"""
+    
+    def __init__(self):
+        super().__init__(10_000)
+        self.calls = 0
+    
+    async def fetch_page(self, page, page_size):
+        self.calls += 1
+        if page == 1:
+            raise ConnectionError("Seite 1 nicht erreichbar")
+        await asyncio.sleep(0.005)
+        return self.tasks[page * page_size:(page + 1) * page_size]
+
+
+class TestSync:
+    """Inkrementeller Zwei-Wege-Sync externe API ↔ Repository"""
+    
+    def test_erster_sync_importiert_und_merkt_mapping(self, setup):
+        repo = setup["repo"]
+        engine = SyncEngine(repo, ExternalProjectAPI(), "pm")
+        
+        result = engine.sync()
+        
+        assert result["created"] == 4
+        state = TaskRepository(repo.data_file).get_sync_state("pm")
+        assert set(state["mapping"]) == {"PM-001", "PM-002", "PM-003", "PM-004"}
+        assert state["token"] == "4"
+    
+    def test_folgesync_holt_nur_delta(self, setup):
+        repo = setup["repo"]
+        api = ExternalProjectAPI()
+        engine = SyncEngine(repo, api, "pm")
+        engine.sync()
+        
+        api.update_task("PM-003", task_name="Doku neu", status="done")
+        result = engine.sync()
+        
+        assert result["fetched"] == 1
+        assert result["updated"] == 1 and result["created"] == 0
+        assert "Doku neu" in [t.title for t in repo.get_archived_tasks()]
+    
+    def test_lokale_erledigung_wird_zurueckgemeldet(self, setup):
+        repo, ctrl = setup["repo"], setup["ctrl"]
+        api = ExternalProjectAPI()
+        engine = SyncEngine(repo, api, "pm")
+        engine.sync()
+        internal_id = repo.get_sync_state("pm")["mapping"]["PM-001"]
+        
+        ctrl.update_task(internal_id, "Umbenannt", "Backend")
+        ctrl.toggle_task_completion(internal_id)
+        result = engine.sync()
+        
+        assert result["pushed"] == 1
+        assert api.fetch_task_by_id("PM-001").status == "done"
+        assert repo.get_sync_state("pm")["outbox"] == {}
+        # Rückmeldung kommt als Echo zurück, die Task bleibt erledigt
+        assert internal_id in [t.id for t in repo.get_archived_tasks()]
+    
+    def test_sync_ohne_aenderungen_speichert_nicht(self, setup, monkeypatch):
+        repo, ctrl = setup["repo"], setup["ctrl"]
+        engine = SyncEngine(repo, ExternalProjectAPI(), "pm")
+        engine.sync()
+        ctrl.create_task("Lokal")
+        saves = []
+        original = TaskRepository.save
+        monkeypatch.setattr(TaskRepository, "save", lambda self: (saves.append(1), original(self)))
+        
+        result = engine.sync()
+        
+        assert result["updated"] == result["created"] == 0
+        assert saves == [] and ctrl.can_undo() is True
+    
+    def test_rueckgaengig_gemachte_erledigung_bleibt_offen(self, setup):
+        repo, ctrl = setup["repo"], setup["ctrl"]
+        api = ExternalProjectAPI()
+        engine = SyncEngine(repo, api, "pm")
+        engine.sync()
+        internal_id = repo.get_sync_state("pm")["mapping"]["PM-001"]
+        
+        ctrl.toggle_task_completion(internal_id)
+        ctrl.undo()
+        engine.sync()
+        
+        assert internal_id in [t.id for t in repo.get_all_tasks()]
+        assert api.fetch_task_by_id("PM-001").status == "open"
+        assert repo.get_sync_state("pm")["outbox"] == {}
+    
+    def test_push_speichert_ueber_write_behind(self, setup):
+        repo, ctrl = setup["repo"], setup["ctrl"]
+        api = ExternalProjectAPI()
+        engine = SyncEngine(repo, api, "pm")
+        engine.sync()
+        ctrl.toggle_task_completion(repo.get_sync_state("pm")["mapping"]["PM-001"])
+        repo.start_write_behind(0.05)
+        try:
+            assert engine.push() == 1
+            assert repo.wait_durable(2)
+        finally:
+            repo.stop_write_behind()
+        assert TaskRepository(repo.data_file).get_sync_state("pm")["outbox"] == {}
+    
+    def test_externe_erledigung_mit_zeitstempel_gemeldet(self, setup):
+        repo = setup["repo"]
+        api = ExternalProjectAPI()
+        engine = SyncEngine(repo, api, "pm")
+        engine.sync()
+        seen = []
+        repo.add_listener(lambda event, task_data, old_data=None: seen.append(task_data.get("completed_at")))
+        
+        api.update_task("PM-001", status="done")
+        engine.sync()
+        
+        assert len(seen) == 1 and seen[0] is not None
+    
+    def test_unvollstaendige_herkunft_aendert_nichts_an_outbox(self, setup):
+        repo, ctrl = setup["repo"], setup["ctrl"]
+        repo.add_tasks([Task(0, "Halb")], [{"external_source": "pm"}])
+        
+        assert ctrl.toggle_task_completion(1)
+        
+        assert repo.get_sync_state("pm")["outbox"] == {}
+        assert [t.title for t in repo.get_archived_tasks()] == ["Halb"]
+
+
+class TestMetrikEndpunkt:
+    """Instrumentierung ↔ lokaler HTTP-Endpunkt"""
+    
+    def test_metrics_endpunkt_liefert_prometheus_text(self, setup):
+        inst = Instrumentation()
+        inst.enable()
+        try:
+            setup["ctrl"].create_task("Gemessen")
+            port = inst.serve(port=0)
+            body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics").read().decode()
+        finally:
+            inst.stop_serving()
+            inst.disable()
+        assert 'todo_calls_total{method="TaskController.create_task"} 1' in body
+
+
+class TestCLI:
+    """CLI ↔ Controller ↔ Repository ohne Streamlit"""
+    
+    def run(self, data_file, *argv, stdin=None):
+        out = io.StringIO()
+        sys_stdout, sys.stdout = sys.stdout, out
+        try:
+            code = cli_main(["--data", str(data_file), "--json", *argv], stdin=stdin)
+        finally:
+            sys.stdout = sys_stdout
+        return code, [json.loads(line) for line in out.getvalue().splitlines()]
+    
+    def test_add_complete_archive(self, tmp_path):
+        data = tmp_path / "cli.json"
+        code, out = self.run(data, "add", "Milch", "--priority", "5", "--type", "shopping")
+        assert code == 0 and out == [{"ok": True, "id": 1}]
+        assert self.run(data, "complete", "1")[0] == 0
+        assert self.run(data, "complete", "1")[0] == 1  # schon im Archiv
+        _, (archived,) = self.run(data, "archive")
+        assert archived[0]["title"] == "Milch" and archived[0]["type"] == "shopping"
+    
+    def test_app_und_cli_vergeben_keine_doppelten_ids(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("TODO_ID_BLOCK", raising=False)
+        data = tmp_path / "cli.json"
+        assert ApplicationController(data).repository.id_allocator is None  # nur auf Wunsch
+        monkeypatch.setenv("TODO_ID_BLOCK", "1")
+        app = ApplicationController(data)
+        app.get_task_controller().create_task("Aus der App")
+        # Die CLI liest den Stand danach, die App hält ihren Block aber weiter
+        _, out = self.run(data, "add", "Aus der CLI")
+        app.get_task_controller().create_task("Wieder App")
+        
+        ids = [t.id for t in app.get_task_controller().get_all_tasks()]
+        assert out[0]["id"] not in ids
+        again = self.run(data, "add", "Noch einmal CLI")[1][0]["id"]
+        assert again not in ids + [out[0]["id"]]
+    
+    def test_batch_speichert_einmal(self, tmp_path, monkeypatch):
+        data = tmp_path / "cli.json"
+        saves = []
+        original = TaskRepository.save
+        monkeypatch.setattr(TaskRepository, "save", lambda self: (saves.append(1), original(self)))
+        commands = io.StringIO("add A\nadd B\n# Kommentar\ncomplete 1\nunbekannt\nstats\n")
+        code, out = self.run(data, "--batch", stdin=commands)
+        assert code == 2  # ungültige Zeile
+        assert len(saves) == 1
+        assert out[-1]["open"] == 1 and out[-1]["archived"] == 1
+        assert len(TaskRepository(data).get_all_tasks()) == 1
+    
+    def test_export_import_roundtrip(self, tmp_path):
+        source, target = tmp_path / "a.json", tmp_path / "b.json"
+        self.run(source, "add", "Eins")
+        self.run(source, "add", "Zwei")
+        self.run(source, "complete", "1")
+        self.run(source, "export", str(tmp_path / "export.json"))
+        code, out = self.run(target, "import", str(tmp_path / "export.json"))
+        assert code == 0 and out == [{"imported": 2, "rejected": 0, "errors": []}]
+        repo = TaskRepository(target)
+        assert [t.title for t in repo.get_all_tasks()] == ["Zwei"]
+        assert [t.title for t in repo.get_archived_tasks()] == ["Eins"]
+    
+    def test_start_ohne_streamlit(self, tmp_path):
+        code = "import sys, cli; print(any(m in sys.modules for m in ('streamlit', 'view', 'asyncio')))"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent.parent)
+        assert result.stdout.strip() == "False"
+    
+    def test_rollback_wird_von_laufender_sitzung_uebernommen(self, tmp_path):
+        data = tmp_path / "cli.json"
+        self.run(data, "add", "Behalten")
+        _, (snapshot,) = self.run(data, "snapshot", "--label", "vorher")
+        self.run(data, "add", "Versehentlich")
+        session = TaskRepository(data)
+        assert len(session.get_all_tasks()) == 2
+        
+        code, (result,) = self.run(data, "rollback", snapshot["id"])
+        assert code == 0 and result["backup"] is not None
+        assert session.reload_if_changed() is True
+        assert [t.title for t in session.get_all_tasks()] == ["Behalten"]
+        assert self.run(data, "rollback", "gibt-es-nicht")[0] == 1
+        _, (snapshots,) = self.run(data, "snapshots")
+        assert [s["label"] for s in snapshots] == ["vorher", f"vor Wiederherstellung {snapshot['id']}"]
+    
+    def test_trends_aus_archiv(self, tmp_path):
+        data = tmp_path / "cli.json"
+        self.run(data, "add", "Bericht")
+        self.run(data, "complete", "1")
+        code, (report,) = self.run(data, "trends", "--weeks", "4")
+        assert code == 0 and report["tasks"] == 1 and len(report["weeks"]) == 4
+        assert report["throughput"]["Keine"][-1] == 1
+        assert report["lead_time_days"]["Keine"]["count"] == 1
+
+
+@pytest.fixture
+def api(tmp_path):
+    """API-Server im Hintergrund + Keep-Alive-Verbindung"""
+    app = ApplicationController(tmp_path / "api.json", thread_safe=True)
+    server = ApiServer(app, port=0)
+    port = server.start_in_thread()
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    
+    def request(method, path, body=None, headers=None):
+        conn.request(method, path, body=json.dumps(body) if body is not None else None,
+                     headers=headers or {})
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, response, json.loads(data) if data else None
+    
+    yield {"app": app, "request": request, "conn": conn, "port": port}
+    conn.close()
+    server.stop()
+
+
+class TestApiServer:
+    """HTTP-API ↔ Controller ↔ Repository"""
+    
+    def test_crud_ueber_eine_verbindung(self, api):
+        request = api["request"]
+        status, _, body = request("POST", "/tasks", {"title": "API", "priority": 4, "type": "work"})
+        assert status == 201
+        sock = api["conn"].sock
+        status, _, task = request("GET", f"/tasks/{body['id']}")
+        assert status == 200 and task["type"] == "work" and task["priority"] == 4
+        assert request("POST", f"/tasks/{body['id']}/toggle")[0] == 200
+        assert request("GET", "/tasks/archived")[2]["total"] == 1
+        assert request("DELETE", f"/tasks/{body['id']}")[0] == 204
+        assert request("GET", "/tasks/999")[0] == 404
+        assert api["conn"].sock is sock  # Keep-Alive: keine neue Verbindung
+    
+    def test_etag_folgt_datenversion(self, api):
+        request = api["request"]
+        request("POST", "/tasks", {"title": "Eins"})
+        _, response, _ = request("GET", "/tasks")
+        etag = response.getheader("ETag")
+        
+        assert request("GET", "/tasks", headers={"If-None-Match": etag})[0] == 304
+        request("POST", "/tasks", {"title": "Zwei"})
+        status, response, body = request("GET", "/tasks", headers={"If-None-Match": etag})
+        assert status == 200 and body["total"] == 2
+        assert response.getheader("ETag") != etag
+    
+    def test_batch_mit_einem_speichervorgang(self, api, monkeypatch):
+        saves = []
+        original = TaskRepository.save
+        monkeypatch.setattr(TaskRepository, "save", lambda self: (saves.append(1), original(self)))
+        status, _, results = api["request"]("POST", "/batch", [
+            {"method": "POST", "path": "/tasks", "body": {"title": "A"}},
+            {"method": "POST", "path": "/tasks", "body": {"title": "B", "category": "Fehlt"}},
+            {"method": "POST", "path": "/tasks/1/toggle"},
+            {"method": "GET", "path": "/tasks?status=Offen"}
+        ])
+        
+        assert status == 200
+        assert [r["status"] for r in results] == [201, 422, 200, 200]
+        assert results[3]["body"]["total"] == 0
+        assert len(saves) == 1
+    
+    def test_massenanlage_meldet_fehler_je_datensatz(self, api):
+        status, _, body = api["request"]("POST", "/tasks/bulk", {"tasks": [
+            {"title": " Eins ", "due_date": "2030-01-02"},
+            {"title": ""},
+            {"title": "Drei", "category": "Fehlt"},
+            {"title": "Vier", "priority": 9}
+        ]})
+        assert status == 200 and body["imported"] == 1 and body["rejected"] == 3
+        assert [e["index"] for e in body["errors"]] == [1, 2, 3]
+        _, _, tasks = api["request"]("GET", "/tasks")
+        assert [(t["title"], t["due_date"]) for t in tasks["tasks"]] == [("Eins", "2030-01-02")]
+        assert api["request"]("POST", "/tasks/bulk", {"tasks": "keine Liste"})[0] == 400
+    
+    @pytest.mark.parametrize("length, status", [("abc", 400), ("-5", 400), (str(16 * 1024 * 1024 + 1), 413)])
+    def test_ungueltige_content_length(self, api, length, status):
+        with socket.create_connection(("127.0.0.1", api["port"]), timeout=5) as sock:
+            sock.sendall(f"POST /tasks HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+            assert sock.recv(1024).split(b" ")[1] == str(status).encode()
+        assert api["request"]("GET", "/tasks")[0] == 200  # Server bleibt erreichbar
+    
+    def test_speichern_blockiert_event_loop_nicht(self, api, monkeypatch):
+        saving, release = threading.Event(), threading.Event()
+        original = TaskRepository.save
+        monkeypatch.setattr(TaskRepository, "save",
+                            lambda self: (saving.set(), release.wait(5), original(self)))
+        other = http.client.HTTPConnection("127.0.0.1", api["port"], timeout=5)
+        writer = threading.Thread(target=lambda: (other.request("POST", "/tasks", '{"title": "Langsam"}'),
+                                                  other.getresponse().read()))
+        writer.start()
+        try:
+            assert saving.wait(5)
+            # Während gespeichert wird, beantwortet der Server weitere Verbindungen
+            probe = http.client.HTTPConnection("127.0.0.1", api["port"], timeout=1)
+            probe.request("GET", "/unbekannt")
+            assert probe.getresponse().status == 404
+            probe.close()
+        finally:
+            release.set()
+            writer.join(5)
+            other.close()
+        assert api["request"]("GET", "/tasks")[2]["total"] == 1
+
+
+class TestApiMandanten:
+    """HTTP-API ↔ RepositoryManager: ein Datenbestand pro Mandant"""
+    
+    def test_header_waehlt_datenbestand(self, tmp_path):
+        tenants = RepositoryManager(tmp_path / "tenants", max_open=1)
+        server = ApiServer(tenants=tenants, port=0)
+        conn = http.client.HTTPConnection("127.0.0.1", server.start_in_thread())
+        
+        def request(method, path, tenant=None, body=None):
+            headers = {"X-Tenant": tenant} if tenant else {}
+            conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+            return response.status, json.loads(data) if data else None
+        
+        try:
+            assert request("POST", "/tasks", "anna", {"title": "Annas Task"})[0] == 201
+            assert request("GET", "/tasks", "ben")[1]["total"] == 0  # anna wird freigegeben
+            assert request("GET", "/tasks", "anna")[1]["tasks"][0]["title"] == "Annas Task"
+            assert request("GET", "/tasks")[0] == 400
+            assert tenants.get_repository("anna").thread_safe
+        finally:
+            conn.close()
+            server.stop()
+            tenants.close()
@@ -3,10 +3,28 @@ Unit Tests für TODO-App | pytest | AAA-Muster | Ziel: >=80% Coverage
 
 python -m pytest tests/test_unit.py -v --tb=short && python -m pytest tests/test_unit.py --cov=model --cov=controller --cov-report=term-missing && wc -l tests/test_unit.py
 """
+import json
+import subprocess
+import sys
 import pytest
-from datetime import date
-from model import Task, Category, TaskRepository
-from controller import TaskController
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from model import Task, Category, TaskRepository, TaskTypeFactory, ShoppingTask, WorkTask
+from controller import TaskController, ApplicationController
+from instrumentation import Instrumentation
+from profiling import RerunProfiler, profiling_requested
+from tenants import RepositoryManager
+from sharding import ShardedTaskRepository
+from snapshots import SnapshotStore
+from archive import ColdArchive
+from recurrence import RecurrenceRule
+from history import UndoHistory
+from analytics import TaskAnalytics
+from reminders import ReminderScheduler, FileNotifier
+from validation import BatchValidator
+from id_allocator import BlockIdAllocator
+from rwlock import ReadWriteLock
+from design_patterns.adapter_pattern import ExternalTask, ExternalProjectAPI, ExternalTaskAdapter
 
 
 @pytest.fixture
@@ -113,3 +131,1056 @@ class TestCoverage:
         r1.save()
         r2 = TaskRepository(f)
         assert len(r2.get_all_tasks()) == 1
+
+
+# Adapter / externe API
+
+class TestExterneAPI:
+    
+    def test_batch_abruf_nach_ids(self):
+        api = ExternalProjectAPI()
+        tasks = api.fetch_tasks_by_ids(["PM-004", "PM-999", "PM-001"])
+        assert [t.task_id for t in tasks] == ["PM-004", "PM-001"]
+        assert api.fetch_task_by_id("PM-002").task_name == "Unit Tests schreiben"
+    
+    def test_adapter_cacht_abgeleitete_felder(self):
+        ext = ExternalTask("X-1", "Extern", "open", "P", datetime.now(), 3)
+        adapter = ExternalTaskAdapter(ext, internal_id=1)
+        assert not hasattr(adapter, "__dict__")
+        assert adapter.due_date == date.today().isoformat()
+        assert adapter.is_urgent() is True
+        # Neue Deadline wird erkannt
+        ext.deadline = datetime.now() + timedelta(days=10)
+        assert adapter.is_urgent() is False
+        assert adapter.due_date == (date.today() + timedelta(days=10)).isoformat()
+
+
+# Priorität und "Als Nächstes"
+
+class TestPrioritaet:
+    
+    def test_prioritaet_wird_gespeichert(self, repo, ctrl):
+        ctrl.create_task("Wichtig", priority=5)
+        assert TaskRepository(repo.data_file).get_task_by_id(1).priority == 5
+        ctrl.update_task(1, "Wichtig!", "Keine")
+        assert ctrl.get_task(1).priority == 5
+        assert ctrl.create_task("Ungültig", priority=9) is False
+    
+    def test_naechste_tasks_nach_prioritaet_und_datum(self, ctrl):
+        ctrl.create_task("Niedrig", priority=1)
+        ctrl.create_task("Hoch spät", due_date=date.today() + timedelta(days=5), priority=5)
+        ctrl.create_task("Hoch früh", due_date=date.today(), priority=5)
+        ctrl.create_task("Mittel")
+        assert [t.title for t in ctrl.get_next_tasks(3)] == ["Hoch früh", "Hoch spät", "Mittel"]
+    
+    def test_index_wird_inkrementell_gepflegt(self, ctrl):
+        for i in range(10):
+            ctrl.create_task(f"T{i}", priority=2)
+        assert len(ctrl.get_next_tasks(20)) == 10
+        ctrl.update_task(3, "Jetzt wichtig", "Keine", priority=5)
+        ctrl.toggle_task_completion(10)
+        ctrl.delete_task(9)
+        top = ctrl.get_next_tasks(20)
+        assert top[0].title == "Jetzt wichtig"
+        assert len(top) == 8 and len({t.id for t in top}) == 8
+        ctrl.restore_task(10)
+        assert len(ctrl.get_next_tasks(20)) == 9
+
+
+# Task-Typen (Factory)
+
+class TestTaskTypen:
+    
+    def test_typ_wird_gespeichert_und_hydriert(self, repo, ctrl):
+        ctrl.create_task("Milch", task_type="shopping")
+        ctrl.create_task("Bericht", task_type="work")
+        ctrl.create_task("Sonstiges")
+        tasks = TaskRepository(repo.data_file).get_all_tasks()
+        assert [type(t) for t in tasks] == [Task, WorkTask, ShoppingTask]
+        assert tasks[2].describe() == "Einkauf"
+        ctrl.update_task(1, "Hafermilch", "Keine")
+        assert isinstance(ctrl.get_task(1), ShoppingTask)
+    
+    def test_plugin_wird_erst_bei_bedarf_importiert(self, repo, monkeypatch, tmp_path, request):
+        # Registry und Plugin-Modul sind global - nach dem Test wiederherstellen
+        monkeypatch.setattr(TaskTypeFactory, "_task_types", dict(TaskTypeFactory._task_types))
+        monkeypatch.setattr(TaskTypeFactory, "_lazy_paths", dict(TaskTypeFactory._lazy_paths))
+        request.addfinalizer(lambda: sys.modules.pop("todo_plugin_urlaub", None))
+        (tmp_path / "todo_plugin_urlaub.py").write_text(
+            "from model import Task\n"
+            "class UrlaubTask(Task):\n"
+            "    TYPE = 'urlaub'\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        TaskTypeFactory.register_task_type_path("urlaub", "todo_plugin_urlaub:UrlaubTask")
+        assert "urlaub" in TaskTypeFactory.get_type_names()
+        assert "todo_plugin_urlaub" not in sys.modules
+        
+        repo.add_task(TaskTypeFactory.create_task("urlaub", id=0, title="Koffer packen"))
+        
+        assert "todo_plugin_urlaub" in sys.modules
+        assert type(repo.get_all_tasks()[0]).__name__ == "UrlaubTask"
+    
+    def test_kaputtes_plugin_faellt_auf_task_zurueck(self, repo, monkeypatch, caplog):
+        monkeypatch.setattr(TaskTypeFactory, "_task_types", dict(TaskTypeFactory._task_types))
+        monkeypatch.setattr(TaskTypeFactory, "_lazy_paths", dict(TaskTypeFactory._lazy_paths))
+        monkeypatch.setattr(TaskTypeFactory, "_broken_paths", set())
+        TaskTypeFactory.register_task_type_path("kaputt", "gibt_es_nicht_plugin:Klasse")
+        repo.add_task(Task(0, "Bleibt lesbar", task_type="kaputt"))
+        
+        with caplog.at_level("WARNING", logger="todo.model"):
+            tasks = repo.get_all_tasks() + repo.get_all_tasks()
+        
+        assert [type(t) for t in tasks] == [Task, Task]
+        assert len([r for r in caplog.records if "kaputt" in r.getMessage()]) == 1
+        repo.update_task(tasks[0])
+        assert TaskRepository(repo.data_file).data["tasks"][0]["type"] == "kaputt"
+    
+    def test_unbekannter_typ_bleibt_erhalten(self):
+        task = Task.from_dict({"id": 1, "title": "X", "type": "gibtsnicht"})
+        assert type(task) is Task
+        assert task.to_dict()["type"] == "gibtsnicht"
+
+
+# Instrumentierung
+
+class TestInstrumentierung:
+    
+    def test_misst_aufrufe_und_stellt_originale_wieder_her(self, tmp_path):
+        original = TaskRepository.save
+        inst = Instrumentation()
+        inst.enable(track_memory=True)
+        try:
+            ctrl = TaskController(TaskRepository(tmp_path / "i.json"))
+            ctrl.create_task("A")
+            ctrl.create_task("B")
+            ctrl.get_filtered_tasks()
+            stats = inst.get_stats()
+        finally:
+            inst.disable()
+        
+        assert TaskRepository.save is original
+        assert stats["TaskRepository.save"]["calls"] == 2
+        assert stats["TaskController.create_task"]["calls"] == 2
+        assert stats["TaskRepository._load_data"]["calls"] == 1
+        assert stats["TaskRepository.filter_tasks"]["alloc_bytes"] > 0
+    
+    def test_export_json_und_prometheus(self, tmp_path):
+        inst = Instrumentation()
+        inst._record("TaskRepository.save", 0.5, 10)
+        inst.export(tmp_path / "m.prom")
+        inst.export(tmp_path / "m.json")
+        
+        prom = (tmp_path / "m.prom").read_text()
+        assert 'todo_calls_total{method="TaskRepository.save"} 1' in prom
+        assert json.loads((tmp_path / "m.json").read_text())["TaskRepository.save"]["total_ms"] == 500.0
+
+
+# Profiling-Modus
+
+class TestProfiling:
+    
+    def test_report_mit_schichten_und_rollierender_uebersicht(self, tmp_path):
+        store = tmp_path / "p.json"
+        TaskRepository(store).add_tasks([Task(0, f"T{i}") for i in range(300)])
+        
+        for _ in range(3):
+            with RerunProfiler(report_dir=tmp_path / "profiles", keep_slowest=2) as profiler:
+                TaskController(TaskRepository(store)).get_filtered_tasks()
+        
+        assert profiler.report["layers"]["model"] > 0
+        assert "controller" in profiler.report["layers"]
+        assert profiler.report["memory"]["peak_bytes"] > 0
+        summary = json.loads((tmp_path / "profiles" / "summary.json").read_text())
+        assert len(summary) == 2
+        assert summary[0]["wall_s"] >= summary[1]["wall_s"]
+        assert len(list((tmp_path / "profiles").glob("rerun-*.json"))) == 3
+    
+    def test_aktivierung(self, monkeypatch):
+        monkeypatch.delenv("TODO_PROFILE", raising=False)
+        assert profiling_requested({"profile": "1"}) is True
+        assert profiling_requested({}) is False
+        monkeypatch.setenv("TODO_PROFILE", "1")
+        assert profiling_requested() is True
+    
+    def test_nur_ein_rerun_wird_gleichzeitig_profiliert(self, tmp_path):
+        import tracemalloc
+        outer = RerunProfiler(report_dir=tmp_path)
+        with outer:
+            with RerunProfiler(report_dir=tmp_path) as inner:
+                pass
+            assert tracemalloc.is_tracing()  # der äußere Lauf misst weiter
+        assert not tracemalloc.is_tracing()
+        assert inner.report is None and outer.report["memory"]["peak_bytes"] > 0
+        with RerunProfiler(report_dir=tmp_path) as again:
+            pass
+        assert again.report is not None
+    
+    def test_fehlgeschlagenes_enable_laesst_nichts_zurueck(self, tmp_path):
+        import tracemalloc
+        profiler = RerunProfiler(report_dir=tmp_path)
+        
+        def busy():
+            raise ValueError("Another profiling tool is already active")
+        profiler._profile.enable = busy
+        with profiler:
+            assert not tracemalloc.is_tracing()
+        assert profiler.report is None
+        with RerunProfiler(report_dir=tmp_path) as again:
+            pass
+        assert again.report is not None and not tracemalloc.is_tracing()
+    
+    def test_fremdes_tracemalloc_bleibt_unberuehrt(self, tmp_path):
+        import tracemalloc
+        tracemalloc.start()
+        try:
+            with RerunProfiler(report_dir=tmp_path) as profiler:
+                pass
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+        assert profiler.report["memory"] == {}
+    
+    def test_alle_app_module_haben_eine_schicht(self):
+        from profiling import LAYER_FILES
+        modules = {path.name for path in Path(__file__).resolve().parents[1].glob("*.py")}
+        assert modules <= set(LAYER_FILES)
+
+
+class TestLazyLoad:
+    
+    def test_daten_erst_bei_zugriff(self, tmp_path):
+        store = tmp_path / "lazy.json"
+        TaskRepository(store).add_task(Task(0, "Vorhanden"))
+        
+        repo = TaskRepository(store)
+        assert repo.is_loaded() is False
+        assert [t.title for t in repo.get_all_tasks()] == ["Vorhanden"]
+        assert repo.is_loaded() is True
+    
+    def test_speichern_ohne_vorherigen_zugriff(self, tmp_path):
+        store = tmp_path / "lazy.json"
+        TaskRepository(store).add_task(Task(0, "Vorhanden"))
+        
+        TaskRepository(store).save()
+        assert len(TaskRepository(store).get_all_tasks()) == 1
+    
+    def test_warm_laedt_im_hintergrund(self, tmp_path):
+        store = tmp_path / "lazy.json"
+        TaskRepository(store).add_task(Task(0, "Vorhanden"))
+        
+        repo = TaskRepository(store)
+        repo.warm().join(timeout=5)
+        assert repo.is_loaded() is True
+        assert len(repo.get_all_tasks()) == 1
+    
+    def test_optionale_module_erst_bei_bedarf(self, tmp_path):
+        script = ("import sys\nfrom pathlib import Path\n"
+                  "from controller import ApplicationController\n"
+                  f"app = ApplicationController(Path({str(tmp_path / 'lazy.json')!r}))\n"
+                  "app.get_task_controller().get_statistics()\n"
+                  "print(sorted(m for m in ('analytics', 'reminders', 'zstandard') if m in sys.modules))\n"
+                  "app.get_task_controller().get_analytics(4)\n"
+                  "print('analytics' in sys.modules)")
+        out = subprocess.run([sys.executable, "-c", script], cwd=Path(__file__).resolve().parents[1],
+                             capture_output=True, text=True, check=True).stdout.split()
+        assert out == ["[]", "True"]
+
+
+class TestMandanten:
+    
+    def test_eigene_datei_pro_mandant(self, tmp_path):
+        manager = RepositoryManager(tmp_path)
+        manager.get_controller("anna").get_task_controller().create_task("Annas Task")
+        
+        assert manager.get_repository("ben").get_all_tasks() == []
+        assert manager.path_for("anna") != manager.path_for("ben")
+        assert manager.path_for("a/b") != manager.path_for("a_b")
+        assert manager.get_controller("anna") is manager.get_controller("anna")
+        assert TaskRepository(manager.path_for("anna")).get_all_tasks()[0].title == "Annas Task"
+    
+    def test_lru_und_leerlauf(self, tmp_path):
+        now = [0.0]
+        manager = RepositoryManager(tmp_path, max_open=2, idle_seconds=60, clock=lambda: now[0])
+        manager.get_repository("a")
+        manager.get_repository("b")
+        manager.get_repository("a")
+        manager.get_repository("c")  # b ist am längsten ungenutzt
+        assert manager.open_tenants() == ["a", "c"]
+        
+        now[0] = 100.0
+        manager.get_repository("d")
+        assert manager.open_tenants() == ["d"]
+        assert manager.get_stats()["evictions"] == 3
+    
+    def test_speicherbudget_speichert_vor_freigabe(self, tmp_path):
+        manager = RepositoryManager(tmp_path, memory_budget=1, idle_seconds=None)
+        repo = manager.get_repository("a")
+        with repo.batch():
+            repo.add_task(Task(0, "Gepuffert"))
+            manager.get_repository("b")  # a liegt über dem Budget
+            assert manager.open_tenants() == ["b"]
+        assert TaskRepository(manager.path_for("a")).get_all_tasks()[0].title == "Gepuffert"
+    
+    def test_laufende_anfrage_wird_nicht_freigegeben(self, tmp_path):
+        now = [0.0]
+        manager = RepositoryManager(tmp_path, max_open=1, idle_seconds=60, clock=lambda: now[0])
+        freed = []
+        manager.add_evict_listener(freed.append)
+        with manager.lease("a") as controller:
+            manager.get_repository("b")  # über max_open, a ist aber in Benutzung
+            now[0] = 100.0
+            assert manager.evict_idle() == ["b"]
+            assert controller.repository is manager.get_repository("a")
+        assert freed == ["b"]
+        now[0] = 200.0
+        assert manager.evict_idle() == ["a"]
+    
+    def test_sweeper_gibt_ohne_zugriffe_frei(self, tmp_path):
+        import time
+        manager = RepositoryManager(tmp_path, idle_seconds=0.01)
+        manager.get_repository("a")
+        manager.start_sweeper(interval=0.01)
+        deadline = time.monotonic() + 2
+        while manager.open_tenants() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        manager.close()
+        assert manager.open_tenants() == [] and manager._sweeper is None
+
+
+class TestSharding:
+    
+    def fill(self, repo):
+        repo.add_category(Category("Arbeit", "#ff0000"))
+        repo.add_category(Category("Privat", "#00ff00"))
+        for i in range(30):
+            repo.add_task(Task(0, f"T{i}", category=["Arbeit", "Privat", "Keine"][i % 3]))
+        for task_id in (2, 9, 17):
+            repo.toggle_task_completion(task_id)
+        repo.restore_task(9)
+        repo.delete_task(4)
+    
+    @pytest.mark.parametrize("shard_by", ["category", "hash"])
+    def test_rundreise_erhaelt_reihenfolge(self, tmp_path, shard_by):
+        repo = ShardedTaskRepository(tmp_path / "s.json", shard_by=shard_by, shard_count=4)
+        self.fill(repo)
+        repo.delete_category("Arbeit")
+        
+        loaded = ShardedTaskRepository(tmp_path / "s.json")
+        assert loaded.data["tasks"] == repo.data["tasks"]
+        assert loaded.data["archived_tasks"] == repo.data["archived_tasks"]
+        assert loaded.data["next_id"] == repo.data["next_id"]
+        assert loaded.shard_by == shard_by
+    
+    def test_nur_betroffene_segmente_werden_geschrieben(self, tmp_path, monkeypatch):
+        repo = ShardedTaskRepository(tmp_path / "s.json")
+        self.fill(repo)
+        written = []
+        original = ShardedTaskRepository._shard_path
+        monkeypatch.setattr(ShardedTaskRepository, "_shard_path",
+                            lambda self, key: (written.append(key), original(self, key))[1])
+        
+        repo.add_task(Task(0, "Neu", category="Privat"))
+        assert written == [repo.shard_key({"category": "Privat"})]
+        written.clear()
+        repo.delete_category("Arbeit")
+        assert sorted(written) == sorted(repo.shard_key({"category": c}) for c in ("Arbeit", "Keine"))
+        assert not original(repo, repo.shard_key({"category": "Arbeit"})).exists()
+    
+    def test_kategoriefilter_liest_ein_segment(self, tmp_path):
+        self.fill(ShardedTaskRepository(tmp_path / "s.json"))
+        
+        repo = ShardedTaskRepository(tmp_path / "s.json")
+        privat = repo.filter_tasks(category="Privat")
+        assert repo.is_loaded() is False
+        assert [t.title for t in privat] == [t["title"] for t in repo.data["tasks"]
+                                             if t["category"] == "Privat"]
+    
+    def test_migration_aus_einer_datei(self, tmp_path):
+        plain = TaskRepository(tmp_path / "s.json")
+        self.fill(plain)
+        
+        repo = ShardedTaskRepository(tmp_path / "s.json")
+        repo.add_task(Task(0, "Danach"))
+        loaded = ShardedTaskRepository(tmp_path / "s.json")
+        assert [t["title"] for t in loaded.data["tasks"]] == ["Danach"] + [t["title"] for t in plain.data["tasks"]]
+        assert loaded.data["archived_tasks"] == plain.data["archived_tasks"]
+
+
+class TestWriteBehind:
+    
+    def test_aenderungen_werden_gebuendelt_gespeichert(self, tmp_path, monkeypatch):
+        saves = []
+        original = TaskRepository.save
+        monkeypatch.setattr(TaskRepository, "save", lambda self: (saves.append(1), original(self)))
+        repo = TaskRepository(tmp_path / "wb.json")
+        repo.start_write_behind(max_delay=0.2)
+        try:
+            for i in range(20):
+                repo.add_task(Task(0, f"T{i}"))
+            assert len(repo.get_all_tasks()) == 20  # sofort im Speicher
+            assert repo.wait_durable(timeout=5) is True
+        finally:
+            repo.stop_write_behind()
+        
+        assert 1 <= len(saves) <= 3
+        assert len(TaskRepository(tmp_path / "wb.json").get_all_tasks()) == 20
+    
+    def test_fehlgeschlagenes_speichern_bleibt_dirty(self, tmp_path):
+        repo = TaskRepository(tmp_path / "fehlt" / "wb.json")  # Verzeichnis existiert nicht
+        repo.start_write_behind(max_delay=0.01)
+        try:
+            repo.add_task(Task(0, "Verloren?"))
+            assert repo.wait_durable(timeout=0.5) is False
+            assert isinstance(repo.write_error, OSError)
+            assert repo._dirty and repo.persisted_version < repo.version
+            
+            (tmp_path / "fehlt").mkdir()
+            repo.add_task(Task(0, "Zweite"))
+            assert repo.wait_durable(timeout=5) is True
+        finally:
+            repo.stop_write_behind()
+        assert len(TaskRepository(tmp_path / "fehlt" / "wb.json").get_all_tasks()) == 2
+    
+    def test_stop_speichert_ausstehende_aenderungen(self, tmp_path):
+        repo = TaskRepository(tmp_path / "wb.json")
+        repo.start_write_behind(max_delay=60)
+        repo.add_task(Task(0, "Ausstehend"))
+        assert not (tmp_path / "wb.json").exists()
+        
+        repo.stop_write_behind()
+        assert TaskRepository(tmp_path / "wb.json").get_all_tasks()[0].title == "Ausstehend"
+    
+    def test_speichern_beim_prozessende(self, tmp_path):
+        store = tmp_path / "wb.json"
+        code = ("import sys; from pathlib import Path; from model import Task, TaskRepository; "
+                "repo = TaskRepository(Path(sys.argv[1])); repo.start_write_behind(60); "
+                "repo.add_task(Task(0, 'Atexit'))")
+        subprocess.run([sys.executable, "-c", code, str(store)], check=True,
+                       cwd=Path(__file__).resolve().parent.parent)
+        
+        assert TaskRepository(store).get_all_tasks()[0].title == "Atexit"
+
+
+# Rückgängig/Wiederholen
+
+class TestUndo:
+    
+    def test_loeschen_rueckgaengig_an_alter_position(self, ctrl, repo):
+        for title in ["A", "B", "C"]:
+            ctrl.create_task(title)
+        middle = ctrl.get_all_tasks()[1]
+        ctrl.delete_task(middle.id)
+        
+        assert ctrl.undo() is True
+        assert [t.title for t in ctrl.get_all_tasks()] == ["C", "B", "A"]
+        assert [t.title for t in TaskRepository(repo.data_file).get_all_tasks()] == ["C", "B", "A"]
+        assert ctrl.redo() is True
+        assert [t.title for t in ctrl.get_all_tasks()] == ["C", "A"]
+    
+    def test_erledigen_und_bearbeiten_rueckgaengig(self, ctrl):
+        ctrl.create_task("Alt", priority=2)
+        task_id = ctrl.get_all_tasks()[0].id
+        ctrl.update_task(task_id, "Neu", "Keine", None, priority=5)
+        ctrl.toggle_task_completion(task_id)
+        
+        ctrl.undo()
+        assert ctrl.get_all_tasks()[0].title == "Neu"
+        assert ctrl.get_archived_tasks() == []
+        ctrl.undo()
+        assert ctrl.get_all_tasks()[0].title == "Alt"
+        assert ctrl.get_next_tasks(1)[0].priority == 2  # Index folgt über Events
+        assert ctrl.can_redo() is True
+        
+        ctrl.create_task("Neue Aktion")
+        assert ctrl.can_redo() is False
+    
+    def test_kategorie_loeschen_und_massenimport(self, repo):
+        repo.add_category(Category("Uni"))
+        repo.add_task(Task(0, "Vorlesung", category="Uni"))
+        repo.delete_category("Uni")
+        repo.undo()
+        assert "Uni" in [c["name"] for c in repo.get_categories()]
+        assert repo.get_all_tasks()[0].category == "Uni"
+        
+        repo.add_tasks([Task(0, f"Import {i}") for i in range(50)])
+        repo.undo()
+        assert len(repo.get_all_tasks()) == 1
+    
+    def test_grenzen(self, repo):
+        repo.history.max_steps = 3
+        for i in range(5):
+            repo.add_task(Task(0, f"T{i}"))
+        assert repo.history.get_stats()["undo_steps"] == 3
+        while repo.undo():
+            pass
+        assert len(repo.get_all_tasks()) == 2
+        
+        repo.history.max_bytes = 10
+        repo.delete_task(repo.get_all_tasks()[0].id)
+        assert repo.can_undo() is False
+    
+    def test_sharding_reihenfolge_nach_undo(self, tmp_path):
+        repo = ShardedTaskRepository(tmp_path / "s.json")
+        for i in range(5):
+            repo.add_task(Task(0, f"T{i}"))
+        repo.delete_task(repo.get_all_tasks()[2].id)
+        repo.undo()
+        
+        titles = [t.title for t in ShardedTaskRepository(tmp_path / "s.json").get_all_tasks()]
+        assert titles == ["T4", "T3", "T2", "T1", "T0"]
+    
+    def test_eigene_historie_je_session(self, ctrl, repo):
+        alice, bob = UndoHistory(), UndoHistory()
+        with repo.use_history(alice):
+            ctrl.create_task("Von Alice")
+        with repo.use_history(bob):
+            assert ctrl.can_undo() is False  # Bob sieht Alices Schritt nicht
+            ctrl.create_task("Von Bob")
+            assert ctrl.can_undo() is True
+        with repo.use_history(alice):
+            # Bobs Änderung hat die Positionen verschoben - Alices Historie ist verworfen
+            assert ctrl.undo() is False
+        with repo.use_history(bob):
+            assert ctrl.undo() is True
+        assert [t.title for t in ctrl.get_all_tasks()] == ["Von Alice"]
+
+
+# Snapshots
+
+class TestSnapshots:
+    
+    def test_inkrementell_und_dedupliziert(self, repo):
+        for i in range(10):
+            repo.add_task(Task(0, f"T{i}"))
+        store = SnapshotStore(repo)
+        assert store.create()["new_objects"] == 10
+        repo.toggle_task_completion(repo.get_all_tasks()[0].id)
+        second = store.create()
+        assert second["new_objects"] == 1
+        assert second["counts"] == {"tasks": 9, "archived_tasks": 1}
+        assert len(store.objects_file.read_text().splitlines()) == 11
+    
+    def test_diff(self, repo):
+        repo.add_task(Task(0, "Bleibt"))
+        repo.add_task(Task(0, "Wird geändert"))
+        repo.add_task(Task(0, "Wird gelöscht"))
+        store = SnapshotStore(repo)
+        first = store.create()["id"]
+        repo.delete_task(3)
+        repo.update_task(Task(2, "Geändert"))
+        repo.add_task(Task(0, "Neu"))
+        
+        expected = {"added": [4], "removed": [3], "changed": [2]}
+        assert store.diff(first) == expected
+        assert store.diff(first, store.create()["id"]) == expected
+    
+    def test_wiederherstellen_an_ort_und_stelle(self, repo):
+        repo.add_task(Task(0, "A", priority=1))
+        repo.add_task(Task(0, "B", priority=5))
+        assert repo.get_next_tasks(1)[0].title == "B"
+        store = SnapshotStore(repo)
+        snapshot = store.create()["id"]
+        repo.delete_task(2)
+        repo.add_task(Task(0, "C"))
+        events = []
+        repo.add_listener(lambda event, *_: events.append(event))
+        
+        result = store.restore(snapshot)
+        assert events[0] == "reset"
+        assert [t.title for t in repo.get_all_tasks()] == ["B", "A"]
+        assert repo.get_next_tasks(1)[0].title == "B"  # Index neu aufgebaut
+        assert repo.data["next_id"] == 4  # IDs werden nicht wiederverwendet
+        assert [t.title for t in TaskRepository(repo.data_file).get_all_tasks()] == ["B", "A"]
+        assert store.diff(result["backup"]) == {"added": [2], "removed": [3], "changed": []}
+        assert store.create()["new_objects"] == 0
+    
+    def test_aufraeumen(self, repo):
+        store = SnapshotStore(repo)
+        for i in range(3):
+            repo.add_task(Task(0, f"T{i}"))
+            store.create()
+        repo.delete_task(1)
+        store.create()
+        
+        result = store.prune(keep=1)
+        assert result == {"removed": 3, "objects_before": 3, "objects_after": 2}
+        assert len(store.get_snapshots()) == 1
+    
+    def test_sharding_wiederherstellen(self, tmp_path):
+        repo = ShardedTaskRepository(tmp_path / "s.json", shard_by="hash", shard_count=2)
+        for i in range(4):
+            repo.add_task(Task(0, f"T{i}"))
+        store = SnapshotStore(repo)
+        snapshot = store.create()["id"]
+        repo.delete_task(1)
+        store.restore(snapshot)
+        
+        titles = [t.title for t in ShardedTaskRepository(tmp_path / "s.json").get_all_tasks()]
+        assert titles == ["T3", "T2", "T1", "T0"]
+
+
+# Kalt-Archiv
+
+class TestKaltArchiv:
+    
+    def archived_repo(self, tmp_path, count):
+        repo = TaskRepository(tmp_path / "archiv.json")
+        repo.add_tasks([Task(0, f"T{i}", completed=True) for i in range(count)])
+        return repo
+    
+    def test_erledigen_setzt_zeitstempel(self, repo):
+        repo.add_task(Task(0, "A"))
+        repo.toggle_task_completion(1)
+        assert repo.data["archived_tasks"][0]["completed_at"]
+        repo.restore_task(1)
+        assert "completed_at" not in repo.data["tasks"][0]
+    
+    def test_auslagern_nach_alter(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("archive.SEGMENT_SIZE", 4)
+        repo = self.archived_repo(tmp_path, 10)
+        repo.data["archived_tasks"][0]["completed_at"] = "2999-06-01T00:00:00"  # jung
+        archive = ColdArchive(repo, codec="gz")
+        
+        result = archive.compact(max_age_days=30, now=datetime(2999, 6, 15))
+        assert result["moved"] == 9 and result["segments"] == 3
+        assert result["bytes_after"] < result["bytes_before"]
+        assert len(TaskRepository(repo.data_file).get_archived_tasks()) == 1
+        assert archive.count() == 9
+        assert archive.compact(max_age_days=30, now=datetime(2999, 6, 15))["moved"] == 0
+    
+    def test_blaettern_ueber_hauptdatei_und_segmente(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("archive.SEGMENT_SIZE", 3)
+        repo = self.archived_repo(tmp_path, 10)
+        expected = [t["id"] for t in repo.data["archived_tasks"]]
+        repo.data["archived_tasks"][0]["completed_at"] = "2999-06-14T12:00:00"
+        archive = ColdArchive(repo, codec="gz")
+        archive.compact(max_age_days=1, now=datetime(2999, 6, 15))
+        
+        pages = [archive.page(offset, 4) for offset in (0, 4, 8)]
+        assert [t["id"] for rows, _ in pages for t in rows] == expected
+        assert {total for _, total in pages} == {10}
+    
+    def test_wiederherstellen_und_loeschen(self, tmp_path):
+        repo = self.archived_repo(tmp_path, 3)
+        app = ApplicationController(repository=repo)
+        app.archive.compact(max_age_days=0, now=datetime(2999, 1, 1))
+        tasks = app.get_task_controller()
+        
+        assert tasks.restore_task(2) is True
+        assert repo.get_all_tasks()[0].title == "T1"
+        assert repo.get_all_tasks()[0].completed is False
+        assert tasks.delete_task(1) is True
+        assert tasks.get_archive_page(0)[1] == 1
+        assert ColdArchive(repo).cold_ids() == {3}
+
+
+# Wiederkehrende Tasks
+
+class TestWiederholung:
+    
+    def test_regeln(self):
+        assert RecurrenceRule("daily", 2).next_after(date(2026, 1, 30)) == date(2026, 2, 1)
+        monthly = RecurrenceRule("monthly", day=31)
+        assert monthly.next_after(date(2026, 1, 31)) == date(2026, 2, 28)
+        assert monthly.next_after(date(2026, 2, 28)) == date(2026, 3, 31)
+        custom = RecurrenceRule("custom", weekdays=[0, 3])  # Mo, Do
+        assert custom.next_after(date(2026, 10, 19)) == date(2026, 10, 22)
+        assert custom.next_after(date(2026, 10, 22)) == date(2026, 10, 26)
+        assert RecurrenceRule("custom").validate() is False
+        assert RecurrenceRule("hourly").validate() is False
+    
+    def test_erledigen_legt_folgetermin_an(self, ctrl, repo):
+        today = date.today()
+        ctrl.create_task("Müll", due_date=today, recurrence=RecurrenceRule("weekly"))
+        ctrl.toggle_task_completion(1)
+        
+        (follow_up,) = ctrl.get_all_tasks()
+        assert follow_up.id == 2 and follow_up.completed is False
+        assert follow_up.due_date == (today + timedelta(weeks=1)).isoformat()
+        assert follow_up.recurrence == {"freq": "weekly", "interval": 1}
+        assert ctrl.get_archived_tasks()[0].recurrence is None
+        repo.undo()
+        assert [t.id for t in ctrl.get_all_tasks()] == [1]
+    
+    def test_verpasste_termine_werden_uebersprungen(self, ctrl):
+        ctrl.create_task("Blumen", due_date=date.today() - timedelta(days=10),
+                         recurrence=RecurrenceRule("daily"))
+        ctrl.toggle_task_completion(1)
+        assert ctrl.get_all_tasks()[0].due_date == date.today().isoformat()
+    
+    def test_termine_im_fenster_werden_lazy_berechnet(self, ctrl):
+        today = date.today()
+        ctrl.create_task("Täglich", recurrence=RecurrenceRule("daily"))
+        ctrl.create_task("Einmalig", due_date=today + timedelta(days=2))
+        ctrl.create_task("Später", due_date=today + timedelta(days=30))
+        
+        upcoming = ctrl.get_upcoming(7)
+        assert len(ctrl.get_all_tasks()) == 3  # nichts angelegt
+        assert [t.title for _, t in upcoming].count("Täglich") == 7
+        assert (today + timedelta(days=2), "Einmalig") in [(d, t.title) for d, t in upcoming]
+        assert "Später" not in [t.title for _, t in upcoming]
+    
+    def test_dringend_ueber_faelligkeits_index(self, ctrl, repo):
+        today = date.today()
+        for offset in (-1, 0, 1, 2):
+            ctrl.create_task(f"T{offset}", due_date=today + timedelta(days=offset))
+        assert sorted(t.title for t in ctrl.get_urgent_tasks()) == ["T0", "T1"]
+        
+        ctrl.toggle_task_completion(2)  # T0 erledigt
+        ctrl.update_task(4, "T2", "Keine", today)
+        assert sorted(t.title for t in ctrl.get_urgent_tasks()) == ["T1", "T2"]
+    
+    def test_regel_setzen_und_entfernen(self, ctrl):
+        ctrl.create_task("Sport")
+        assert ctrl.set_recurrence(1, RecurrenceRule("custom", weekdays=[1, 4])) is True
+        assert ctrl.get_task(1).due_date == date.today().isoformat()
+        ctrl.update_task(1, "Sport!", "Keine", date.today())
+        assert ctrl.get_task(1).recurrence["weekdays"] == [1, 4]  # bleibt beim Bearbeiten
+        ctrl.set_recurrence(1, None)
+        assert ctrl.get_task(1).recurrence is None
+
+
+# Dashboard-Kennzahlen
+
+class TestStatistiken:
+    
+    def test_zaehler_folgen_aenderungen(self, ctrl, repo):
+        today = date.today()
+        repo.add_category(Category("Uni"))
+        ctrl.create_task("Alt", due_date=today - timedelta(days=3))
+        ctrl.create_task("Bald", "Uni", due_date=today + timedelta(days=2))
+        ctrl.create_task("Ohne")
+        stats = ctrl.get_statistics()
+        assert stats["open"] == 3 and stats["archived"] == 0
+        assert stats["overdue"] == 1 and stats["due_this_week"] == 1
+        assert stats["open_per_category"] == {"Keine": 2, "Uni": 1}
+        
+        ctrl.toggle_task_completion(3)
+        ctrl.delete_task(1)
+        repo.delete_category("Uni")
+        stats = ctrl.get_statistics()
+        assert stats["open"] == 1 and stats["archived"] == 1
+        assert stats["overdue"] == 0 and stats["completed_today"] == 1
+        assert stats["completions_last_days"][-1] == 1
+        assert stats["open_per_category"] == {"Keine": 1}
+    
+    def test_inkrementell_gleich_neu_berechnet(self, ctrl, repo):
+        for i in range(20):
+            ctrl.create_task(f"T{i}", due_date=date.today() + timedelta(days=i % 5 - 2))
+        ctrl.get_statistics()  # Zähler ab hier inkrementell
+        for task_id in range(1, 21, 3):
+            ctrl.toggle_task_completion(task_id)
+        ctrl.restore_task(4)
+        repo.undo()
+        ctrl.delete_task(2)
+        
+        fresh = TaskController(TaskRepository(repo.data_file)).get_statistics()
+        assert ctrl.get_statistics() == fresh
+    
+    def test_externe_terminaenderung_im_index(self, ctrl, repo):
+        today = date.today()
+        tomorrow, later = today + timedelta(days=1), today + timedelta(days=3)
+        repo.apply_external_changes("pm", [("PM-1", Task(0, "Extern", due_date=tomorrow.isoformat()))], "1")
+        assert [t.title for t in ctrl.get_urgent_tasks()] == ["Extern"]
+        assert ctrl.get_statistics()["due_this_week"] == 1
+        
+        repo.apply_external_changes("pm", [("PM-1", Task(0, "Extern", due_date=later.isoformat()))], "2")
+        assert ctrl.get_urgent_tasks() == []
+        assert ctrl.get_statistics()["due_this_week"] == 1
+        
+        ctrl.delete_task(1)
+        assert ctrl.get_urgent_tasks() == []
+        assert ctrl.get_statistics()["due_this_week"] == 0
+
+
+# Auswertungen (Durchsatz, Durchlaufzeit, Verspätung)
+
+class TestAuswertungen:
+    
+    @staticmethod
+    def _fill(repo):
+        """Vier erledigte Tasks mit festen Zeitstempeln (Montag 2030-03-04 = Wochenbeginn)"""
+        tasks = [Task(0, f"T{i}", completed=True, category=category) for i, category in
+                 enumerate(["Uni", "Uni", "Arbeit", "Keine"])]
+        extra = [
+            {"created_at": "2030-03-01T08:00:00", "completed_at": "2030-03-05T08:00:00", "due_date": "2030-03-04"},
+            {"created_at": "2030-03-04T08:00:00", "completed_at": "2030-03-06T08:00:00", "due_date": "2030-03-10"},
+            {"created_at": "2030-02-20T12:00:00", "completed_at": "2030-02-27T12:00:00"},
+            {"completed_at": "kaputt"},
+        ]
+        repo.add_category(Category("Uni"))
+        repo.add_category(Category("Arbeit"))
+        repo.add_tasks(tasks, extra)
+    
+    def test_zeitstempel_werden_erfasst(self, ctrl, repo):
+        ctrl.create_task("Neu")
+        created = repo.data["tasks"][0]["created_at"]
+        assert created[:10] == date.today().isoformat()
+        ctrl.toggle_task_completion(1)
+        archived = repo.data["archived_tasks"][0]
+        assert archived["created_at"] == created and archived["completed_at"] >= created
+    
+    def test_bericht(self, repo):
+        self._fill(repo)
+        report = TaskAnalytics(repo, use_numpy=False).report(weeks=2, today=date(2030, 3, 8))
+        assert report["weeks"] == ["2030-02-25", "2030-03-04"]
+        assert report["throughput"] == {"Arbeit": [1, 0], "Uni": [0, 2]}
+        assert report["lead_time_days"]["Uni"] == {"count": 2, "mean": 3.0, "median": 3.0}
+        assert report["lead_time_days"]["Arbeit"]["mean"] == 7.0
+        assert report["overdue_rate"] == {"Uni": 0.5}
+        assert report["tasks"] == 3  # ungültiger Zeitstempel wird übersprungen
+    
+    def test_cache_bis_zur_aenderung(self, repo):
+        self._fill(repo)
+        analytics = TaskAnalytics(repo, use_numpy=False)
+        first = analytics.report(today=date(2030, 3, 8))
+        assert analytics.report(today=date(2030, 3, 8)) is first
+        repo.delete_task(1)
+        assert analytics.report(today=date(2030, 3, 8))["tasks"] == 2
+    
+    def test_numpy_wie_python(self, repo):
+        pytest.importorskip("numpy")
+        self._fill(repo)
+        repo.delete_task(4)  # ungültige Zeitstempel lassen NumPy auf Python zurückfallen
+        numpy_report = TaskAnalytics(repo).report(weeks=3, today=date(2030, 3, 8))
+        python_report = TaskAnalytics(repo, use_numpy=False).report(weeks=3, today=date(2030, 3, 8))
+        assert numpy_report.pop("engine") == "numpy"
+        python_report.pop("engine")
+        assert numpy_report == python_report
+
+
+# Erinnerungen an Fälligkeiten
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+
+class TestErinnerungen:
+    
+    @pytest.fixture
+    def setup(self, repo):
+        clock = FakeClock(datetime(2030, 3, 1, 8, 0))
+        fired = []
+        scheduler = ReminderScheduler(repo, [fired.append], clock=clock)
+        scheduler.attach()
+        return scheduler, clock, fired
+    
+    def test_meldet_zum_zeitpunkt(self, repo, setup):
+        scheduler, clock, fired = setup
+        repo.add_task(Task(0, "Abgabe", due_date="2030-03-03"))
+        repo.add_task(Task(0, "Später", due_date="2030-03-20"))
+        assert scheduler.run_pending() == []
+        clock.now = datetime(2030, 3, 2, 9, 0)  # Tag davor, 9 Uhr
+        assert [r["title"] for r in scheduler.run_pending()] == ["Abgabe"]
+        assert scheduler.run_pending() == []  # nur einmal
+        assert fired[0]["remind_at"] == "2030-03-02T09:00:00"
+        assert [r["id"] for r in scheduler.pending()] == [2]
+    
+    def test_aenderungen_inkrementell(self, repo, setup):
+        scheduler, clock, fired = setup
+        ctrl = TaskController(repo)
+        for title in ("Verschoben", "Erledigt", "Gelöscht", "Neu"):
+            ctrl.create_task(title, due_date=date(2030, 3, 2))
+        ctrl.update_task(1, "Verschoben", "Keine", date(2030, 3, 10))
+        ctrl.toggle_task_completion(2)
+        ctrl.delete_task(3)
+        clock.now = datetime(2030, 3, 5)
+        assert [r["title"] for r in scheduler.run_pending()] == ["Neu"]
+        clock.now = datetime(2030, 3, 9, 9, 0)
+        assert [r["title"] for r in scheduler.run_pending()] == ["Verschoben"]
+        repo.undo()  # Löschen rückgängig - Fälligkeit 2. März ist inzwischen vorbei
+        assert scheduler.run_pending() == [] and len(fired) == 2
+    
+    def test_datei_und_fehlerhafter_notifier(self, repo, tmp_path):
+        def broken(reminder):
+            raise OSError("Webhook nicht erreichbar")
+        log_file = tmp_path / "reminders.jsonl"
+        scheduler = ReminderScheduler(repo, [broken, FileNotifier(log_file)],
+                                      clock=FakeClock(datetime(2030, 3, 2, 12, 0)))
+        repo.add_task(Task(0, "Abgabe", due_date="2030-03-03"))
+        scheduler.attach()
+        assert len(scheduler.run_pending()) == 1
+        assert json.loads(log_file.read_text(encoding="utf-8"))["title"] == "Abgabe"
+        assert isinstance(scheduler.last_error, OSError)
+    
+    def test_thread_wird_bei_aenderung_geweckt(self, repo):
+        import threading
+        clock = FakeClock(datetime(2030, 3, 2, 12, 0))
+        event = threading.Event()
+        scheduler = ReminderScheduler(repo, [lambda reminder: event.set()], clock=clock)
+        scheduler.start()
+        try:
+            repo.add_task(Task(0, "Sofort", due_date="2030-03-03"))
+            assert event.wait(2)
+        finally:
+            scheduler.stop()
+
+
+# Block-Prüfung von Datensätzen
+
+class TestBatchValidierung:
+    
+    def test_normalisiert_und_sammelt_fehler(self):
+        validator = BatchValidator(["Keine", "Uni"])
+        result = validator.validate([
+            {"title": "  Lernen ", "category": " Uni ", "due_date": "2030-05-01", "created_at": "2030-01-01T00:00:00"},
+            {"title": "   "},
+            {"title": "Ohne Kategorie", "category": "", "due_date": "2030-05-01T14:30"},
+            {"title": "X", "category": "Fehlt"},
+            {"title": "Y", "due_date": "1.5.2030"},
+            {"title": "Z", "priority": True},
+            {"title": "R", "recurrence": {"freq": "yearly"}},
+            "kein Objekt",
+        ])
+        assert [r["title"] for r in result.records] == ["Lernen", "Ohne Kategorie"]
+        assert result.records[0]["category"] == "Uni" and result.records[1]["category"] == "Keine"
+        assert result.records[1]["due_date"] == "2030-05-01T14:30:00"
+        assert result.extra_fields[0] == {"created_at": "2030-01-01T00:00:00"}
+        assert [index for index, _ in result.errors] == [1, 3, 4, 5, 6, 7]
+        assert "Fehlt" in dict(result.errors)[3]
+    
+    def test_nur_bekannte_zusatzfelder(self, repo):
+        result = BatchValidator().validate([
+            {"title": "A", "completed_at": "2030-01-02T08:00", "external_source": "pm", "external_id": "PM-1"},
+            {"title": "B", "next_id": 999},
+            {"title": "C", "created_at": "gestern"},
+            {"title": "D", "external_source": "pm"},
+            {"title": "E", "external_source": "pm", "external_id": 7},
+        ])
+        assert result.extra_fields == [{"completed_at": "2030-01-02T08:00:00",
+                                        "external_source": "pm", "external_id": "PM-1"}]
+        assert [index for index, _ in result.errors] == [1, 2, 3, 4]
+        assert "next_id" in dict(result.errors)[1]
+        
+        repo.add_tasks(result.tasks(), result.extra_fields)
+        assert "next_id" not in repo.data["tasks"][0]
+    
+    def test_status_als_text_wird_geparst(self):
+        result = BatchValidator().validate([
+            {"title": "A", "completed": "false"},
+            {"title": "B", "completed": " True "},
+            {"title": "C", "completed": "nein"},
+            {"title": "D", "completed": True},
+            {"title": "E"},
+            {"title": "F", "completed": "vielleicht"},
+            {"title": "G", "completed": 1},
+            {"title": "H", "completed": []},
+        ])
+        assert [r["completed"] for r in result.records] == [False, True, False, True, False]
+        assert [index for index, _ in result.errors] == [5, 6, 7]
+        assert "vielleicht" in dict(result.errors)[5]
+    
+    def test_datum_wird_einmal_geparst(self, repo):
+        validator = BatchValidator()
+        result = validator.validate([{"title": f"T{i}", "due_date": "2030-05-01"} for i in range(1000)])
+        assert len(validator._dates) == 1 and result.rejected == 0
+        assert repo.add_tasks(result.tasks(), result.extra_fields) == 1000
+        assert repo.data["tasks"][0]["due_date"] == "2030-05-01"
+
+
+# ID-Vergabe über mehrere Prozesse
+
+class TestIdVergabe:
+    
+    def test_bloecke_sind_disjunkt(self, tmp_path):
+        first = BlockIdAllocator(tmp_path / "todo.ids", block_size=10)
+        second = BlockIdAllocator(tmp_path / "todo.ids", block_size=10)
+        ids = [first.next_id(), second.next_id(), first.next_id()]
+        assert ids == [1, 11, 2]
+        assert second.allocate(25) == list(range(12, 21)) + list(range(21, 37))
+        assert first.reservations == 1 and second.reservations == 2
+        assert (tmp_path / "todo.ids").read_text() == "37"  # Rest passend nachreserviert
+    
+    def test_zwei_sitzungen_ohne_doppelte_ids(self, tmp_path):
+        data_file = tmp_path / "todo.json"
+        TaskRepository(data_file).add_task(Task(0, "Bestand"))  # next_id = 2 ohne Zählerdatei
+        sessions = [TaskRepository(data_file), TaskRepository(data_file)]
+        for session in sessions:
+            session.data  # beide laden den Bestand, bevor die andere schreibt
+            session.use_shared_ids(block_size=5)
+        sessions[0].add_task(Task(0, "A"))
+        sessions[1].add_tasks([Task(0, "B"), Task(0, "C")])
+        sessions[0].add_task(Task(0, "D"))
+        assert [t.id for t in sessions[0].get_all_tasks()] == [3, 2, 1]
+        assert [t.id for t in sessions[1].get_all_tasks()] == [8, 7, 1]
+        assert sessions[1].data["next_id"] == 9
+
+
+# Lese-/Schreib-Lock (Thread-sicherer Modus)
+
+class TestLeseSchreibLock:
+    
+    def test_leser_parallel_schreiber_exklusiv(self):
+        import threading
+        lock = ReadWriteLock()
+        inside, events = threading.Barrier(2, timeout=2), []
+        
+        def reader():
+            with lock.read:
+                inside.wait()  # beide Leser gleichzeitig im Lock
+        
+        readers = [threading.Thread(target=reader) for _ in range(2)]
+        for t in readers:
+            t.start()
+        for t in readers:
+            t.join()
+        
+        with lock.read:
+            writer = threading.Thread(target=lambda: (lock.acquire_write(), events.append("write"),
+                                                      lock.release_write()))
+            writer.start()
+            writer.join(0.1)
+            assert events == []  # wartet auf den Leser
+            with lock.read:
+                pass  # erneutes Lesen trotz wartendem Schreiber
+        writer.join(2)
+        assert events == ["write"]
+    
+    def test_verschachtelt_und_keine_aufwertung(self):
+        lock = ReadWriteLock()
+        with lock.write:
+            with lock.write, lock.read:
+                pass
+        with lock.read:
+            with pytest.raises(RuntimeError):
+                lock.acquire_write()
+    
+    def test_repository_im_thread_sicheren_modus(self, tmp_path):
+        import threading
+        repo = TaskRepository(tmp_path / "shared.json", thread_safe=True)
+        repo.add_category(Category("Uni"))
+        repo.start_write_behind(0.01)
+        
+        def writer(n):
+            for i in range(50):
+                repo.add_task(Task(0, f"{n}-{i}", category="Uni"))
+                repo.get_next_tasks(3)
+                repo.get_statistics()
+        
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        repo.stop_write_behind()
+        assert len(TaskRepository(repo.data_file).get_all_tasks()) == 200
+        assert repo.get_statistics()["open_per_category"] == {"Uni": 200}
+    
+    def test_snapshot_ist_kopie_mit_version(self, tmp_path):
+        repo = TaskRepository(tmp_path / "shared.json", thread_safe=True)
+        repo.add_task(Task(0, "A"))
+        repo.get_sync_state("pm")["mapping"]["PM-1"] = 1
+        
+        version, data = repo.snapshot("tasks", "sync")
+        repo.add_task(Task(0, "B"))
+        repo.get_sync_state("pm")["mapping"]["PM-2"] = 2
+        
+        assert set(data) == {"tasks", "sync"}
+        assert [t["title"] for t in data["tasks"]] == ["A"]
+        assert data["sync"]["pm"]["mapping"] == {"PM-1": 1}
+        assert version < repo.version
@@ -0,0 +1,167 @@
+# VALIDATION - Prüfung und Normalisierung von Task-Datensätzen im Block
+# Verantwortlichkeiten:
+# - Rohdaten (Import, API) in einem Durchlauf prüfen und vereinheitlichen
+# - Fehler je Datensatz sammeln statt beim ersten abzubrechen
+# - Kategorien gegen eine Menge, Datumswerte nur einmal je Schreibweise parsen
+
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from model import Task, TaskTypeFactory
+from recurrence import RecurrenceRule
+
+# Felder, die Task selbst kennt
+TASK_FIELDS = ("id", "title", "completed", "category", "due_date", "priority", "type", "recurrence")
+# Einzige erlaubte Zusatzfelder: Zeitstempel und die externe Herkunft (nur als Paar)
+TIMESTAMP_FIELDS = ("created_at", "completed_at")
+EXTERNAL_FIELDS = ("external_source", "external_id")
+# Erlaubte Schreibweisen für "completed" als Text (z. B. aus CSV-nahen Quellen)
+BOOLEAN_STRINGS = {"true": True, "1": True, "yes": True, "ja": True,
+                   "false": False, "0": False, "no": False, "nein": False, "": False}
+
+
+class ValidationResult:
+    """Ergebnis einer Block-Prüfung: gültige Datensätze und Fehler je Index"""
+
+    def __init__(self):
+        self.records: List[Dict] = []
+        self.extra_fields: List[Dict] = []
+        self.errors: List[Tuple[int, str]] = []
+
+    @property
+    def rejected(self) -> int:
+        return len(self.errors)
+
+    def tasks(self) -> List[Task]:
+        """Gültige Datensätze als Tasks (IDs vergibt das Repository)"""
+        return TaskTypeFactory.from_dicts(self.records)
+
+    def errors_to_dicts(self) -> List[Dict]:
+        return [{"index": index, "error": message} for index, message in self.errors]
+
+
+class BatchValidator:
+    """
+    Prüft und normalisiert viele Task-Datensätze auf einmal.
+
+    Titel werden getrimmt, Kategorien gegen eine Menge geprüft (categories=None
+    lässt jede Kategorie zu, z. B. Projekte externer Quellen), Fälligkeiten zu
+    "YYYY-MM-DD" bzw. ISO-Zeitpunkt vereinheitlicht. Jede Datums-Schreibweise
+    wird nur einmal geparst - bei Massenimporten wiederholen sich die Werte.
+    Der Validator ist wiederverwendbar; der Datums-Cache bleibt erhalten.
+    """
+
+    def __init__(self, categories: Optional[Iterable[str]] = None, default_category: str = "Keine"):
+        self.categories = set(categories) if categories is not None else None
+        self.default_category = default_category
+        self._dates: Dict[str, Optional[str]] = {}
+
+    def _normalize_date(self, value) -> Optional[str]:
+        """Normalisiertes Datum; ValueError bei ungültigen Angaben"""
+        if value is None or value == "":
+            return None
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, date):
+            return value.isoformat()
+        if not isinstance(value, str):
+            raise ValueError(f"Ungültiges Datum: {value!r}")
+        try:
+            normalized = self._dates[value]
+        except KeyError:
+            text = value.strip()
+            try:
+                if len(text) > 10:
+                    normalized = datetime.fromisoformat(text).isoformat()
+                else:
+                    normalized = date.fromisoformat(text).isoformat()
+            except ValueError:
+                normalized = None
+            self._dates[value] = normalized
+        if normalized is None:
+            raise ValueError(f"Ungültiges Datum: {value!r}")
+        return normalized
+
+    @staticmethod
+    def _normalize_completed(value) -> bool:
+        """Status als bool; Text wird ausdrücklich geparst ("false" ist nicht erledigt)"""
+        if value is None or isinstance(value, bool):
+            return bool(value)
+        if isinstance(value, str):
+            try:
+                return BOOLEAN_STRINGS[value.strip().lower()]
+            except KeyError:
+                pass
+        raise ValueError(f"Ungültiger Status: {value!r}")
+
+    def extra_fields(self, record: Dict) -> Dict:
+        """Geprüfte Zusatzfelder eines Datensatzes; ValueError bei unbekannten oder ungültigen"""
+        unknown = [key for key in record if key not in TASK_FIELDS + TIMESTAMP_FIELDS + EXTERNAL_FIELDS]
+        if unknown:
+            raise ValueError(f"Unbekanntes Feld: {', '.join(map(str, unknown))}")
+        extra = {}
+        for key in TIMESTAMP_FIELDS:
+            value = record.get(key)
+            if value is None:
+                continue
+            try:
+                extra[key] = datetime.fromisoformat(value).isoformat()
+            except (TypeError, ValueError):
+                raise ValueError(f"Ungültiger Zeitstempel in {key}: {value!r}") from None
+        source, external_id = (record.get(key) for key in EXTERNAL_FIELDS)
+        if source is not None or external_id is not None:
+            if not (isinstance(source, str) and source and isinstance(external_id, str) and external_id):
+                raise ValueError("external_source und external_id nur gemeinsam als Text")
+            extra.update(external_source=source, external_id=external_id)
+        return extra
+
+    def normalize(self, record: Dict) -> Dict:
+        """Normalisiert einen Datensatz; ValueError mit Begründung, wenn er ungültig ist"""
+        if not isinstance(record, dict):
+            raise ValueError("Datensatz ist kein Objekt")
+        title = record.get("title")
+        if not isinstance(title, str) or not title.strip():
+            raise ValueError("Titel fehlt")
+        category = record.get("category")
+        category = category.strip() if isinstance(category, str) and category.strip() else self.default_category
+        if self.categories is not None and category not in self.categories:
+            raise ValueError(f"Unbekannte Kategorie: {category}")
+        priority = record.get("priority", Task.DEFAULT_PRIORITY)
+        if isinstance(priority, bool) or not isinstance(priority, int) \
+                or not Task.MIN_PRIORITY <= priority <= Task.MAX_PRIORITY:
+            raise ValueError(f"Priorität muss zwischen {Task.MIN_PRIORITY} und {Task.MAX_PRIORITY} liegen")
+        task_type = record.get("type", Task.TYPE)
+        if not isinstance(task_type, str) or not task_type:
+            raise ValueError("Ungültiger Typ")
+        recurrence = record.get("recurrence")
+        if recurrence is not None:
+            try:
+                valid = RecurrenceRule.from_dict(recurrence).validate()
+            except (KeyError, TypeError, AttributeError):
+                valid = False
+            if not valid:
+                raise ValueError("Ungültige Wiederholung")
+        return {
+            "id": 0,
+            "title": title.strip(),
+            "completed": self._normalize_completed(record.get("completed")),
+            "category": category,
+            "due_date": self._normalize_date(record.get("due_date")),
+            "priority": priority,
+            "type": task_type,
+            "recurrence": recurrence
+        }
+
+    def validate(self, records: Iterable[Dict]) -> ValidationResult:
+        """Prüft alle Datensätze; Fehler werden mit dem Index des Datensatzes gesammelt"""
+        result = ValidationResult()
+        for index, record in enumerate(records):
+            try:
+                normalized = self.normalize(record)
+                extra = self.extra_fields(record)
+            except ValueError as e:
+                result.errors.append((index, str(e)))
+                continue
+            result.records.append(normalized)
+            result.extra_fields.append(extra)
+        return result
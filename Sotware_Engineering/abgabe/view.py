@@ -10,6 +10,7 @@ import html
 from datetime import date, datetime, timedelta
 from typing import List, Optional, Dict, Callable
 from model import Task
+from recurrence import FREQUENCY_LABELS, RecurrenceRule
 
 
 class TaskView:
@@ -23,7 +24,7 @@ class TaskView:
         Nielsen #8: Aesthetic and minimalist design
         """
         with st.form("add_task_form", clear_on_submit=True, border=False):
-            cols = st.columns([4, 2, 2, 1])
+            cols = st.columns([4, 2, 2, 2, 1])
             
             with cols[0]:
                 title = st.text_input(
@@ -50,6 +51,15 @@ class TaskView:
                 )
             
             with cols[3]:
+                # Benutzerdefinierte Wochentage gibt es über CLI/API
+                repeat = st.selectbox(
+                    "Wiederholung",
+                    [None, "daily", "weekly", "monthly"],
+                    format_func=lambda freq: FREQUENCY_LABELS[freq] if freq else "Einmalig",
+                    label_visibility="collapsed"
+                )
+            
+            with cols[4]:
                 submitted = st.form_submit_button(
                     "➕",
                     type="primary",
@@ -61,7 +71,8 @@ class TaskView:
                 "submitted": submitted,
                 "title": title,
                 "category": category,
-                "due_date": due_date
+                "due_date": due_date,
+                "recurrence": RecurrenceRule(repeat) if repeat else None
             }
     
     @staticmethod
@@ -104,7 +115,12 @@ class TaskView:
         Rendert Task-Informationen
         Layout: Titel oben, Metadaten (Kategorie, Datum) kleiner darunter
         """
-        title_html = html.escape(task.title)
+        st.markdown(TaskView.build_task_info_html(task, get_color_func), unsafe_allow_html=True)
+    
+    @staticmethod
+    def build_task_info_html(task: Task, get_color_func: Callable) -> str:
+        """Baut das HTML der Task-Informationen (ohne Streamlit-Aufruf, z. B. für Benchmarks)"""
+        title_html = f"{task.ICON} {html.escape(task.title)}" if task.ICON else html.escape(task.title)
         completed_style = "text-decoration: line-through; opacity: 0.5;" if task.completed else ""
         urgent_style = "border-left: 3px solid #ff4b4b; padding-left: 12px;" if task.is_urgent() else "padding-left: 12px;"
         
@@ -118,18 +134,24 @@ class TaskView:
                 f"font-size:0.7rem; font-weight:700;'>{html.escape(task.category)}</span>"
             )
         
+        if task.priority >= 4:
+            meta.append(f"<span style='color:#ff8c00; font-size:0.75rem;'>{'❗' * (task.priority - 3)} wichtig</span>")
+        
         due_text = TaskView._format_due_date(task.due_date)
         if due_text:
             due_color = "#ff4b4b" if task.is_urgent() else "#888"
             meta.append(f"<span style='color:{due_color}; font-size:0.75rem;'>{due_text}</span>")
         
+        if task.recurrence:
+            rule_text = html.escape(RecurrenceRule.from_dict(task.recurrence).describe())
+            meta.append(f"<span style='color:#888; font-size:0.75rem;'>🔁 {rule_text}</span>")
+        
         meta_html = f"<div style='display:flex; align-items:center; gap:8px; margin-top:4px;'>{' '.join(meta)}</div>" if meta else ""
         
-        st.markdown(
+        return (
             f"<div style='padding:0.4rem 0; {urgent_style}'>"
             f"<div style='{completed_style}; font-size:1.05rem; font-weight:400; line-height:1.2;'>{title_html}</div>"
-            f"{meta_html}</div>",
-            unsafe_allow_html=True
+            f"{meta_html}</div>"
         )
     
     @staticmethod
@@ -165,11 +187,12 @@ class TaskView:
                     st.rerun()
     
     @staticmethod
-    def render_edit_form(task: Task, categories: List[str]) -> dict:
+    def render_edit_form(task: Task, categories: List[str],
+                         task_types: Optional[List[str]] = None) -> dict:
         """Rendert Edit-Formular"""
         st.markdown("##### ✏️ Aufgabe bearbeiten")
         with st.form(f"edit_form_{task.id}", border=True):
-            cols = st.columns([3, 2, 2])
+            cols = st.columns([3, 2, 2, 1])
             with cols[0]:
                 title = st.text_input("Titel", value=task.title, max_chars=200)
             with cols[1]:
@@ -179,6 +202,15 @@ class TaskView:
             with cols[2]:
                 current_due = datetime.fromisoformat(task.due_date).date() if task.due_date else None
                 due_date = st.date_input("Fällig", value=current_due, format="DD.MM.YYYY")
+            with cols[3]:
+                priority = st.selectbox(
+                    "Priorität", list(range(Task.MIN_PRIORITY, Task.MAX_PRIORITY + 1)),
+                    index=task.priority - Task.MIN_PRIORITY, help="1 = niedrig, 5 = hoch"
+                )
+            type_list = task_types or [task.task_type]
+            if task.task_type not in type_list:
+                type_list = [task.task_type] + type_list
+            task_type = st.selectbox("Typ", type_list, index=type_list.index(task.task_type))
             
             btn_cols = st.columns([1, 1, 4])
             with btn_cols[0]:
@@ -186,7 +218,8 @@ class TaskView:
             with btn_cols[1]:
                 cancel = st.form_submit_button("✖ Abbrechen", use_container_width=True)
             
-            return {"saved": save, "cancelled": cancel, "title": title, "category": category, "due_date": due_date}
+            return {"saved": save, "cancelled": cancel, "title": title, "category": category,
+                    "due_date": due_date, "priority": priority, "task_type": task_type}
     
     @staticmethod
     def _format_due_date(due_str: Optional[str]) -> Optional[str]:
@@ -309,6 +342,27 @@ class SidebarView:
         category = st.selectbox("Kategorie", category_options, index=cat_idx, label_visibility="collapsed")
         return {"status": status, "category": category}
     
+    @staticmethod
+    def render_next_up(tasks: List[Task]) -> None:
+        """Rendert die nächsten Aufgaben nach Priorität und Fälligkeit (FR-10)"""
+        if not tasks:
+            return
+        st.markdown("#### 🎯 Als Nächstes")
+        for task in tasks:
+            due_text = TaskView._format_due_date(task.due_date)
+            suffix = f" · {due_text}" if due_text else ""
+            st.caption(f"P{task.priority} · {task.title}{suffix}")
+    
+    @staticmethod
+    def render_upcoming(occurrences: List[tuple]) -> None:
+        """Rendert die Termine der nächsten Tage (Wiederholungen werden nur angezeigt)"""
+        if not occurrences:
+            return
+        st.markdown("#### 📅 Demnächst")
+        for day, task in occurrences:
+            repeat = " 🔁" if task.recurrence else ""
+            st.caption(f"{day.strftime('%d.%m.')} · {task.title}{repeat}")
+    
     @staticmethod
     def render_toggles() -> dict:
         """Rendert Toggle-Optionen"""
@@ -322,14 +376,26 @@ class ArchiveView:
     """View für Archiv"""
     
     @staticmethod
-    def render_archive(tasks: List[Task], on_restore, on_delete, get_color_func: Callable) -> None:
-        """Rendert Archiv-Ansicht"""
+    def render_archive(tasks: List[Task], on_restore, on_delete, get_color_func: Callable,
+                       page: int = 0, page_count: int = 1,
+                       on_page: Optional[Callable[[int], None]] = None) -> None:
+        """Rendert Archiv-Ansicht (seitenweise, inkl. ausgelagerter Einträge)"""
         st.markdown("#### Erledigte Aufgaben")
         if not tasks:
             st.caption("Keine erledigten Aufgaben.")
             return
         for task in tasks:
             ArchiveView._render_archived_task(task, on_restore, on_delete, get_color_func)
+        if page_count > 1 and on_page:
+            cols = st.columns([1, 2, 1])
+            with cols[0]:
+                if st.button("←", key="archive_prev", disabled=page <= 0):
+                    on_page(page - 1)
+            with cols[1]:
+                st.caption(f"Seite {page + 1} von {page_count}")
+            with cols[2]:
+                if st.button("→", key="archive_next", disabled=page >= page_count - 1):
+                    on_page(page + 1)
     
     @staticmethod
     def _render_archived_task(task: Task, on_restore, on_delete, get_color_func: Callable) -> None:
@@ -400,10 +466,24 @@ class LayoutView:
         """, unsafe_allow_html=True)
     
     @staticmethod
-    def render_header(last_save_time: Optional[datetime]) -> None:
-        """Rendert Header"""
+    def render_header(last_save_time: Optional[datetime],
+                      on_undo: Optional[Callable] = None, on_redo: Optional[Callable] = None,
+                      can_undo: bool = False, can_redo: bool = False,
+                      stats: Optional[Dict] = None) -> None:
+        """Rendert Header mit Rückgängig/Wiederholen und Kennzahlen"""
         cols = st.columns([4, 1])
         with cols[0]: st.markdown("# TODO App")
+        if on_undo or on_redo:
+            with cols[1]:
+                undo_col, redo_col = st.columns(2)
+                with undo_col:
+                    if st.button("↶", key="undo_btn", help="Rückgängig", disabled=not can_undo) and on_undo:
+                        on_undo()
+                with redo_col:
+                    if st.button("↷", key="redo_btn", help="Wiederholen", disabled=not can_redo) and on_redo:
+                        on_redo()
+        if stats:
+            LayoutView.render_stats(stats)
         
         # Toast statt statisches Icon 
         if last_save_time:
@@ -413,6 +493,21 @@ class LayoutView:
                 st.toast("Änderungen gespeichert!", icon="💾")
                 st.session_state['last_toast_shown'] = last_save_time
     
+    @staticmethod
+    def render_stats(stats: Dict) -> None:
+        """Rendert die Dashboard-Kennzahlen (vorberechnet, kein Durchlauf über Tasks)"""
+        cols = st.columns(4)
+        cols[0].metric("Offen", stats["open"])
+        cols[1].metric("Überfällig", stats["overdue"])
+        cols[2].metric("Diese Woche", stats["due_this_week"])
+        history = stats["completions_last_days"]
+        cols[3].metric("Heute erledigt", stats["completed_today"],
+                       delta=stats["completed_today"] - history[-2] if len(history) > 1 else None)
+        per_category = sorted(stats["open_per_category"].items(), key=lambda item: -item[1])
+        if per_category:
+            st.caption(" · ".join(f"{html.escape(name)}: {n}" for name, n in per_category)
+                       + f" · Archiv: {stats['archived']}")
+    
     @staticmethod
     def render_help() -> None:
         """Rendert Hilfe (kurze, klare Anleitung)"""
@@ -425,4 +520,22 @@ class LayoutView:
             "- Filter: Seitenleiste nutzen, um Aufgaben einzuschränken\n\n"
             "Tipp: Verwende kurze Titel und farbige Kategorien für bessere Übersicht.",
             icon="💡"
-        )
\ No newline at end of file
+        )
+
+
+class DebugView:
+    """Debug-Panel für Laufzeitmessungen (nur bei aktivierter Instrumentierung)"""
+    
+    @staticmethod
+    def render_stats(stats: Dict[str, Dict], on_reset) -> None:
+        """Rendert die gemessenen Aufrufe als Tabelle"""
+        with st.expander("🛠 Laufzeit-Statistik", expanded=False):
+            if not stats:
+                st.caption("Noch keine Messwerte.")
+                return
+            st.dataframe(
+                [{"Methode": name, **entry} for name, entry in stats.items()],
+                hide_index=True, use_container_width=True
+            )
+            if st.button("Zurücksetzen", key="debug_reset_stats"):
+                on_reset()